@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Anillo de lecturas en memoria compartida (multiprocessing.shared_memory)
+Separa la adquisición de la salida: un proceso lee el sensor contra plazos absolutos y
+escribe cada muestra en el anillo; los consumidores (pantalla, registro, control) leen
+a su propio ritmo desde cualquier proceso. Un consumidor lento nunca frena el muestreo:
+si se atrasa más que la capacidad del anillo pierde las muestras más viejas (y las
+cuenta), pero el escritor no lo espera.
+
+Un solo escritor por anillo. Cada ranura lleva su índice de muestra como seqlock:
+el escritor lo marca en -1, escribe los datos y después pone el índice; el lector
+descarta la ranura si el índice no coincide antes y después de copiarla.
+Si leer() lanza una excepción el escritor marca el anillo como fallido antes de
+terminar; además la cabecera guarda su pid, así un lector detecta también un
+productor muerto sin aviso (SIGKILL) y deja de esperar.
+
+Uso como consumidor independiente:
+    python anillo_compartido.py [NOMBRE] [--todas]
+"""
+import collections
+import math
+import multiprocessing
+import os
+import signal
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+NOMBRE = "demoraspberry_dht"
+CAPACIDAD = 4096        # Muestras (a 1 lectura/s: más de una hora de atraso tolerado)
+SONDEO = 0.05           # Segundos entre consultas de un lector que espera muestras
+
+# Cabecera: marca, estado, capacidad, muestras escritas, intervalo de muestreo, pid
+CABECERA = struct.Struct("<4sIqqdi")
+RANURA = struct.Struct("<qddd")      # índice de la muestra, instante, temperatura, humedad
+_MARCA = b"DHTR"
+_ACTIVO = struct.Struct("<I")        # Campos que se escriben sueltos, con su offset
+_OFFSET_ACTIVO = 4
+ACTIVO, DETENIDO, FALLIDO = 1, 0, 2     # Valores del campo de estado
+_PID = struct.Struct("<i")
+_OFFSET_PID = 32
+_INDICE = struct.Struct("<q")
+_OFFSET_ESCRITOS = 16
+_DATOS = struct.Struct("<ddd")
+
+Muestra = collections.namedtuple("Muestra", "instante temperatura humedad")
+
+
+def _abrir_memoria(nombre):
+    """Abre un segmento existente sin que el resource_tracker lo borre al salir"""
+    try:
+        return shared_memory.SharedMemory(nombre, track=False)
+    except TypeError:
+        # Python < 3.13: abrir también registra el segmento para borrarlo al salir
+        from multiprocessing import resource_tracker
+        memoria = shared_memory.SharedMemory(nombre)
+        resource_tracker.unregister(memoria._name, "shared_memory")
+        return memoria
+
+
+class AnilloCompartido:
+    """Anillo de muestras (instante, temperatura, humedad) en memoria compartida"""
+
+    def __init__(self, memoria, propietario=False):
+        self.memoria = memoria
+        self.propietario = propietario
+        marca, _, self.capacidad, _, self.intervalo, _ = CABECERA.unpack_from(memoria.buf)
+        if marca != _MARCA:
+            raise ValueError(f"{memoria.name} no es un anillo de lecturas")
+
+    @classmethod
+    def crear(cls, nombre=NOMBRE, capacidad=CAPACIDAD, intervalo=0.0):
+        """Crea el anillo (reemplaza uno viejo con el mismo nombre, p.ej. tras un corte)"""
+        tamano = CABECERA.size + capacidad * RANURA.size
+        try:
+            memoria = shared_memory.SharedMemory(nombre, create=True, size=tamano)
+        except FileExistsError:
+            viejo = _abrir_memoria(nombre)
+            viejo.close()
+            viejo.unlink()
+            memoria = shared_memory.SharedMemory(nombre, create=True, size=tamano)
+        CABECERA.pack_into(memoria.buf, 0, _MARCA, ACTIVO, capacidad, 0, intervalo, 0)
+        return cls(memoria, propietario=True)
+
+    @classmethod
+    def abrir(cls, nombre=NOMBRE):
+        """Abre un anillo existente (FileNotFoundError si no hay productor)"""
+        return cls(_abrir_memoria(nombre))
+
+    @property
+    def nombre(self):
+        return self.memoria.name
+
+    @property
+    def escritos(self):
+        """Muestras escritas desde que se creó el anillo"""
+        return _INDICE.unpack_from(self.memoria.buf, _OFFSET_ESCRITOS)[0]
+
+    @property
+    def estado(self):
+        return _ACTIVO.unpack_from(self.memoria.buf, _OFFSET_ACTIVO)[0]
+
+    @property
+    def activo(self):
+        """False cuando el dueño pidió detener la adquisición o el escritor falló"""
+        return self.estado == ACTIVO
+
+    @property
+    def fallido(self):
+        """True si el escritor terminó por un error de leer()"""
+        return self.estado == FALLIDO
+
+    def detener(self):
+        """Pide al escritor que termine (solo toca el campo activo)"""
+        _ACTIVO.pack_into(self.memoria.buf, _OFFSET_ACTIVO, DETENIDO)
+
+    def fallar(self):
+        """Marca que el escritor terminó por un error (lo llama el escritor)"""
+        _ACTIVO.pack_into(self.memoria.buf, _OFFSET_ACTIVO, FALLIDO)
+
+    def registrar_escritor(self):
+        """Guarda el pid del proceso escritor en la cabecera"""
+        _PID.pack_into(self.memoria.buf, _OFFSET_PID, os.getpid())
+
+    def escritor_vivo(self):
+        """False si el escritor registrado ya no existe (o es un zombi sin recoger)"""
+        pid = _PID.unpack_from(self.memoria.buf, _OFFSET_PID)[0]
+        if pid == 0:
+            return True         # Todavía no arrancó
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        try:
+            with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+                return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+        except (OSError, IndexError):
+            return True
+
+    def escribir(self, instante, temperatura, humedad):
+        """Agrega una muestra (None = lectura fallida); solo la llama el escritor"""
+        indice = self.escritos
+        posicion = CABECERA.size + (indice % self.capacidad) * RANURA.size
+        buf = self.memoria.buf
+        _INDICE.pack_into(buf, posicion, -1)
+        _DATOS.pack_into(buf, posicion + _INDICE.size, instante,
+                         math.nan if temperatura is None else temperatura,
+                         math.nan if humedad is None else humedad)
+        _INDICE.pack_into(buf, posicion, indice)
+        _INDICE.pack_into(buf, _OFFSET_ESCRITOS, indice + 1)
+
+    def leer(self, indice):
+        """Muestra `indice`, o None si ya fue sobrescrita (o se está escribiendo)"""
+        posicion = CABECERA.size + (indice % self.capacidad) * RANURA.size
+        buf = self.memoria.buf
+        guardado, instante, temperatura, humedad = RANURA.unpack_from(buf, posicion)
+        if guardado != indice or _INDICE.unpack_from(buf, posicion)[0] != indice:
+            return None
+        return Muestra(instante,
+                       None if math.isnan(temperatura) else temperatura,
+                       None if math.isnan(humedad) else humedad)
+
+    def cerrar(self):
+        """Suelta el mapeo; el dueño además borra el segmento"""
+        self.memoria.close()
+        if self.propietario:
+            try:
+                self.memoria.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class Lector:
+    """Cursor propio sobre un anillo: cada consumidor avanza a su ritmo"""
+
+    def __init__(self, anillo, todas=False):
+        """todas: empezar por la muestra más vieja disponible (si no, por la próxima)"""
+        self.anillo = anillo
+        escritos = anillo.escritos
+        self.cursor = max(0, escritos - anillo.capacidad) if todas else escritos
+        self.perdidas = 0       # Muestras sobrescritas antes de que este lector las viera
+        self.error = None       # Motivo si el productor terminó por una falla
+
+    def nuevas(self):
+        """Muestras escritas desde la última llamada (sin esperar)"""
+        escritos = self.anillo.escritos
+        if escritos - self.cursor > self.anillo.capacidad:
+            self.perdidas += escritos - self.anillo.capacidad - self.cursor
+            self.cursor = escritos - self.anillo.capacidad
+        muestras = []
+        while self.cursor < escritos:
+            muestra = self.anillo.leer(self.cursor)
+            if muestra is None:
+                self.perdidas += 1
+            else:
+                muestras.append(muestra)
+            self.cursor += 1
+        return muestras
+
+    def __iter__(self):
+        """
+        Muestras a medida que llegan; termina cuando el productor se detiene.
+        Si terminó por una falla (o murió) queda el motivo en `error`
+        """
+        while True:
+            muestras = self.nuevas()
+            yield from muestras
+            if not muestras:
+                if self.anillo.fallido:
+                    self.error = "la lectura del sensor falló en el proceso de adquisición"
+                    return
+                if not self.anillo.activo:
+                    return
+                if not self.anillo.escritor_vivo():
+                    self.error = "el proceso de adquisición terminó sin avisar"
+                    return
+                time.sleep(SONDEO)
+
+
+def _adquirir(anillo, leer, intervalo, al_iniciar, al_terminar):
+    """Bucle del proceso de adquisición: lee contra plazos absolutos y escribe"""
+    # Ctrl+C lo atiende el proceso padre, que detiene el anillo
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # El mapeo se hereda por fork; el segmento lo borra el padre
+    anillo.propietario = False
+    anillo.registrar_escritor()
+    if al_iniciar is not None:
+        al_iniciar()
+    try:
+        plazo = time.monotonic()
+        while anillo.activo:
+            temperatura, humedad = leer()
+            anillo.escribir(time.time(), temperatura, humedad)
+            plazo += intervalo
+            espera = plazo - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            else:
+                plazo = time.monotonic()    # Atrasado: no se recuperan lecturas perdidas
+    except BaseException:
+        # Los lectores dejan de esperar y el padre puede salir con error
+        anillo.fallar()
+        raise
+    finally:
+        if al_terminar is not None:
+            al_terminar()
+        anillo.cerrar()
+
+
+def iniciar_adquisicion(leer, intervalo, nombre=NOMBRE, capacidad=CAPACIDAD, al_iniciar=None,
+                        al_terminar=None):
+    """
+    Crea el anillo y arranca el proceso de adquisición.
+    leer: función sin argumentos -> (temperatura, humedad); el hijo se crea con fork y
+    hereda el sensor ya inicializado (el padre no debe volver a leerlo).
+    al_iniciar / al_terminar: funciones que el hijo llama al empezar y al terminar
+    (p.ej. arrancar sus hilos, que fork no copia, y volcar su estado).
+    Devuelve (proceso, anillo); detener con detener_adquisicion()
+    """
+    anillo = AnilloCompartido.crear(nombre, capacidad, intervalo)
+    proceso = multiprocessing.get_context("fork").Process(
+        target=_adquirir, args=(anillo, leer, intervalo, al_iniciar, al_terminar),
+        name="adquisicion", daemon=True)
+    proceso.start()
+    return proceso, anillo
+
+
+def detener_adquisicion(proceso, anillo, espera=None):
+    """Pide al proceso de adquisición que termine y borra el anillo"""
+    anillo.detener()
+    proceso.join(anillo.intervalo + 5 if espera is None else espera)
+    if proceso.is_alive():
+        proceso.terminate()
+        proceso.join()
+    anillo.cerrar()
+
+
+def mostrar_ayuda():
+    """Muestra la ayuda del programa"""
+    print("Uso: python anillo_compartido.py [NOMBRE] [--todas]")
+    print()
+    print("Consumidor independiente: muestra las lecturas que escribe el proceso de")
+    print("adquisición (python dht11_modern.py -c N --shm) en el anillo NOMBRE")
+    print(f"(default: {NOMBRE}), una línea por muestra: instante temperatura humedad")
+    print()
+    print("Opciones:")
+    print("  --todas       Empieza por la muestra más vieja del anillo")
+    print("  --help, -h    Muestra esta ayuda")
+
+
+def main():
+    """Función principal"""
+    argumentos = sys.argv[1:]
+    if "--help" in argumentos or "-h" in argumentos:
+        mostrar_ayuda()
+        return
+    todas = "--todas" in argumentos
+    argumentos = [a for a in argumentos if a != "--todas"]
+    nombre = argumentos[0] if argumentos else NOMBRE
+    try:
+        anillo = AnilloCompartido.abrir(nombre)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ No se pudo abrir el anillo {nombre}: {e}", file=sys.stderr)
+        sys.exit(1)
+    lector = Lector(anillo, todas)
+    try:
+        for muestra in lector:
+            if muestra.temperatura is None:
+                print(f"{muestra.instante:.3f} - -", flush=True)
+            else:
+                print(f"{muestra.instante:.3f} {muestra.temperatura:.1f} {muestra.humedad:.1f}",
+                      flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        anillo.cerrar()
+    if lector.perdidas:
+        print(f"⚠️  {lector.perdidas} muestras perdidas por atraso", file=sys.stderr)
+    if lector.error is not None:
+        print(f"❌ {lector.error}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+API asyncio para el sensor DHT11 y los relés
+Las llamadas bloqueantes a los drivers se ejecutan fuera del event loop, de modo
+que un solo proceso puede muestrear sensores, mover relés y atender comandos a la vez
+"""
+import asyncio
+import contextlib
+import functools
+import sys
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import dht11_modern
+
+# Las lecturas del DHT pueden tardar segundos: pool propio para no agotar el por defecto
+_ejecutor_sensores = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dht-async")
+# Un solo hilo para los relés: los comandos se aplican en el orden en que llegan
+_ejecutor_reles = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rele-async")
+# Un lock por sensor: el driver no admite dos lecturas simultáneas. asyncio.Lock queda
+# ligado a su event loop, así que hay un juego de locks por loop (otro asyncio.run())
+_locks_sensores = weakref.WeakKeyDictionary()
+
+
+def _rele_demo():
+    """Importa rele_demo bajo demanda (solo si se usan los relés)"""
+    import rele_demo
+    return rele_demo
+
+
+async def _en_hilo(ejecutor, funcion, *args):
+    """Ejecuta una función bloqueante en el ejecutor indicado"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ejecutor, functools.partial(funcion, *args))
+
+
+async def _leer_serializado(clave, funcion, *args):
+    """Lee un sensor asegurando una sola lectura en curso por sensor (clave)"""
+    loop = asyncio.get_running_loop()
+    locks = _locks_sensores.setdefault(loop, {})
+    lock = locks.setdefault(clave, asyncio.Lock())
+    async with lock:
+        futuro = loop.run_in_executor(_ejecutor_sensores, functools.partial(funcion, *args))
+        try:
+            return await asyncio.shield(futuro)
+        except asyncio.CancelledError:
+            # Cancelar no detiene el hilo: el lock se suelta cuando el driver termina
+            await asyncio.wait([futuro])
+            raise
+
+
+# --- Sensor DHT11 ---
+
+async def leer_sensor_moderno(dht, pin):
+    """Versión async de dht11_modern.leer_sensor_moderno"""
+    return await _leer_serializado(id(dht), dht11_modern.leer_sensor_moderno, dht, pin)
+
+
+async def leer_sensor_clasico(dht, pin, tipo="DHT11"):
+    """Versión async de dht11_modern.leer_sensor_clasico"""
+    return await _leer_serializado(
+        ("clasico", pin), dht11_modern.leer_sensor_clasico, dht, pin, tipo)
+
+
+async def leer_sensor():
+    """Versión async de dht11_pin11.leer_sensor"""
+    import dht11_pin11
+    return await _leer_serializado(("clasico", dht11_pin11.DHT_PIN),
+                                   dht11_pin11.leer_sensor)
+
+
+async def muestrear(dht, pin, biblioteca, intervalo, callback):
+    """Lee el sensor cada `intervalo` segundos y pasa (temperatura, humedad) a callback"""
+    leer = leer_sensor_moderno if biblioteca == "moderna" else leer_sensor_clasico
+    siguiente = time.monotonic()
+    while True:
+        temperatura, humedad = await leer(dht, pin)
+        callback(temperatura, humedad)
+        siguiente += intervalo
+        await asyncio.sleep(max(0, siguiente - time.monotonic()))
+
+
+# --- Relés ---
+
+async def activar_rele(numero_rele):
+    """Versión async de rele_demo.activar_rele"""
+    return await _en_hilo(_ejecutor_reles, _rele_demo().activar_rele, numero_rele)
+
+
+async def desactivar_rele(numero_rele):
+    """Versión async de rele_demo.desactivar_rele"""
+    return await _en_hilo(_ejecutor_reles, _rele_demo().desactivar_rele, numero_rele)
+
+
+async def alternar_rele(numero_rele):
+    """Versión async de rele_demo.alternar_rele"""
+    return await _en_hilo(_ejecutor_reles, _rele_demo().alternar_rele, numero_rele)
+
+
+async def ejecutar_comando(comando):
+    """Versión async de rele_demo.ejecutar_comando"""
+    return await _en_hilo(_ejecutor_reles, _rele_demo().ejecutar_comando, comando)
+
+
+async def servir_comandos(lector=None):
+    """Atiende comandos del modo manual línea a línea (stdin por defecto) sin bloquear"""
+    loop = asyncio.get_running_loop()
+    if lector is None:
+        lector = asyncio.StreamReader()
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(lector), sys.stdin)
+    while True:
+        linea = await lector.readline()
+        if not linea:
+            break
+        comando = linea.decode().strip().lower()
+        if comando == "quit":
+            break
+        if comando and not await ejecutar_comando(comando):
+            print(f"❌ Comando no válido: {comando}")
+
+
+def mostrar_lectura(temperatura, humedad):
+    """Muestra una lectura en una línea"""
+    if temperatura is not None and humedad is not None:
+        print(f"[{time.strftime('%H:%M:%S')}] 🌡️  {temperatura:.1f}°C  💧 {humedad:.1f}%")
+    else:
+        print(f"[{time.strftime('%H:%M:%S')}] ❌ Error en la lectura")
+
+
+async def principal(intervalo):
+    """Muestrea el sensor y atiende comandos de relés en el mismo event loop"""
+    tipo_biblioteca, dht_module, board_module = dht11_modern.detectar_biblioteca()
+    if tipo_biblioteca is None:
+        print("❌ Error: No se encontró ninguna biblioteca DHT")
+        return
+    if tipo_biblioteca == "moderna":
+        dht, pin = dht11_modern.inicializar_sensor_moderno(board_module)
+    else:
+        dht, pin = dht11_modern.inicializar_sensor_clasico(dht_module)
+    if dht is None:
+        print("❌ Error: No se pudo inicializar el sensor")
+        return
+
+    rele_demo = _rele_demo()
+    if not await _en_hilo(_ejecutor_reles, rele_demo.configurar_gpio):
+        return
+    muestreo = asyncio.create_task(
+        muestrear(dht, pin, tipo_biblioteca, intervalo, mostrar_lectura))
+    try:
+        await servir_comandos()
+    finally:
+        muestreo.cancel()
+        # Esperar a que termine la lectura en curso antes de liberar el GPIO
+        with contextlib.suppress(asyncio.CancelledError):
+            await muestreo
+        await _en_hilo(_ejecutor_reles, rele_demo.limpiar_gpio)
+
+
+def main():
+    """Función principal"""
+    intervalo = 5
+    if len(sys.argv) > 1:
+        if sys.argv[1] in ("--help", "-h"):
+            print("Uso: python api_async.py [intervalo]")
+            print()
+            print("Muestrea el DHT11 cada N segundos (default: 5) mientras acepta")
+            print("comandos de relés por stdin (on1, off1, toggle1, status, quit...)")
+            return
+        try:
+            intervalo = int(sys.argv[1])
+        except ValueError:
+            print("Intervalo inválido, usando 5 segundos por defecto")
+
+    print("⚡ Demo asyncio - DHT11 + Relés")
+    print("=" * 40)
+    try:
+        asyncio.run(principal(intervalo))
+    except KeyboardInterrupt:
+        print("\n\n👋 Demo interrumpida")
+
+
+if __name__ == "__main__":
+    main()
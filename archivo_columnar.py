@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Archivo columnar comprimido para el historial de largo plazo del DHT11
+Las lecturas se agrupan en bloques y cada bloque guarda sus columnas por separado:
+- timestamps (ms): delta-of-delta; con un intervalo regular casi todos valen 0
+- temperatura y humedad (décimas): delta respecto del valor anterior; el DHT11 cambia
+  poco, así que casi todos valen 0
+Cada columna es un mapa de bits "distinto de cero" (1 bit por lectura, como el '0' de
+Gorilla) más los valores no nulos en zigzag, empaquetados a nivel de bit con el ancho
+mínimo de cada tanda de 128. Con anchos por tanda (en lugar de un prefijo por valor)
+NumPy puede decodificar una tanda entera de una vez.
+
+Al final del archivo, un índice con el rango de tiempo de cada bloque permite decodificar
+solo los bloques de un rango. Formato:
+    cabecera | bloque... | índice (una entrada por bloque) | cantidad de bloques, marca
+"""
+import bisect
+import os
+import struct
+import sys
+import time
+
+from registro_binario import ESTADO_ERROR, ESTADO_OK, leer_rango as leer_registro
+
+MAGIC = b"DHTC"
+VERSION = 1
+CABECERA = struct.Struct("<4sHH")          # marca, versión, lecturas por tanda
+BLOQUE = struct.Struct("<IBq")             # lecturas, banderas, primer timestamp (ms)
+COLUMNA = struct.Struct("<I")              # bytes de la columna que sigue
+INDICE = struct.Struct("<QIIqq")           # offset, bytes, lecturas, primer y último ts (ms)
+COLA = struct.Struct("<I4s")               # cantidad de bloques, marca
+
+LECTURAS_POR_BLOQUE = 4096
+TANDA = 128                                # Valores empaquetados con un mismo ancho
+CON_ERRORES = 1                            # Bandera: el bloque trae mapa de estados
+
+
+def _numpy():
+    """NumPy si está instalado (camino de decodificación en bloque), o None"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _zigzag(valor):
+    return valor * 2 if valor >= 0 else -valor * 2 - 1
+
+
+def _deszigzag(valor):
+    return valor >> 1 if not valor & 1 else -((valor + 1) >> 1)
+
+
+def _empaquetar(valores, ancho):
+    """Concatena `valores` con `ancho` bits cada uno (MSB primero), rellenando a byte"""
+    acumulado = 0
+    for valor in valores:
+        acumulado = (acumulado << ancho) | valor
+    bits = len(valores) * ancho
+    relleno = -bits % 8
+    return (acumulado << relleno).to_bytes((bits + relleno) // 8, "big")
+
+
+def _desempaquetar(datos, cantidad, ancho):
+    """Inversa de _empaquetar()"""
+    if ancho == 0:
+        return [0] * cantidad
+    acumulado = int.from_bytes(datos, "big") >> (len(datos) * 8 - cantidad * ancho)
+    mascara = (1 << ancho) - 1
+    return [(acumulado >> (ancho * (cantidad - 1 - i))) & mascara for i in range(cantidad)]
+
+
+def codificar_columna(valores):
+    """Mapa de bits de no nulos + no nulos en zigzag empaquetados por tandas"""
+    partes = [_empaquetar([1 if v else 0 for v in valores], 1)]
+    no_nulos = [_zigzag(v) for v in valores if v]
+    for i in range(0, len(no_nulos), TANDA):
+        tanda = no_nulos[i:i + TANDA]
+        ancho = max(tanda).bit_length()
+        partes.append(bytes([ancho]))
+        partes.append(_empaquetar(tanda, ancho))
+    return b"".join(partes)
+
+
+def decodificar_columna(datos, cantidad):
+    """Lista de `cantidad` enteros desde codificar_columna()"""
+    bytes_mapa = (cantidad + 7) // 8
+    mapa = _desempaquetar(datos[:bytes_mapa], cantidad, 1)
+    no_nulos = []
+    posicion = bytes_mapa
+    pendientes = sum(mapa)
+    while pendientes:
+        n = min(TANDA, pendientes)
+        ancho = datos[posicion]
+        largo = (n * ancho + 7) // 8
+        no_nulos.extend(map(_deszigzag, _desempaquetar(datos[posicion + 1:posicion + 1 + largo],
+                                                       n, ancho)))
+        posicion += 1 + largo
+        pendientes -= n
+    valores = iter(no_nulos)
+    return [next(valores) if bit else 0 for bit in mapa]
+
+
+def _decodificar_columna_np(np, datos, cantidad):
+    """decodificar_columna() vectorizado: una operación por tanda"""
+    buffer = np.frombuffer(datos, dtype=np.uint8)
+    bytes_mapa = (cantidad + 7) // 8
+    mapa = np.unpackbits(buffer[:bytes_mapa])[:cantidad].astype(bool)
+    pendientes = int(mapa.sum())
+    no_nulos = np.empty(pendientes, dtype=np.uint64)
+    posicion, hechos = bytes_mapa, 0
+    while hechos < pendientes:
+        n = min(TANDA, pendientes - hechos)
+        ancho = int(buffer[posicion])
+        largo = (n * ancho + 7) // 8
+        bits = np.unpackbits(buffer[posicion + 1:posicion + 1 + largo])[:n * ancho]
+        pesos = np.left_shift(np.uint64(1), np.arange(ancho - 1, -1, -1, dtype=np.uint64))
+        no_nulos[hechos:hechos + n] = bits.reshape(n, ancho).astype(np.uint64) @ pesos
+        posicion += 1 + largo
+        hechos += n
+    # Zigzag inverso: (z >> 1) ^ -(z & 1)
+    signo = -(no_nulos & np.uint64(1)).astype(np.int64)
+    no_nulos = (no_nulos >> np.uint64(1)).astype(np.int64) ^ signo
+    valores = np.zeros(cantidad, dtype=np.int64)
+    valores[mapa] = no_nulos
+    return valores
+
+
+def _diferencias(valores, previo=0):
+    """Diferencias sucesivas empezando desde `previo`"""
+    salida = []
+    for valor in valores:
+        salida.append(valor - previo)
+        previo = valor
+    return salida
+
+
+def _acumular(diferencias, previo=0):
+    salida = []
+    for diferencia in diferencias:
+        previo += diferencia
+        salida.append(previo)
+    return salida
+
+
+def codificar_bloque(timestamps, temperaturas, humedades, estados):
+    """Bloque con sus columnas (timestamps en ms; valores en décimas, None si hubo error)"""
+    n = len(timestamps)
+    errores = [1 if e != ESTADO_OK else 0 for e in estados]
+    banderas = CON_ERRORES if any(errores) else 0
+    partes = [BLOQUE.pack(n, banderas, timestamps[0])]
+    if banderas & CON_ERRORES:
+        partes.append(_empaquetar(errores, 1))
+    # Delta-of-delta: la primera delta queda como está, el resto como diferencia
+    deltas = _diferencias(timestamps[1:], timestamps[0])
+    columnas = [_diferencias(deltas),
+                _diferencias([v for v, e in zip(temperaturas, errores) if not e]),
+                _diferencias([v for v, e in zip(humedades, errores) if not e])]
+    for columna in columnas:
+        datos = codificar_columna(columna)
+        partes.append(COLUMNA.pack(len(datos)))
+        partes.append(datos)
+    return b"".join(partes)
+
+
+def _columnas_bloque(datos):
+    """(n, t0, errores|None, [datos de cada columna]) de un bloque"""
+    n, banderas, t0 = BLOQUE.unpack_from(datos)
+    posicion = BLOQUE.size
+    errores = None
+    if banderas & CON_ERRORES:
+        largo = (n + 7) // 8
+        errores = datos[posicion:posicion + largo]
+        posicion += largo
+    columnas = []
+    for _ in range(3):
+        (largo,) = COLUMNA.unpack_from(datos, posicion)
+        posicion += COLUMNA.size
+        columnas.append(datos[posicion:posicion + largo])
+        posicion += largo
+    return n, t0, errores, columnas
+
+
+def decodificar_bloque(datos):
+    """Lista de (timestamp s, temperatura, humedad, estado) de un bloque"""
+    n, t0, errores, columnas = _columnas_bloque(datos)
+    errores = [0] * n if errores is None else _desempaquetar(errores, n, 1)
+    validas = n - sum(errores)
+    timestamps = [t0] + _acumular(_acumular(decodificar_columna(columnas[0], n - 1)), t0)
+    temperaturas = iter(_acumular(decodificar_columna(columnas[1], validas)))
+    humedades = iter(_acumular(decodificar_columna(columnas[2], validas)))
+    lecturas = []
+    for ts, error in zip(timestamps, errores):
+        if error:
+            lecturas.append((ts / 1000, None, None, ESTADO_ERROR))
+        else:
+            lecturas.append((ts / 1000, next(temperaturas) / 10, next(humedades) / 10,
+                             ESTADO_OK))
+    return lecturas
+
+
+def decodificar_bloque_np(np, datos):
+    """(timestamps, temperaturas, humedades) como arrays; NaN donde hubo error"""
+    n, t0, errores, columnas = _columnas_bloque(datos)
+    validas = np.ones(n, dtype=bool)
+    if errores is not None:
+        validas = ~np.unpackbits(np.frombuffer(errores, dtype=np.uint8))[:n].astype(bool)
+    deltas = np.cumsum(_decodificar_columna_np(np, columnas[0], n - 1))
+    timestamps = np.empty(n, dtype=np.int64)
+    timestamps[0] = t0
+    timestamps[1:] = t0 + np.cumsum(deltas)
+    valores = []
+    for datos_columna in columnas[1:]:
+        columna = np.full(n, np.nan)
+        decodificados = _decodificar_columna_np(np, datos_columna, int(validas.sum()))
+        columna[validas] = np.cumsum(decodificados) / 10
+        valores.append(columna)
+    return timestamps / 1000, valores[0], valores[1]
+
+
+class EscritorArchivo:
+    """Escribe un archivo columnar (en un temporal que se renombra al cerrar)"""
+
+    def __init__(self, ruta, lecturas_por_bloque=LECTURAS_POR_BLOQUE):
+        self.ruta = ruta
+        self.lecturas_por_bloque = lecturas_por_bloque
+        self._temporal = f"{ruta}.{os.getpid()}.tmp"
+        self._archivo = open(self._temporal, "wb")
+        self._archivo.write(CABECERA.pack(MAGIC, VERSION, TANDA))
+        self._indice = []
+        self._columnas = ([], [], [], [])
+        self._ultimo = None
+        self.lecturas = 0
+
+    def agregar(self, timestamp, temperatura, humedad, estado=ESTADO_OK):
+        """Agrega una lectura (timestamps no decrecientes)"""
+        ms = round(timestamp * 1000)
+        if self._ultimo is not None and ms < self._ultimo:
+            raise ValueError("Los timestamps del archivo deben ser crecientes")
+        self._ultimo = ms
+        if temperatura is None or humedad is None:
+            estado = ESTADO_ERROR
+        error = estado != ESTADO_OK
+        for columna, valor in zip(self._columnas, (ms, None if error else round(temperatura * 10),
+                                                   None if error else round(humedad * 10),
+                                                   estado)):
+            columna.append(valor)
+        self.lecturas += 1
+        if len(self._columnas[0]) >= self.lecturas_por_bloque:
+            self._escribir_bloque()
+
+    def _escribir_bloque(self):
+        timestamps = self._columnas[0]
+        if not timestamps:
+            return
+        datos = codificar_bloque(*self._columnas)
+        self._indice.append((self._archivo.tell(), len(datos), len(timestamps),
+                             timestamps[0], timestamps[-1]))
+        self._archivo.write(datos)
+        self._columnas = ([], [], [], [])
+
+    def descartar(self):
+        """Abandona la escritura sin tocar `ruta`"""
+        self._archivo.close()
+        os.unlink(self._temporal)
+
+    def cerrar(self):
+        """Escribe el último bloque y el índice, y publica el archivo"""
+        self._escribir_bloque()
+        for entrada in self._indice:
+            self._archivo.write(INDICE.pack(*entrada))
+        self._archivo.write(COLA.pack(len(self._indice), MAGIC))
+        self._archivo.close()
+        os.replace(self._temporal, self.ruta)
+
+
+class ArchivoColumnar:
+    """Lector de un archivo columnar con búsqueda de bloques por rango de tiempo"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = open(ruta, "rb")
+        magic, version, tanda = CABECERA.unpack(self._archivo.read(CABECERA.size))
+        self._archivo.seek(-COLA.size, os.SEEK_END)
+        cantidad, marca = COLA.unpack(self._archivo.read(COLA.size))
+        if magic != MAGIC or marca != MAGIC or version != VERSION or tanda != TANDA:
+            self.cerrar()
+            raise ValueError(f"Archivo columnar inválido: {ruta}")
+        self._archivo.seek(-COLA.size - cantidad * INDICE.size, os.SEEK_END)
+        datos = self._archivo.read(cantidad * INDICE.size)
+        self.bloques = [INDICE.unpack_from(datos, i * INDICE.size) for i in range(cantidad)]
+        self._ultimos = [bloque[4] for bloque in self.bloques]
+
+    def __len__(self):
+        return sum(bloque[2] for bloque in self.bloques)
+
+    def _bloques_en_rango(self, desde, hasta):
+        """Índices de bloque que pueden tener lecturas en [desde, hasta)"""
+        inicio = 0 if desde is None else bisect.bisect_left(self._ultimos, round(desde * 1000))
+        for i in range(inicio, len(self.bloques)):
+            if hasta is not None and self.bloques[i][3] >= round(hasta * 1000):
+                break
+            yield i
+
+    def _leer_bloque(self, i):
+        offset, largo = self.bloques[i][:2]
+        self._archivo.seek(offset)
+        return self._archivo.read(largo)
+
+    def leer_rango(self, desde=None, hasta=None):
+        """Genera (timestamp, temperatura, humedad, estado) con desde <= timestamp < hasta"""
+        for i in self._bloques_en_rango(desde, hasta):
+            lecturas = decodificar_bloque(self._leer_bloque(i))
+            inicio = 0 if desde is None else bisect.bisect_left(lecturas, (desde,))
+            fin = len(lecturas) if hasta is None else bisect.bisect_left(lecturas, (hasta,))
+            yield from lecturas[inicio:fin]
+
+    def leer_numpy(self, desde=None, hasta=None):
+        """(timestamps, temperaturas, humedades) del rango como arrays de NumPy"""
+        np = _numpy()
+        if np is None:
+            raise ImportError("leer_numpy() necesita NumPy (pip install numpy)")
+        partes = []
+        for i in self._bloques_en_rango(desde, hasta):
+            timestamps, temperaturas, humedades = decodificar_bloque_np(np, self._leer_bloque(i))
+            inicio = 0 if desde is None else np.searchsorted(timestamps, desde)
+            fin = len(timestamps) if hasta is None else np.searchsorted(timestamps, hasta)
+            partes.append((timestamps[inicio:fin], temperaturas[inicio:fin],
+                           humedades[inicio:fin]))
+        if not partes:
+            return np.empty(0), np.empty(0), np.empty(0)
+        return tuple(np.concatenate(columna) for columna in zip(*partes))
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+def exportar(directorio, ruta, desde=None, hasta=None):
+    """Convierte el historial de registro_binario a un archivo columnar; devuelve lecturas"""
+    escritor = EscritorArchivo(ruta)
+    try:
+        for lectura in leer_registro(directorio, desde, hasta):
+            escritor.agregar(*lectura)
+    except BaseException:
+        escritor.descartar()
+        raise
+    escritor.cerrar()
+    return escritor.lecturas
+
+
+def _fecha(texto):
+    return time.mktime(time.strptime(texto, "%Y-%m-%d %H:%M:%S"))
+
+
+def mostrar_ayuda():
+    """Muestra la ayuda del programa"""
+    print("Uso:")
+    print("  python archivo_columnar.py exportar DIRECTORIO ARCHIVO [desde] [hasta]")
+    print("  python archivo_columnar.py ver ARCHIVO [desde] [hasta]")
+    print("  python archivo_columnar.py info ARCHIVO")
+    print()
+    print("exportar: comprime el historial binario (--persist) en un archivo columnar")
+    print("ver: muestra las lecturas de un rango (solo decodifica los bloques necesarios)")
+    print("info: tamaño, bloques y bytes por lectura")
+    print("desde/hasta en formato 'YYYY-MM-DD HH:MM:SS' (hora local)")
+
+
+def main():
+    """Función principal"""
+    argumentos = sys.argv[1:]
+    minimos = {"exportar": 3, "ver": 2, "info": 2}
+    if not argumentos or argumentos[0] not in minimos or len(argumentos) < minimos[argumentos[0]]:
+        mostrar_ayuda()
+        sys.exit(0 if argumentos[:1] in (["--help"], ["-h"]) else 1)
+    comando = argumentos.pop(0)
+    limites = []
+    for texto in argumentos[minimos[comando] - 1:minimos[comando] + 1]:
+        try:
+            limites.append(_fecha(texto))
+        except ValueError:
+            print(f"Fecha inválida: {texto}")
+            sys.exit(1)
+    limites += [None] * (2 - len(limites))
+
+    try:
+        if comando == "exportar":
+            inicio = time.perf_counter()
+            lecturas = exportar(argumentos[0], argumentos[1], *limites)
+            tamano = os.path.getsize(argumentos[1])
+            print(f"✅ {lecturas} lecturas en {argumentos[1]} ({tamano} bytes, "
+                  f"{tamano / max(lecturas, 1):.2f} bytes/lectura) "
+                  f"en {time.perf_counter() - inicio:.1f} s")
+            return
+        archivo = ArchivoColumnar(argumentos[0])
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    try:
+        if comando == "info":
+            tamano = os.path.getsize(argumentos[0])
+            print(f"📦 {argumentos[0]}: {len(archivo)} lecturas en {len(archivo.bloques)} bloques")
+            print(f"💾 {tamano} bytes ({tamano / max(len(archivo), 1):.2f} bytes/lectura)")
+            if archivo.bloques:
+                for nombre, ms in (("Desde", archivo.bloques[0][3]),
+                                   ("Hasta", archivo.bloques[-1][4])):
+                    fecha = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ms / 1000))
+                    print(f"🕐 {nombre}: {fecha}")
+            return
+        for ts, temperatura, humedad, estado in archivo.leer_rango(*limites):
+            fecha = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+            if estado == ESTADO_OK:
+                print(f"{fecha}  {temperatura:.1f}°C  {humedad:.1f}%")
+            else:
+                print(f"{fecha}  ❌ Error en la lectura")
+    finally:
+        archivo.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque de los scripts (python -X importtime)
+Ejecuta cada punto de entrada con un comando que no toca el hardware (--help),
+suma el tiempo de import que agrega cada script sobre el intérprete vacío y lo
+compara con un presupuesto. Además verifica que esos arranques no importen los
+drivers (RPi.GPIO, adafruit_dht, board...): deben cargarse en el primer uso real.
+Sale con código 1 si algún punto de entrada se pasa de presupuesto.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+# Punto de entrada -> presupuesto de import en ms (medido en un PC; usa --escala en la Pi)
+PRESUPUESTOS = {
+    "dht11_modern.py --help": 20,
+    "dht11_multi.py --help": 45,
+    "rele_demo.py --help": 20,
+    "demonio.py --help": 40,
+    "demonio.py --send ping": 40,
+    "api_async.py --help": 100,
+    "termostato.py --help": 25,
+    "cache_lecturas.py --help": 30,
+}
+
+# Módulos de drivers que ningún arranque sin hardware debe cargar
+PROHIBIDOS = ("RPi", "adafruit_dht", "board", "Adafruit_DHT", "smbus2", "numpy")
+
+REPETICIONES = 5
+
+
+def parsear_importtime(salida):
+    """Devuelve {modulo: acumulado_us} de los imports de primer nivel de -X importtime"""
+    modulos = {}
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|", 2)
+        if not acumulado.strip().isdigit():
+            continue    # Cabecera
+        # La anidación se indica con dos espacios por nivel
+        if len(nombre) - len(nombre.lstrip()) == 1:
+            modulos[nombre.strip()] = int(acumulado)
+    return modulos
+
+
+def todos_los_modulos(salida):
+    """Nombres de todos los módulos importados (cualquier nivel)"""
+    return {linea.rsplit("|", 1)[1].strip() for linea in salida.splitlines()
+            if linea.startswith("import time:") and "|" in linea}
+
+
+def ejecutar(argumentos, directorio):
+    """Ejecuta python -X importtime y devuelve su stderr"""
+    proceso = subprocess.run([sys.executable, "-X", "importtime", *argumentos],
+                             cwd=directorio, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, text=True)
+    return proceso.stderr
+
+
+def medir(entrada, directorio, base, repeticiones=REPETICIONES):
+    """Mediana en ms del import agregado por `entrada` y drivers prohibidos cargados"""
+    tiempos = []
+    prohibidos = set()
+    for _ in range(repeticiones):
+        salida = ejecutar(entrada.split(), directorio)
+        propios = {m: us for m, us in parsear_importtime(salida).items() if m not in base}
+        tiempos.append(sum(propios.values()) / 1000)
+        prohibidos |= {m for m in todos_los_modulos(salida)
+                       if m.split(".")[0] in PROHIBIDOS}
+    return statistics.median(tiempos), sorted(prohibidos)
+
+
+def main():
+    """Función principal"""
+    escala = 1.0
+    repeticiones = REPETICIONES
+    argumentos = sys.argv[1:]
+    try:
+        while argumentos:
+            opcion = argumentos.pop(0)
+            if opcion in ("--help", "-h"):
+                print("Uso: python bench_arranque.py [--escala F] [--repeticiones N]")
+                print()
+                print("Mide el import de cada punto de entrada con -X importtime y lo compara")
+                print("con su presupuesto (multiplicado por F; en una Pi Zero, p.ej. --escala 10)")
+                return
+            if opcion == "--escala":
+                escala = float(argumentos.pop(0))
+            elif opcion == "--repeticiones":
+                repeticiones = int(argumentos.pop(0))
+            else:
+                raise ValueError(opcion)
+    except (ValueError, IndexError):
+        print("Argumentos inválidos. Usa --help para ver las opciones")
+        sys.exit(1)
+
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    base = set(parsear_importtime(ejecutar(["-c", "pass"], directorio)))
+
+    print("⏱️  Arranque de los puntos de entrada (-X importtime)")
+    print("=" * 60)
+    fallos = 0
+    for entrada, presupuesto in PRESUPUESTOS.items():
+        ms, prohibidos = medir(entrada, directorio, base, repeticiones)
+        limite = presupuesto * escala
+        ok = ms <= limite and not prohibidos
+        fallos += not ok
+        print(f"{'✅' if ok else '❌'} {entrada:28} {ms:7.1f} ms  (presupuesto {limite:g} ms)")
+        if prohibidos:
+            print(f"    ⚠️  importa drivers: {', '.join(prohibidos)}")
+
+    print("=" * 60)
+    if fallos:
+        print(f"❌ {fallos} punto(s) de entrada fuera de presupuesto")
+        sys.exit(1)
+    print("✅ Todos los arranques dentro de presupuesto")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks sobre los backends simulados (sin Raspberry Pi)
+- conmutacion: relés conmutados por segundo (GPIO y MCP23017)
+- despacho: latencia de los comandos on/off/toggle/status (modo manual y demonio)
+- lecturas: lecturas del sensor por segundo con fallos, a través de los reintentos
+- memoria: crecimiento de memoria en una corrida larga del modo continuo
+- estadisticas: costo por muestra de las estadísticas móviles (1 min, 15 min, 24 h)
+- adquisicion: intervalo real de muestreo con una salida lenta (en línea vs anillo compartido)
+- archivo: tamaño y velocidad de codificación/decodificación del archivo columnar
+- proporcional: jitter, error de ciclo útil y CPU del control proporcional con 48 relés
+- botones: latencia del flanco a la conmutación con rebotes inyectados en el GPIO simulado
+- decodificador: tramas DHT por segundo del decodificador nativo (una a una y en lote)
+- resistencia: RSS del bucle continuo vigilado en millones de muestras con lecturas colgadas
+Los resultados se pueden guardar en JSON (--json) y comparar con otra corrida
+(--comparar), p.ej. entre commits.
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import simulador
+
+SUITE = ("conmutacion", "despacho", "lecturas", "memoria", "estadisticas", "adquisicion",
+         "archivo", "proporcional", "botones", "decodificador", "resistencia")
+
+# Métricas en las que un valor mayor es mejor (el resto: menor es mejor)
+MAYOR_ES_MEJOR = ("por_s", "tasa_exito")
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def bench_conmutacion(n=20000):
+    """Conmutaciones por segundo de un banco de 4 relés GPIO y de 16 en un MCP23017"""
+    from rele_backends import BackendGPIO, BackendMCP23017, ExpansorSimulado
+    from rele_bank import RelayBank
+
+    simulacion = simulador.instalar(latencia=0, fallos=0)
+    try:
+        resultados = {}
+        bancos = {
+            "gpio": (RelayBank(BackendGPIO(simulacion.gpio, [2, 3, 4, 17])), simulacion.gpio),
+            "mcp23017": (RelayBank(BackendMCP23017(ExpansorSimulado())), None),
+        }
+        for nombre, (banco, gpio) in bancos.items():
+            banco.configurar()
+            canales = len(banco)
+            inicio = time.perf_counter()
+            for i in range(n):
+                banco.alternar(i % canales + 1)
+            duracion = time.perf_counter() - inicio
+            resultados[f"{nombre}_por_s"] = n / duracion
+            resultados[f"{nombre}_escrituras_por_conmutacion"] = banco.escrituras / n
+            if gpio is not None:
+                resultados["gpio_transiciones"] = gpio.cambios
+            banco.cerrar()
+        return resultados
+    finally:
+        simulacion.desinstalar()
+
+
+def bench_despacho(n=5000):
+    """Latencia (µs) de despachar comandos por rele_demo y por el demonio"""
+    simulacion = simulador.instalar(latencia=0, fallos=0)
+    try:
+        import rele_demo
+        from demonio import Demonio
+
+        comandos = ["on1", "off1", "toggle2", "status", "onall", "offall"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            rele_demo.configurar_gpio()
+        resultados = {}
+        demonio = Demonio(rele_demo.banco)
+        frentes = {"manual": rele_demo.ejecutar_comando, "demonio": demonio.ejecutar}
+        for nombre, ejecutar in frentes.items():
+            latencias = []
+            # Los prints del modo manual van a un buffer: se mide el despacho, no la terminal
+            with contextlib.redirect_stdout(io.StringIO()):
+                for i in range(n):
+                    inicio = time.perf_counter()
+                    ejecutar(comandos[i % len(comandos)])
+                    latencias.append((time.perf_counter() - inicio) * 1e6)
+            resultados[f"{nombre}_us_p50"] = _percentil(latencias, 0.5)
+            resultados[f"{nombre}_us_p99"] = _percentil(latencias, 0.99)
+        with contextlib.redirect_stdout(io.StringIO()):
+            rele_demo.limpiar_gpio()
+        rele_demo.banco = None
+        return resultados
+    finally:
+        simulacion.desinstalar()
+
+
+def bench_lecturas(n=300, fallos=0.3, latencia=0.001):
+    """Lecturas por segundo, tasa de éxito e intentos por lectura con fallos inyectados"""
+    from dht11_modern import leer_sensor_clasico, leer_sensor_moderno
+    from reintentos import PoliticaReintentos
+
+    simulacion = simulador.instalar(latencia=latencia, fallos=fallos, semilla=0, retencion=0)
+    try:
+        import adafruit_dht
+        import Adafruit_DHT
+
+        lectores = {
+            "moderna": (leer_sensor_moderno, adafruit_dht.DHT11(17)),
+            "clasica": (leer_sensor_clasico, Adafruit_DHT),
+        }
+        resultados = {}
+        for nombre, (leer, dht) in lectores.items():
+            # Sin intervalo mínimo: se mide el costo de la lectura y de los reintentos
+            politica = PoliticaReintentos(intervalo_minimo=0, presupuesto=1.0, jitter=0)
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(n):
+                    leer(dht, 17, politica=politica)
+            duracion = time.perf_counter() - inicio
+            resultados[f"{nombre}_por_s"] = n / duracion
+            resultados[f"{nombre}_tasa_exito"] = politica.exitos / n
+            resultados[f"{nombre}_intentos_por_lectura"] = politica.intentos / n
+        return resultados
+    finally:
+        simulacion.desinstalar()
+
+
+def bench_memoria(n=100000):
+    """Crecimiento de memoria (tracemalloc) del bucle de modo continuo tras calentar"""
+    from dht11_modern import leer_sensor_moderno
+    from reintentos import PoliticaReintentos
+    from serie_tiempo import SerieTiempo
+
+    simulacion = simulador.instalar(latencia=0, fallos=0.05, semilla=0, retencion=0)
+    try:
+        import adafruit_dht
+
+        dht = adafruit_dht.DHT11(17)
+        politica = PoliticaReintentos(intervalo_minimo=0, jitter=0)
+        serie = SerieTiempo()
+        calentamiento = n // 10
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()) as salida:
+            for i in range(n):
+                if i == calentamiento:
+                    salida.seek(0)
+                    salida.truncate()
+                    inicial = tracemalloc.get_traced_memory()[0]
+                # Una hora de lecturas simuladas cada 5 s llena los niveles agregados
+                temperatura, humedad = leer_sensor_moderno(dht, 17, politica=politica)
+                if temperatura is not None:
+                    serie.agregar(i * 5.0, temperatura, humedad)
+        final, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        crecimiento = final - inicial
+        return {
+            "crecimiento_bytes": crecimiento,
+            "bytes_por_iteracion": crecimiento / (n - calentamiento),
+            "pico_bytes": pico,
+            "serie_bytes": serie.memoria(),
+        }
+    finally:
+        simulacion.desinstalar()
+
+
+def bench_estadisticas(n=200000):
+    """µs por muestra de EstadisticasMoviles con un día de lecturas (una por segundo)"""
+    import random
+    from estadisticas_moviles import EstadisticasMoviles
+
+    azar = random.Random(0)
+    muestras = [(i * 1.0, azar.gauss(22, 1), azar.gauss(45, 3)) for i in range(n)]
+    estadisticas = EstadisticasMoviles()
+    inicio = time.perf_counter()
+    for ts, temperatura, humedad in muestras:
+        estadisticas.agregar(ts, temperatura, humedad)
+    duracion = time.perf_counter() - inicio
+    return {
+        "us_por_muestra": duracion / n * 1e6,
+        "muestras_por_s": n / duracion,
+        "anillo_bytes": estadisticas.memoria(),
+    }
+
+
+def bench_adquisicion(n=50, intervalo=0.01, salida=0.02):
+    """
+    Intervalo (ms) entre muestras cuando mostrar cada una cuesta `salida` s, más que
+    el intervalo de muestreo: en línea la salida atrasa la lectura; con el anillo no
+    """
+    from anillo_compartido import Lector, detener_adquisicion, iniciar_adquisicion
+
+    modelo = simulador.ModeloSensor(latencia=0.002, fallos=0, semilla=0)
+
+    def leer():
+        return modelo.medir(17, "DHT11")
+
+    def intervalos(instantes):
+        pasos = [(b - a) * 1000 for a, b in zip(instantes, instantes[1:])]
+        return statistics.mean(pasos), _percentil(pasos, 0.99)
+
+    instantes = []
+    for _ in range(n):
+        leer()
+        instantes.append(time.time())
+        time.sleep(salida)          # Salida lenta en el mismo bucle
+        time.sleep(intervalo)
+    resultados = {}
+    resultados["en_linea_ms_medio"], resultados["en_linea_ms_p99"] = intervalos(instantes)
+
+    proceso, anillo = iniciar_adquisicion(leer, intervalo, nombre=f"bench_{os.getpid()}")
+    try:
+        lector = Lector(anillo)
+        instantes = []
+        while len(instantes) < n:
+            for muestra in lector.nuevas():
+                instantes.append(muestra.instante)
+                time.sleep(salida)  # El consumidor se atrasa; el productor sigue
+            time.sleep(intervalo / 10)
+    finally:
+        detener_adquisicion(proceso, anillo)
+    resultados["anillo_ms_medio"], resultados["anillo_ms_p99"] = intervalos(instantes[:n])
+    resultados["anillo_perdidas"] = lector.perdidas
+    return resultados
+
+
+def bench_archivo(n=50000, ruta=None):
+    """Bytes por lectura y lecturas por segundo al escribir y leer un archivo columnar"""
+    import random
+    import tempfile
+    import archivo_columnar
+
+    modelo = simulador.ModeloSensor(latencia=0, fallos=0.02, semilla=0)
+    azar = random.Random(0)
+    lecturas = []
+    for i in range(n):
+        try:
+            temperatura, humedad = modelo.medir(17, "DHT11")
+        except RuntimeError:
+            temperatura = humedad = None
+        lecturas.append((1.7e9 + i * 5 + azar.gauss(0, 0.01), temperatura, humedad))
+    ruta = ruta or os.path.join(tempfile.gettempdir(), f"bench_{os.getpid()}.dhtc")
+    try:
+        inicio = time.perf_counter()
+        escritor = archivo_columnar.EscritorArchivo(ruta)
+        for lectura in lecturas:
+            escritor.agregar(*lectura)
+        escritor.cerrar()
+        resultados = {"codificar_por_s": n / (time.perf_counter() - inicio),
+                      "bytes_por_lectura": os.path.getsize(ruta) / n}
+        archivo = archivo_columnar.ArchivoColumnar(ruta)
+        inicio = time.perf_counter()
+        for _ in archivo.leer_rango():
+            pass
+        resultados["decodificar_por_s"] = n / (time.perf_counter() - inicio)
+        if archivo_columnar._numpy() is not None:
+            inicio = time.perf_counter()
+            archivo.leer_numpy()
+            resultados["decodificar_numpy_por_s"] = n / (time.perf_counter() - inicio)
+        archivo.cerrar()
+        return resultados
+    finally:
+        os.unlink(ruta)
+
+
+def bench_proporcional(canales=48, periodo=0.25, ventanas=10, minimo=0.02):
+    """Ciclo útil de muchos canales con un solo temporizador: precisión y uso de CPU"""
+    from control_proporcional import Canal, ControlProporcional
+    from rele_backends import BackendGPIO
+    from rele_bank import RelayBank
+
+    simulacion = simulador.instalar(latencia=0, fallos=0)
+    try:
+        banco = RelayBank(BackendGPIO(simulacion.gpio, list(range(100, 100 + canales))))
+        banco.configurar()
+        lista = [Canal(n, (n % 10) / 10 + 0.05, periodo, minimo) for n in range(1, canales + 1)]
+        tramos, desde = [], {}      # Tramos encendidos: (rele, inicio, fin)
+
+        def al_conmutar(cambios):
+            ahora = time.monotonic()
+            for n, activo in cambios.items():
+                if activo:
+                    desde[n] = ahora
+                else:
+                    tramos.append((n, desde.pop(n), ahora))
+
+        control = ControlProporcional(banco, lista, al_conmutar=al_conmutar)
+        cpu = time.process_time()
+        inicio = time.monotonic()
+        control.iniciar()
+        # La primera ventana de cada canal arranca desfasada: se mide desde que empezaron
+        # todas, sobre un número entero de ventanas
+        time.sleep(periodo * (ventanas + 1.5))
+        control.detener()
+        cpu = time.process_time() - cpu
+        desde_medicion = inicio + periodo
+        hasta_medicion = desde_medicion + periodo * ventanas
+        tramos.extend((n, instante, hasta_medicion) for n, instante in desde.items())
+        encendido = {}
+        for n, a, b in tramos:
+            tramo = min(b, hasta_medicion) - max(a, desde_medicion)
+            encendido[n] = encendido.get(n, 0.0) + max(0.0, tramo)
+        errores = [abs(encendido.get(c.rele, 0.0) / (periodo * ventanas) - c.ciclo)
+                   for c in lista]
+        media, maximo = control.temporizador.resumen()
+        banco.cerrar()
+        return {
+            "jitter_medio_ms": media * 1000,
+            "jitter_max_ms": maximo * 1000,
+            "error_ciclo_max": max(errores),
+            "cpu_fraccion": cpu / (periodo * (ventanas + 1.5)),
+            "escrituras_por_conmutacion": control.escrituras / max(1, control.conmutaciones),
+        }
+    finally:
+        simulacion.desinstalar()
+
+
+def bench_botones(n=100, rebotes=4, antirrebote=0.02):
+    """Latencia flanco → relé escrito (pulsaciones con rebotes) y acciones erróneas"""
+    import threading
+    from botones import Boton, Botonera
+    from rele_backends import BackendGPIO
+    from rele_bank import RelayBank
+
+    simulacion = simulador.instalar(latencia=0, fallos=0)
+    gpio = simulacion.gpio
+    try:
+        banco = RelayBank(BackendGPIO(gpio, [2, 3]))
+        banco.configurar()
+        hecho = threading.Event()
+        fin = []
+
+        def ejecutar(comando):
+            cambiados = banco.alternar(1)
+            fin.append(time.perf_counter())
+            hecho.set()
+            return cambiados
+
+        botonera = Botonera(gpio, [Boton(5, "toggle1", antirrebote=antirrebote)], ejecutar)
+        botonera.configurar()
+        latencias = []
+        for _ in range(n):
+            hecho.clear()
+            inicio = time.perf_counter()
+            gpio.pulsar(5, duracion=antirrebote * 2, rebotes=rebotes, intervalo_rebote=0.0002)
+            if hecho.wait(1.0):
+                latencias.append(fin[-1] - inicio)
+            time.sleep(antirrebote * 2)     # Fin de la ventana del flanco de soltar
+        botonera.cerrar()
+        banco.cerrar()
+        return {
+            "latencia_p50_us": _percentil(latencias, 0.5) * 1e6,
+            "latencia_p99_us": _percentil(latencias, 0.99) * 1e6,
+            "latencia_callback_p50_us": _percentil(botonera.latencias, 0.5) * 1e6,
+            "acciones_de_mas": botonera.acciones - n,
+            "rebotes_descartados": botonera.rebotes,
+        }
+    finally:
+        simulacion.desinstalar()
+
+
+def bench_decodificador(n=5000, jitter_ns=5000):
+    """Tramas sintéticas con jitter de temporización: velocidad y tasa de éxito"""
+    import random
+    import dht11_nativo
+
+    azar = random.Random(0)
+    esperados = [(azar.randint(0, 50), azar.randint(20, 90)) for _ in range(n)]
+    tramas = [simulador.trama_dht(t, h, jitter_ns=jitter_ns, azar=azar) for t, h in esperados]
+    inicio = time.perf_counter()
+    altas = [dht11_nativo.duraciones_altas(flancos) for flancos in tramas]
+    correctas = 0
+    for duraciones, esperado in zip(altas, esperados):
+        try:
+            correctas += dht11_nativo.decodificar(duraciones) == esperado
+        except RuntimeError:
+            pass
+    resultados = {"tramas_por_s": n / (time.perf_counter() - inicio),
+                  "tasa_exito": correctas / n}
+    if dht11_nativo._numpy() is not None:
+        matriz = [duraciones[-40:] for duraciones in altas]
+        inicio = time.perf_counter()
+        dht11_nativo.decodificar_lote(matriz)
+        resultados["lote_por_s"] = n / (time.perf_counter() - inicio)
+    return resultados
+
+
+def bench_resistencia(n=2000000, colgar_cada=250000, timeout=0.05, puntos=20):
+    """RSS del bucle continuo (vigilancia, latido, serie y estadísticas) en una corrida larga"""
+    import tempfile
+    from dht11_modern import leer_sensor_moderno
+    from estadisticas_moviles import EstadisticasMoviles
+    from reintentos import politica_para
+    from serie_tiempo import SerieTiempo
+    from vigilancia import Latido, LecturaVigilada, rss_kb
+
+    if rss_kb() is None:
+        return {}
+    simulacion = simulador.instalar(latencia=0, fallos=0.05, semilla=0, retencion=0)
+    ruta = os.path.join(tempfile.gettempdir(), f"bench_{os.getpid()}.latido")
+    try:
+        import adafruit_dht
+
+        # Política propia, como la de dht11_modern pero sin intervalo mínimo
+        clave = ("moderna", "resistencia")
+        politica_para(clave, intervalo_minimo=0, jitter=0)
+        accesos = 0
+
+        class DriverColgable(adafruit_dht.DHT11):
+            """Se cuelga dentro de la llamada al driver (con el lock de la política tomado)"""
+
+            @property
+            def temperature(self):
+                nonlocal accesos
+                accesos += 1
+                if accesos % colgar_cada == 0:
+                    time.sleep(timeout * 3)
+                return super().temperature
+
+        vigilada = LecturaVigilada(DriverColgable(17),
+                                   lambda dht: leer_sensor_moderno(dht, "resistencia"),
+                                   lambda: DriverColgable(17), timeout, clave_politica=clave)
+        latido = Latido(ruta, timeout, vigilada)
+        serie, estadisticas = SerieTiempo(), EstadisticasMoviles()
+        calentamiento = n // 10
+        paso = (n - calentamiento) // puntos
+        muestras = []           # (muestra, rss_kb) después de calentar
+        with contextlib.redirect_stdout(io.StringIO()) as salida:
+            inicio = time.perf_counter()
+            for i in range(n):
+                if i >= calentamiento and (i - calentamiento) % paso == 0:
+                    salida.seek(0)
+                    salida.truncate()
+                    muestras.append((i, rss_kb()))
+                temperatura, humedad = vigilada.leer()
+                latido.marcar(temperatura is not None)
+                if temperatura is not None:
+                    # Una muestra cada 5 s simulados: los niveles agregados se llenan
+                    serie.agregar(i * 5.0, temperatura, humedad)
+                    estadisticas.agregar(i * 5.0, temperatura, humedad)
+            duracion = time.perf_counter() - inicio
+        time.sleep(timeout * 3)     # Los hilos abandonados terminan al volver el driver
+        muestras.append((n, rss_kb()))
+        pendiente = statistics.linear_regression([m for m, _ in muestras],
+                                                 [r for _, r in muestras]).slope
+        latido.cerrar()
+        return {
+            "lecturas_por_s": n / duracion,
+            "rss_inicial_kb": muestras[0][1],
+            "rss_final_kb": muestras[-1][1],
+            "rss_pendiente_kb_por_millon": pendiente * 1e6,
+            "timeouts": vigilada.timeouts,
+            "reinicios": vigilada.reinicios,
+            "hilos_colgados": sum(hilo.is_alive() for hilo in vigilada.colgados),
+        }
+    finally:
+        simulacion.desinstalar()
+        if os.path.exists(ruta):
+            os.unlink(ruta)
+
+
+BENCHMARKS = {
+    "conmutacion": bench_conmutacion,
+    "despacho": bench_despacho,
+    "lecturas": bench_lecturas,
+    "memoria": bench_memoria,
+    "estadisticas": bench_estadisticas,
+    "adquisicion": bench_adquisicion,
+    "archivo": bench_archivo,
+    "proporcional": bench_proporcional,
+    "botones": bench_botones,
+    "decodificador": bench_decodificador,
+    "resistencia": bench_resistencia,
+}
+
+
+def commit_actual():
+    """Hash corto del commit actual (None fuera de un repositorio git)"""
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return salida.stdout.strip() or None
+
+
+def ejecutar_suite(nombres=SUITE):
+    """Ejecuta los benchmarks indicados y devuelve el informe como dict"""
+    informe = {
+        "commit": commit_actual(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "resultados": {},
+    }
+    for nombre in nombres:
+        inicio = time.perf_counter()
+        informe["resultados"][nombre] = BENCHMARKS[nombre]()
+        print(f"⏱️  {nombre}: {time.perf_counter() - inicio:.1f} s", file=sys.stderr)
+    return informe
+
+
+def mostrar_informe(informe, anterior=None):
+    """Muestra los resultados; con `anterior`, la variación porcentual de cada métrica"""
+    print("=" * 70)
+    print(f"📊 Benchmarks simulados - commit {informe['commit']} - Python {informe['python']}")
+    if anterior is not None:
+        print(f"   comparado con commit {anterior.get('commit')} ({anterior.get('fecha')})")
+    print("=" * 70)
+    for nombre, metricas in informe["resultados"].items():
+        print(f"{nombre}:")
+        previas = (anterior or {}).get("resultados", {}).get(nombre, {})
+        for metrica, valor in metricas.items():
+            linea = f"  {metrica:38} {valor:14.2f}"
+            previo = previas.get(metrica)
+            if previo:
+                variacion = (valor - previo) / abs(previo) * 100
+                mejor = variacion >= 0 if metrica.endswith(MAYOR_ES_MEJOR) else variacion <= 0
+                linea += f"  {'🟢' if mejor else '🔴'} {variacion:+.1f}%"
+            print(linea)
+
+
+def mostrar_ayuda():
+    """Muestra la ayuda del programa"""
+    print("Uso: python bench_simulado.py [BENCHMARK ...] [OPCIONES]")
+    print()
+    print(f"Benchmarks: {', '.join(SUITE)} (por defecto, todos)")
+    print()
+    print("Opciones:")
+    print("  --json ARCHIVO      Guarda los resultados en JSON ('-' = salida estándar)")
+    print("  --comparar ARCHIVO  Muestra la variación respecto de un JSON anterior")
+    print("  --help, -h          Muestra esta ayuda")
+    print()
+    print("Ejemplos:")
+    print("  python bench_simulado.py --json bench_$(git rev-parse --short HEAD).json")
+    print("  python bench_simulado.py lecturas --comparar bench_anterior.json")
+
+
+def main():
+    """Función principal"""
+    argumentos = sys.argv[1:]
+    if "--help" in argumentos or "-h" in argumentos:
+        mostrar_ayuda()
+        return
+
+    archivos = {"--json": None, "--comparar": None}
+    for opcion in archivos:
+        if opcion in argumentos:
+            i = argumentos.index(opcion)
+            if i + 1 >= len(argumentos):
+                print(f"Falta el archivo de {opcion}. Usa --help para ver las opciones")
+                sys.exit(1)
+            archivos[opcion] = argumentos[i + 1]
+            del argumentos[i:i + 2]
+    desconocidos = [a for a in argumentos if a not in BENCHMARKS]
+    if desconocidos:
+        print(f"Benchmark desconocido: {', '.join(desconocidos)}. Usa --help para ver las opciones")
+        sys.exit(1)
+
+    anterior = None
+    if archivos["--comparar"]:
+        try:
+            with open(archivos["--comparar"], encoding="utf-8") as f:
+                anterior = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ No se pudo leer {archivos['--comparar']}: {e}")
+            sys.exit(1)
+
+    informe = ejecutar_suite(argumentos or SUITE)
+    if archivos["--json"] == "-":
+        json.dump(informe, sys.stdout, indent=2)
+        print()
+        return
+    mostrar_informe(informe, anterior)
+    if archivos["--json"]:
+        with open(archivos["--json"], "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2)
+        print(f"💾 Resultados guardados en {archivos['--json']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Entradas físicas (pulsadores, fines de carrera) mapeadas a comandos de relés
+Cada entrada usa detección de flancos de RPi.GPIO (callback en el hilo de eventos, sin
+sondeo) con antirrebote por software:
+- El primer flanco que cambia el nivel estable se acepta al instante y el comando se
+  ejecuta en el mismo callback: la latencia es la del hilo de eventos más una escritura.
+- Durante la ventana de antirrebote se ignoran los flancos siguientes (rebotes del
+  contacto). Al cerrarse la ventana se vuelve a leer el pin: si quedó en otro nivel
+  (p.ej. una pulsación más corta que la ventana) se acepta ese cambio.
+Se mide la latencia desde el callback del flanco hasta que el relé quedó escrito.
+
+Entrada (activa en bajo con pull-up por defecto: el botón conecta el pin a GND):
+    Boton(5, "toggle1")                      alterna el relé 1 al presionar
+    Boton(6, "on2", al_soltar="off2")        relé 2 activado mientras se presiona
+    Boton(13, "offall")                      fin de carrera: apaga todo al cerrarse
+"""
+import collections
+import threading
+import time
+
+import metricas
+from temporizador import Temporizador
+
+ANTIRREBOTE = 0.05      # Segundos en que se ignoran los rebotes después de un cambio
+
+LATENCIA = metricas.histograma("boton_latencia_segundos",
+                               "Latencia desde el flanco hasta la conmutación del relé",
+                               ("pin",), limites=metricas.LIMITES_ESCRITURA)
+REBOTES = metricas.contador("boton_rebotes_total",
+                            "Flancos descartados por el antirrebote", ("pin",))
+PULSACIONES = metricas.contador("boton_pulsaciones_total",
+                                "Cambios de nivel aceptados de cada entrada", ("pin",))
+
+
+class Boton:
+    """Entrada GPIO con el comando que dispara al presionar (y opcionalmente al soltar)"""
+
+    def __init__(self, pin, al_presionar, al_soltar=None, antirrebote=ANTIRREBOTE,
+                 activo_bajo=True):
+        if antirrebote < 0:
+            raise ValueError(f"Antirrebote inválido para el GPIO{pin}: {antirrebote}")
+        self.pin = pin
+        self.al_presionar = al_presionar
+        self.al_soltar = al_soltar
+        self.antirrebote = antirrebote
+        self.activo_bajo = activo_bajo
+        self.presionado = False     # Último nivel aceptado
+        self._bloqueado = False     # Dentro de la ventana de antirrebote
+        self._m_latencia = LATENCIA.etiquetar(pin)
+        self._m_rebotes = REBOTES.etiquetar(pin)
+        self._m_pulsaciones = PULSACIONES.etiquetar(pin)
+
+    def comando(self, presionado):
+        """Comando para un cambio de nivel (None = nada que hacer)"""
+        return self.al_presionar if presionado else self.al_soltar
+
+
+class Botonera:
+    """Conecta las entradas al banco de relés con callbacks de flanco y antirrebote"""
+
+    def __init__(self, gpio, botones, ejecutar, al_accion=None, temporizador=None,
+                 muestras=1024):
+        """
+        gpio: RPi.GPIO (o el simulado); botones: lista de Boton
+        ejecutar(comando): aplica un comando de relés (p.ej. "toggle1") sin imprimir
+        al_accion(boton, comando, resultado): se llama después, fuera de la medición
+        muestras: latencias recientes que se guardan para los percentiles del resumen
+        """
+        self.gpio = gpio
+        self.botones = {}
+        for boton in botones:
+            if boton.pin in self.botones:
+                raise ValueError(f"GPIO{boton.pin} repetido")
+            self.botones[boton.pin] = boton
+        self.ejecutar = ejecutar
+        self.al_accion = al_accion
+        self.temporizador = temporizador or Temporizador(nombre="antirrebote")
+        self._lock = threading.Lock()
+        self.latencias = collections.deque(maxlen=muestras)
+        self.acciones = 0
+        self.rebotes = 0
+
+    def _presionado(self, boton):
+        nivel = self.gpio.input(boton.pin)
+        return (nivel == self.gpio.LOW) if boton.activo_bajo else (nivel == self.gpio.HIGH)
+
+    def configurar(self):
+        """Configura las entradas con pull y detección de ambos flancos"""
+        for boton in self.botones.values():
+            pull = self.gpio.PUD_UP if boton.activo_bajo else self.gpio.PUD_DOWN
+            self.gpio.setup(boton.pin, self.gpio.IN, pull_up_down=pull)
+            boton.presionado = self._presionado(boton)
+            self.gpio.add_event_detect(boton.pin, self.gpio.BOTH, callback=self._flanco)
+        self.temporizador.iniciar()
+
+    def _flanco(self, pin):
+        """Callback de RPi.GPIO (hilo de eventos)"""
+        inicio = time.perf_counter()
+        boton = self.botones.get(pin)
+        if boton is None:
+            return
+        with self._lock:
+            if boton._bloqueado:
+                self.rebotes += 1
+                boton._m_rebotes.inc()
+                return
+            presionado = self._presionado(boton)
+            if presionado == boton.presionado:
+                return          # Rebote que ya volvió al nivel estable
+            self._aceptar(boton, presionado)
+        self._despachar(boton, presionado, inicio)
+
+    def _aceptar(self, boton, presionado):
+        """Nuevo nivel estable; abre la ventana de antirrebote (con el lock tomado)"""
+        boton.presionado = presionado
+        boton._m_pulsaciones.inc()
+        if boton.antirrebote > 0:
+            boton._bloqueado = True
+            self.temporizador.programar_en(boton.antirrebote, self._fin_antirrebote, boton)
+
+    def _fin_antirrebote(self, boton):
+        """Cierra la ventana y acepta el nivel final si cambió (hilo del temporizador)"""
+        inicio = time.perf_counter()
+        with self._lock:
+            boton._bloqueado = False
+            presionado = self._presionado(boton)
+            if presionado == boton.presionado:
+                return
+            self._aceptar(boton, presionado)
+        self._despachar(boton, presionado, inicio)
+
+    def _despachar(self, boton, presionado, inicio):
+        comando = boton.comando(presionado)
+        if comando is None:
+            return
+        try:
+            resultado = self.ejecutar(comando)
+        except Exception as e:
+            print(f"❌ Error en el comando '{comando}' del GPIO{boton.pin}: {e}")
+            return
+        latencia = time.perf_counter() - inicio
+        # Se llega desde el hilo de eventos y desde el del temporizador
+        with self._lock:
+            boton._m_latencia.observar(latencia)
+            self.latencias.append(latencia)
+            self.acciones += 1
+        if self.al_accion is not None:
+            self.al_accion(boton, comando, resultado)
+
+    def cerrar(self):
+        """Quita la detección de flancos, libera las entradas y detiene el temporizador"""
+        for pin in self.botones:
+            self.gpio.remove_event_detect(pin)
+        self.gpio.cleanup(list(self.botones))
+        self.temporizador.detener()
+
+    def resumen(self):
+        """Texto con acciones, rebotes descartados y percentiles de latencia"""
+        with self._lock:
+            texto = f"{self.acciones} acciones, {self.rebotes} rebotes descartados"
+            ordenadas = sorted(self.latencias)
+        if not ordenadas:
+            return texto
+        p50 = ordenadas[len(ordenadas) // 2]
+        p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+        return (f"{texto} - latencia p50 {p50 * 1e6:.0f} µs, p99 {p99 * 1e6:.0f} µs, "
+                f"máx {ordenadas[-1] * 1e6:.0f} µs")
+
+
+def parsear_botones(texto, antirrebote=ANTIRREBOTE):
+    """Lista de Boton de "5=toggle1,6=on2/off2" (PIN=AL_PRESIONAR[/AL_SOLTAR])"""
+    botones = []
+    for parte in texto.split(","):
+        pin, separador, comandos = parte.partition("=")
+        if not separador or not pin.isdigit() or not comandos:
+            raise ValueError(f"entrada no válida '{parte}' (usa PIN=COMANDO[/COMANDO])")
+        al_presionar, _, al_soltar = comandos.partition("/")
+        botones.append(Boton(int(pin), al_presionar, al_soltar or None, antirrebote))
+    return botones
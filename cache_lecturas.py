@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Caché read-through de lecturas del DHT11 para muchos consumidores
+El DHT11 no se puede leer más de una vez por segundo: en lugar de que cada hilo o
+proceso lea el sensor por su cuenta (y choquen en el bus), todos pasan por la caché.
+- TTL configurable: dentro del TTL se devuelve el valor guardado
+- stale-while-revalidate: pasado el TTL se devuelve el valor viejo al instante y se
+  refresca en segundo plano; pasados TTL + OBSOLETO, si la lectura falla no hay dato
+- single-flight: si varios piden a la vez, una sola lectura física los atiende a todos
+  (entre procesos, con un archivo compartido y flock)
+- cada lectura devuelta informa su edad en segundos
+"""
+import collections
+import fcntl
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+TTL = 2.0            # Segundos en que una lectura se considera fresca
+OBSOLETO = 30.0      # Segundos adicionales en que se sirve vieja mientras se refresca
+
+# Archivo compartido: instante (time.time), temperatura, humedad
+FORMATO = struct.Struct("<ddd")
+
+Lectura = collections.namedtuple("Lectura", "temperatura humedad edad")
+
+
+class CacheLecturas:
+    """Caché de un sensor con TTL, stale-while-revalidate y single-flight"""
+
+    def __init__(self, leer, ttl=TTL, obsoleto=OBSOLETO, ruta=None, reloj=time.time):
+        """
+        leer: función sin argumentos que devuelve (temperatura, humedad) o (None, None)
+        ruta: archivo para compartir la caché entre procesos (None = solo este proceso)
+        """
+        self._leer = leer
+        self.ttl = ttl
+        self.obsoleto = obsoleto
+        self.ruta = ruta
+        self.reloj = reloj
+        self._valor = None                  # (instante, temperatura, humedad)
+        self._lock = threading.Lock()
+        self._en_vuelo = None               # Event de la lectura física en curso
+        self.aciertos = 0
+        self.obsoletas = 0
+        self.lecturas_fisicas = 0
+
+    # --- Almacenamiento compartido entre procesos ---
+
+    def _cargar_compartido(self):
+        """Trae el valor del archivo compartido si es más nuevo que el local"""
+        if self.ruta is None:
+            return
+        try:
+            with open(self.ruta, "rb") as f:
+                datos = f.read(FORMATO.size)
+        except OSError:
+            return
+        if len(datos) == FORMATO.size:
+            valor = FORMATO.unpack(datos)
+            ahora = self.reloj()
+            # Un registro con fecha futura (reloj atrasado o archivo ajeno) no es "más nuevo"
+            if valor[0] > ahora:
+                return
+            if self._valor is None or self._valor[0] > ahora or valor[0] > self._valor[0]:
+                self._valor = valor
+
+    def _guardar_compartido(self, valor):
+        """Escribe el valor de forma atómica (archivo temporal + rename)"""
+        temporal = f"{self.ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(FORMATO.pack(*valor))
+        os.replace(temporal, self.ruta)
+
+    # --- Lectura ---
+
+    def _edad(self):
+        """Edad del valor guardado; None si no hay o si el reloj retrocedió (vencido)"""
+        if self._valor is None:
+            return None
+        edad = self.reloj() - self._valor[0]
+        return edad if edad >= 0 else None
+
+    def _refrescar(self):
+        """Lectura física (solo la ejecuta el hilo líder del single-flight)"""
+        archivo_lock = None
+        try:
+            if self.ruta is not None:
+                # Un solo proceso lee; los demás esperan el lock y reutilizan su valor
+                archivo_lock = open(self.ruta + ".lock", "a")
+                fcntl.flock(archivo_lock, fcntl.LOCK_EX)
+                with self._lock:
+                    self._cargar_compartido()
+                    edad = self._edad()
+                if edad is not None and edad < self.ttl:
+                    return
+
+            temperatura, humedad = self._leer()
+            self.lecturas_fisicas += 1
+            if temperatura is None or humedad is None:
+                return
+            valor = (self.reloj(), temperatura, humedad)
+            with self._lock:
+                self._valor = valor
+            if self.ruta is not None:
+                self._guardar_compartido(valor)
+        finally:
+            if archivo_lock is not None:
+                archivo_lock.close()      # Libera el flock
+            with self._lock:
+                evento, self._en_vuelo = self._en_vuelo, None
+            evento.set()
+
+    def _iniciar_vuelo(self):
+        """Marca una lectura en curso; devuelve (evento, es_lider). Requiere _lock"""
+        if self._en_vuelo is not None:
+            return self._en_vuelo, False
+        self._en_vuelo = threading.Event()
+        return self._en_vuelo, True
+
+    def obtener(self):
+        """
+        Devuelve Lectura(temperatura, humedad, edad); (None, None, None) si no hay dato
+        o el único que hay es más viejo que ttl + obsoleto y el refresco falló
+        """
+        with self._lock:
+            self._cargar_compartido()
+            edad = self._edad()
+            if edad is not None and edad < self.ttl:
+                self.aciertos += 1
+                return Lectura(self._valor[1], self._valor[2], edad)
+
+            evento, lider = self._iniciar_vuelo()
+            if edad is not None and edad < self.ttl + self.obsoleto:
+                # Valor viejo pero aceptable: se sirve ya y se refresca en segundo plano
+                self.obsoletas += 1
+                if lider:
+                    threading.Thread(target=self._refrescar, daemon=True,
+                                     name="cache-dht").start()
+                return Lectura(self._valor[1], self._valor[2], edad)
+
+        if lider:
+            self._refrescar()
+        else:
+            evento.wait()
+        with self._lock:
+            edad = self._edad()
+            # Si el refresco falló, un valor más viejo que ttl + obsoleto no se sirve
+            if edad is None or edad >= self.ttl + self.obsoleto:
+                return Lectura(None, None, None)
+            return Lectura(self._valor[1], self._valor[2], edad)
+
+    def leer(self):
+        """Igual que los lectores de dht11_modern: devuelve (temperatura, humedad)"""
+        lectura = self.obtener()
+        return lectura.temperatura, lectura.humedad
+
+
+def ruta_compartida(gpio=17):
+    """Archivo de caché compartido por defecto para un sensor (en el directorio del usuario)"""
+    directorio = os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir())
+    return os.path.join(directorio, f"dht11_gpio{gpio}.cache")
+
+
+def cache_sensor(dht, pin, biblioteca, ttl=TTL, ruta=None):
+    """Crea una caché sobre un sensor inicializado con dht11_modern"""
+    from dht11_modern import leer_sensor_clasico, leer_sensor_moderno
+    if biblioteca == "moderna":
+        return CacheLecturas(lambda: leer_sensor_moderno(dht, pin), ttl, ruta=ruta)
+    return CacheLecturas(lambda: leer_sensor_clasico(dht, pin), ttl, ruta=ruta)
+
+
+def main():
+    """Lee el sensor a través de la caché compartida entre procesos"""
+    ttl = TTL
+    if len(sys.argv) > 1:
+        if sys.argv[1] in ("--help", "-h"):
+            print("Uso: python cache_lecturas.py [ttl]")
+            print()
+            print("Lee el DHT11 (GPIO17) a través de la caché compartida "
+                  f"{ruta_compartida()}; varios procesos comparten una sola lectura física")
+            return
+        try:
+            ttl = float(sys.argv[1])
+        except ValueError:
+            print(f"TTL inválido, usando {TTL} segundos por defecto")
+
+    from dht11_modern import detectar_biblioteca, inicializar_sensor_clasico, \
+        inicializar_sensor_moderno
+    tipo_biblioteca, dht_module, board_module = detectar_biblioteca()
+    if tipo_biblioteca is None:
+        print("❌ Error: No se encontró ninguna biblioteca DHT")
+        sys.exit(1)
+    if tipo_biblioteca == "moderna":
+        dht, pin = inicializar_sensor_moderno(board_module)
+    else:
+        dht, pin = inicializar_sensor_clasico(dht_module)
+    if dht is None:
+        print("❌ Error: No se pudo inicializar el sensor")
+        sys.exit(1)
+
+    cache = cache_sensor(dht, pin, tipo_biblioteca, ttl, ruta_compartida())
+    lectura = cache.obtener()
+    if lectura.temperatura is None:
+        print("❌ No se pudieron leer los datos del sensor")
+        sys.exit(1)
+    print(f"🌡️  {lectura.temperatura:.1f}°C  💧 {lectura.humedad:.1f}%  "
+          f"(hace {lectura.edad:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Control proporcional en el tiempo (ciclo útil) para relés
+Cada canal tiene una ventana (periodo) y un ciclo útil: con 30% y 60 s el relé queda
+activado 18 s al inicio de cada ventana y desactivado el resto. Sirve para calefactores
+y bombas que solo admiten encendido/apagado.
+
+- Todos los canales comparten un Temporizador (un hilo, un heap de plazos): no hay un
+  hilo ni un bucle con sleep por canal, y entre conmutaciones no se usa CPU.
+- Las ventanas de los canales se desfasan de manera pareja para no conmutar todos los
+  relés a la vez; los cambios que vencen juntos se aplican en una sola escritura.
+- Tiempo mínimo entre conmutaciones (protección de los contactos): un tramo encendido o
+  apagado más corto que el mínimo no se hace. El tiempo que se deja de dar (o se da de
+  más) se arrastra a la ventana siguiente, así el promedio sigue siendo el pedido.
+- Un cambio de ciclo útil rige desde la ventana siguiente.
+"""
+import threading
+import time
+
+from temporizador import Temporizador
+
+PERIODO = 60.0          # Segundos de la ventana por defecto
+MIN_CONMUTACION = 0.0   # Segundos mínimos entre conmutaciones de un relé
+
+
+class Canal:
+    """Ciclo útil de un relé con su ventana y su tiempo mínimo entre conmutaciones"""
+
+    def __init__(self, rele, ciclo=0.0, periodo=PERIODO, min_conmutacion=MIN_CONMUTACION):
+        if periodo <= 0:
+            raise ValueError(f"Periodo inválido para el relé {rele}: {periodo}")
+        if not 0 <= min_conmutacion <= periodo:
+            raise ValueError(f"Tiempo mínimo inválido para el relé {rele}: {min_conmutacion} "
+                             f"(entre 0 y el periodo)")
+        self.rele = rele
+        self.periodo = periodo
+        self.min_conmutacion = min_conmutacion
+        self.ciclo = 0.0
+        self._arrastre = 0.0    # Segundos encendido pedidos y todavía no dados (o de más)
+        self.ajustar(ciclo)
+
+    def ajustar(self, ciclo):
+        """Cambia el ciclo útil (0 a 1)"""
+        if not 0 <= ciclo <= 1:
+            raise ValueError(f"Ciclo útil inválido para el relé {self.rele}: {ciclo} (0 a 1)")
+        self.ciclo = ciclo
+        # El arrastre de un ciclo viejo no debe pesar sobre el nuevo más allá de un tramo
+        limite = self.min_conmutacion
+        self._arrastre = max(-limite, min(limite, self._arrastre))
+
+    def repartir(self):
+        """Segundos encendido en la próxima ventana, respetando el tiempo mínimo"""
+        pedido = self.ciclo * self.periodo + self._arrastre
+        encendido = max(0.0, min(self.periodo, pedido))
+        if encendido < self.min_conmutacion:
+            encendido = 0.0
+        elif self.periodo - encendido < self.min_conmutacion:
+            encendido = self.periodo
+        self._arrastre = pedido - encendido
+        return encendido
+
+
+class ControlProporcional:
+    """Conmuta los relés de varios canales por ciclo útil con un solo temporizador"""
+
+    def __init__(self, banco, canales, temporizador=None, al_conmutar=None):
+        """
+        banco: RelayBank; canales: lista de Canal (un relé por canal)
+        al_conmutar(cambios): se llama con {rele: activo} después de cada escritura
+        """
+        self.banco = banco
+        self.canales = {}
+        for canal in canales:
+            if canal.rele in self.canales:
+                raise ValueError(f"Relé {canal.rele} repetido")
+            self.canales[canal.rele] = canal
+        self.temporizador = temporizador or Temporizador(nombre="proporcional")
+        self.temporizador.al_terminar_tanda = self._vaciar
+        self.al_conmutar = al_conmutar
+        self._lock = threading.Lock()
+        self._pendiente = {}        # Cambios de la tanda en curso
+        self.escrituras = 0
+        self.conmutaciones = 0
+
+    def iniciar(self):
+        """Programa la primera ventana de cada canal (desfasadas) y arranca el temporizador"""
+        inicio = self.temporizador.reloj()
+        total = len(self.canales)
+        for i, canal in enumerate(self.canales.values()):
+            plazo = inicio + canal.periodo * i / total
+            self.temporizador.programar(plazo, self._ventana, canal, plazo)
+        self.temporizador.iniciar()
+
+    def _ventana(self, canal, plazo):
+        """Inicio de una ventana: enciende y programa el apagado y la ventana siguiente"""
+        with self._lock:
+            encendido = canal.repartir()
+        self._pendiente[canal.rele] = encendido > 0
+        if 0 < encendido < canal.periodo:
+            self.temporizador.programar(plazo + encendido, self._apagar, canal)
+        # Plazos absolutos: el atraso de una ventana no se acumula en las siguientes
+        siguiente = plazo + canal.periodo
+        self.temporizador.programar(siguiente, self._ventana, canal, siguiente)
+
+    def _apagar(self, canal):
+        self._pendiente[canal.rele] = False
+
+    def _vaciar(self):
+        """Aplica en una sola escritura los cambios de la tanda"""
+        if not self._pendiente:
+            return
+        cambios, self._pendiente = self._pendiente, {}
+        cambiados = self.banco.aplicar(cambios)
+        if cambiados:
+            self.escrituras += 1
+            self.conmutaciones += len(cambiados)
+            if self.al_conmutar is not None:
+                self.al_conmutar({n: cambios[n] for n in cambiados})
+
+    def ajustar(self, rele, ciclo):
+        """Cambia el ciclo útil de un relé (rige desde su ventana siguiente)"""
+        if rele not in self.canales:
+            raise ValueError(f"El relé {rele} no está en control proporcional")
+        with self._lock:
+            self.canales[rele].ajustar(ciclo)
+
+    def detener(self):
+        """Detiene el temporizador y desactiva los relés controlados"""
+        self.temporizador.detener()
+        self._pendiente = {}
+        self.banco.aplicar({rele: False for rele in self.canales})
+
+    def resumen(self):
+        """Texto con conmutaciones, escrituras y jitter del temporizador"""
+        media, maximo = self.temporizador.resumen()
+        return (f"{self.conmutaciones} conmutaciones en {self.escrituras} escrituras - "
+                f"jitter medio {media * 1000:.2f} ms, máx {maximo * 1000:.2f} ms")
+
+
+def parsear_ciclos(texto):
+    """{rele: ciclo} de "1=30,2=75" (porcentajes); ValueError si no es válido"""
+    ciclos = {}
+    for parte in texto.split(","):
+        rele, separador, porcentaje = parte.partition("=")
+        if not separador:
+            raise ValueError(f"ciclo no válido '{parte}' (usa RELE=PORCENTAJE)")
+        ciclos[int(rele)] = float(porcentaje.rstrip("%")) / 100
+    return ciclos
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Demonio residente para relés y sensor DHT11 con API por socket Unix
+Evita pagar en cada acción el arranque del intérprete, el import de RPi.GPIO y
+configurar_gpio(): el demonio configura el GPIO una sola vez, mantiene el estado de
+los relés aunque los clientes se desconecten y atiende comandos en conexiones
+persistentes, con pipelining (varios comandos sin esperar cada respuesta).
+
+Protocolo: una línea por comando, una línea por respuesta, en el mismo orden.
+    on<N> / off<N> / toggle<N> / onall / offall / toggleall / status
+        → "ok <estados>"  (un 1/0 por relé, p.ej. "ok 10")
+    read   → "ok <temperatura> <humedad> <edad_s>"  (a través de la caché)
+    ping   → "ok pong"
+    metrics → métricas en formato Prometheus, varias líneas terminadas en "# EOF"
+    pulse<N> <duración> / <acción><N> @+<duración> / <acción><N> @HH:MM [días]
+           → "ok <id>"  (tareas programadas persistentes, ver planificador.py)
+    jobs   → "<id> <tarea>" por tarea pendiente, terminadas en "# EOF"
+    cancel <id> → "ok"
+    left<N> → "ok <segundos>" de la cuenta regresiva del relé ("ok -" si no tiene)
+    quit   → cierra la conexión (los relés quedan como están)
+    error  → "err <mensaje>"
+"""
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+
+import metricas
+import rele_demo
+
+RUTA_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir()),
+                           "demoraspberry.sock")
+
+COMANDOS = metricas.contador("demonio_comandos_total", "Comandos atendidos por tipo",
+                             ("comando",))
+CONEXIONES = metricas.medidor("demonio_conexiones", "Clientes conectados")
+
+# Comandos con respuesta de varias líneas (terminada en "# EOF", también si es un error)
+MULTILINEA = ("metrics", "jobs")
+
+
+class Demonio:
+    """Dueño del banco de relés y del sensor; atiende clientes por socket Unix"""
+
+    def __init__(self, banco, cache=None, diario=None):
+        """
+        banco: el de rele_demo (los comandos se aplican con rele_demo.aplicar_comando)
+        diario: ruta del diario de tareas programadas (None = planificador.RUTA_DIARIO)
+        """
+        self.banco = banco
+        self.cache = cache
+        self.diario = diario
+        self.planificador = None
+        self.comandos = 0
+        self._m_comandos = {}
+        self._m_conexiones = CONEXIONES.etiquetar()
+
+    def _estados(self):
+        return "ok " + "".join("1" if activo else "0" for activo in self.banco.estados())
+
+    def ejecutar(self, comando):
+        """Ejecuta un comando de relés (sin prints) y devuelve la respuesta"""
+        if comando != "status":
+            try:
+                rele_demo.aplicar_comando(comando)
+            except Exception as e:
+                return f"err {e}"
+        return self._estados()
+
+    def tarea(self, comando):
+        """Ejecuta un comando de tareas programadas; None si el comando no es de tareas"""
+        from planificador import parsear_tarea
+        if comando == "jobs":
+            return "".join(f"{t.id} {t.describir()}\n"
+                           for t in self.planificador.tareas()) + "# EOF"
+        partes = comando.split()
+        if partes[0] == "cancel":
+            if len(partes) != 2 or not partes[1].isdigit():
+                return "err uso: cancel ID"
+            if not self.planificador.cancelar(int(partes[1])):
+                return f"err no hay tarea {partes[1]}"
+            return "ok"
+        if partes[0].startswith("left") and partes[0][4:].isdigit():
+            restante = self.planificador.restante(int(partes[0][4:]))
+            return "ok -" if restante is None else f"ok {restante:.1f}"
+        try:
+            tarea = parsear_tarea(comando)
+            if tarea is None:
+                return None
+            tipo, accion, rele, argumento = tarea
+            if not 1 <= rele <= len(self.banco):
+                raise ValueError(f"Relé {rele} fuera de rango (1-{len(self.banco)})")
+            if tipo == "pulso":
+                id = self.planificador.pulso(rele, argumento)
+            elif tipo == "cuenta":
+                id = self.planificador.cuenta(rele, accion, argumento)
+            else:
+                id = self.planificador.calendario(rele, accion, *argumento)
+        except (ValueError, OSError) as e:
+            return f"err {e}"
+        return f"ok {id}"
+
+    def _contar(self, comando):
+        """Cuenta el comando por su acción (on/off/toggle/status...), sin el número de relé"""
+        accion = comando.split()[0].rstrip("0123456789")
+        if accion.endswith("all"):
+            accion = accion[:-3]
+        serie = self._m_comandos.get(accion)
+        if serie is None:
+            conocida = accion in rele_demo.ACCIONES_RELE or accion in (
+                "status", "read", "ping", "metrics", "pulse", "jobs", "cancel", "left")
+            serie = self._m_comandos[accion] = COMANDOS.etiquetar(
+                accion if conocida else "invalido")
+        serie.inc()
+
+    async def leer_sensor(self):
+        """Lectura del sensor a través de la caché, fuera del event loop"""
+        if self.cache is None:
+            return "err sin sensor"
+        import asyncio
+        loop = asyncio.get_running_loop()
+        lectura = await loop.run_in_executor(None, self.cache.obtener)
+        if lectura.temperatura is None:
+            return "err lectura fallida"
+        return f"ok {lectura.temperatura:.1f} {lectura.humedad:.1f} {lectura.edad:.2f}"
+
+    async def atender(self, lector, escritor):
+        """Atiende una conexión persistente, respondiendo en orden"""
+        self._m_conexiones.inc()
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                comando = linea.decode(errors="replace").strip().lower()
+                if not comando:
+                    continue
+                if comando == "quit":
+                    break
+                self.comandos += 1
+                self._contar(comando)
+                if comando == "read":
+                    respuesta = await self.leer_sensor()
+                elif comando == "ping":
+                    respuesta = "ok pong"
+                elif comando == "metrics":
+                    respuesta = metricas.exportar() + "# EOF"
+                else:
+                    respuesta = None
+                    if self.planificador is not None:
+                        respuesta = self.tarea(comando)
+                    elif comando == "jobs":
+                        respuesta = "err sin tareas programadas"
+                    if respuesta is None:
+                        respuesta = self.ejecutar(comando)
+                if comando in MULTILINEA and not respuesta.endswith("# EOF"):
+                    # También los errores: el cliente lee hasta el "# EOF"
+                    respuesta += "\n# EOF"
+                # drain() solo espera si el buffer de salida supera su límite
+                escritor.write(respuesta.encode() + b"\n")
+                await escritor.drain()
+        except (ConnectionError, ValueError):    # ValueError: línea demasiado larga
+            pass
+        finally:
+            self._m_conexiones.inc(-1)
+            escritor.close()
+
+    def iniciar_planificador(self, loop):
+        """Carga las tareas del diario; vencen en el hilo del temporizador y se aplican
+        en el event loop, como los comandos de los clientes"""
+        import asyncio
+        from planificador import Planificador, RUTA_DIARIO
+
+        hilo_loop = threading.get_ident()
+
+        async def en_loop(comando):
+            return self.ejecutar(comando)
+
+        def ejecutar(accion, rele):
+            if threading.get_ident() == hilo_loop:
+                self.ejecutar(f"{accion}{rele}")    # pulse: el relé se activa antes de responder
+            else:
+                # Se espera a que el loop lo aplique: el planificador anota la baja después
+                asyncio.run_coroutine_threadsafe(en_loop(f"{accion}{rele}"), loop).result()
+
+        planificador = Planificador(ejecutar, self.diario or RUTA_DIARIO)
+        try:
+            pendientes = planificador.abrir()
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Sin tareas programadas: {e}")
+            return
+        self.planificador = planificador
+        print(f"📅 {pendientes} tareas programadas ({planificador.diario.ruta})")
+
+    async def servir(self, ruta=RUTA_SOCKET):
+        """Escucha en el socket Unix hasta recibir SIGTERM/SIGINT"""
+        import asyncio
+        # start_unix_server borra el socket que encuentre, aunque otro demonio lo atienda
+        if socket_ocupado(ruta):
+            raise RuntimeError(f"Ya hay un demonio atendiendo en {ruta}")
+        servidor = await asyncio.start_unix_server(self.atender, path=ruta)
+        os.chmod(ruta, 0o660)
+        print(f"🛰️  Demonio escuchando en {ruta}")
+        self.iniciar_planificador(asyncio.get_running_loop())
+
+        detener = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for senal in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(senal, detener.set)
+        async with servidor:
+            await detener.wait()
+        if self.planificador is not None:
+            # En otro hilo: una tarea que esté venciendo espera a que el loop la aplique
+            await loop.run_in_executor(None, self.planificador.cerrar)
+        os.unlink(ruta)
+        print(f"\n⏹️  Demonio detenido ({self.comandos} comandos atendidos)")
+
+
+def socket_ocupado(ruta=RUTA_SOCKET):
+    """
+    True si otro demonio atiende en `ruta`. Un socket que rechaza la conexión quedó
+    huérfano de una ejecución anterior y se borra; otros errores (permisos, un archivo
+    que no es un socket) se propagan como OSError.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(ruta)
+        except FileNotFoundError:
+            return False
+        except ConnectionRefusedError:
+            os.unlink(ruta)
+            return False
+    return True
+
+
+def enviar(comandos, ruta=RUTA_SOCKET):
+    """Envía varios comandos en una sola escritura (pipelining) y devuelve las respuestas"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(ruta)
+        s.sendall("".join(c + "\n" for c in comandos).encode())
+        archivo = s.makefile("r")
+        respuestas = []
+        for comando in comandos:
+            respuesta = archivo.readline().rstrip("\n")
+            if comando.strip().lower() in MULTILINEA:
+                # Respuesta de varias líneas: hasta el "# EOF"
+                lineas = [respuesta]
+                while lineas[-1] != "# EOF":
+                    linea = archivo.readline()
+                    if not linea:
+                        break
+                    lineas.append(linea.rstrip("\n"))
+                respuesta = "\n".join(linea for linea in lineas if linea != "# EOF")
+            respuestas.append(respuesta)
+        return respuestas
+
+
+def iniciar_sensor():
+    """Inicializa el DHT11 detrás de una caché; None si no hay biblioteca o sensor"""
+    from cache_lecturas import cache_sensor
+    from dht11_modern import detectar_biblioteca, inicializar_sensor_clasico, \
+        inicializar_sensor_moderno
+    tipo_biblioteca, dht_module, board_module = detectar_biblioteca()
+    if tipo_biblioteca is None:
+        print("⚠️  Sin biblioteca DHT: el comando read no estará disponible")
+        return None
+    if tipo_biblioteca == "moderna":
+        dht, pin = inicializar_sensor_moderno(board_module)
+    else:
+        dht, pin = inicializar_sensor_clasico(dht_module)
+    if dht is None:
+        return None
+    return cache_sensor(dht, pin, tipo_biblioteca)
+
+
+def mostrar_ayuda():
+    """Muestra la ayuda del programa"""
+    print("Uso: python demonio.py [OPCIONES]")
+    print()
+    print("Opciones:")
+    print("  (sin opciones)          Inicia el demonio")
+    print("  --socket RUTA           Ruta del socket Unix (default: " + RUTA_SOCKET + ")")
+    print("  --metrics ARCHIVO       Escribe las métricas Prometheus en ARCHIVO cada 15 s")
+    print("  --jobs ARCHIVO          Diario de tareas programadas (default: "
+          "~/.local/state/demoraspberry/tareas.diario)")
+    print("  --send CMD [CMD ...]    Envía comandos a un demonio en marcha")
+    print("  --help, -h              Muestra esta ayuda")
+    print()
+    print("Ejemplos:")
+    print("  python demonio.py &")
+    print("  python demonio.py --send on1 status read")
+    print("  python demonio.py --send metrics")
+    print("  python demonio.py --send 'pulse2 90s' 'on1 @07:30 lun-vie' jobs")
+    print("  printf 'on1\\noff2\\nstatus\\n' | socat - UNIX-CONNECT:" + RUTA_SOCKET)
+
+
+def main():
+    """Función principal"""
+    argumentos = sys.argv[1:]
+    rutas = {"--socket": RUTA_SOCKET, "--metrics": None, "--jobs": None}
+    for opcion in rutas:
+        if opcion in argumentos:
+            i = argumentos.index(opcion)
+            if i + 1 >= len(argumentos):
+                print(f"Falta la ruta de {opcion}. Usa --help para ver las opciones")
+                sys.exit(1)
+            rutas[opcion] = argumentos[i + 1]
+            del argumentos[i:i + 2]
+    ruta = rutas["--socket"]
+
+    if argumentos and argumentos[0] in ("--help", "-h"):
+        mostrar_ayuda()
+        return
+    if argumentos and argumentos[0] == "--send":
+        try:
+            for respuesta in enviar(argumentos[1:], ruta):
+                print(respuesta)
+        except OSError as e:
+            print(f"❌ No se pudo conectar con el demonio en {ruta}: {e}")
+            sys.exit(1)
+        return
+    if argumentos:
+        print("Argumento no reconocido. Usa --help para ver las opciones")
+        sys.exit(1)
+
+    print("🛰️  Demonio DHT11 + Relés")
+    print("=" * 40)
+    # Antes de tocar el GPIO: configurar_gpio() apagaría los relés del demonio en marcha
+    try:
+        if socket_ocupado(ruta):
+            print(f"❌ Ya hay un demonio atendiendo en {ruta}")
+            sys.exit(1)
+    except OSError as e:
+        print(f"❌ No se puede usar el socket {ruta}: {e}")
+        sys.exit(1)
+    if not rele_demo.configurar_gpio():
+        sys.exit(1)
+    import asyncio    # Solo el servidor: el cliente (--send) arranca sin cargar asyncio
+    if rutas["--metrics"]:
+        metricas.exportar_periodicamente(rutas["--metrics"])
+    try:
+        demonio = Demonio(rele_demo.banco, iniciar_sensor(), rutas["--jobs"])
+        asyncio.run(demonio.servir(ruta))
+    finally:
+        rele_demo.limpiar_gpio()
+        if rutas["--metrics"]:
+            metricas.escribir(rutas["--metrics"])
+
+
+if __name__ == "__main__":
+    main()
@@ -4,47 +4,99 @@ Demo moderno para sensor DHT11 en Raspberry Pi usando Adafruit CircuitPython
 Basado en: https://randomnerdtutorials.com/raspberry-pi-dht11-dht22-python/
 Conectado al Pin 11 (GPIO17)
 """
+import os
 import time
 import sys
 
-def detectar_biblioteca():
-    """Detecta qué biblioteca DHT está disponible"""
-    try:
+import metricas
+from estadisticas_moviles import EstadisticasMoviles, formatear
+from filtros import CORREGIDA, RECHAZADA, FiltroLecturas
+from registro_binario import RegistroBinario
+from reintentos import INTERVALO_MINIMO, INTERVALOS_MINIMOS, politica_para
+from serie_tiempo import SerieTiempo
+from vigilancia import TIMEOUT_LECTURA, Latido, LecturaVigilada
+
+# Biblioteca detectada en ejecuciones anteriores: se prueba primero la que funcionó
+CACHE_BIBLIOTECA = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "demoraspberry", "biblioteca_dht")
+
+_biblioteca = None    # Resultado de detectar_biblioteca() en este proceso
+
+def _importar_biblioteca(tipo):
+    """Importa los drivers de una biblioteca; lanza ImportError si no está"""
+    if tipo == "moderna":
         import adafruit_dht
         import board
         return "moderna", adafruit_dht, board
-    except ImportError:
-        try:
-            import Adafruit_DHT
-            return "clasica", Adafruit_DHT, None
-        except ImportError:
-            return None, None, None
+    import Adafruit_DHT
+    return "clasica", Adafruit_DHT, None
 
-def leer_sensor_moderno(dht, pin):
-    """Lee los datos usando la biblioteca moderna"""
+def _leer_cache_biblioteca():
+    """Biblioteca guardada para este intérprete (sys.prefix), o None"""
     try:
-        temperatura = dht.temperature
-        humedad = dht.humidity
-        
-        if temperatura is not None and humedad is not None:
-            return temperatura, humedad
-        else:
-            return None, None
-    except Exception as e:
-        print(f"❌ Error al leer sensor moderno: {e}")
-        return None, None
+        with open(CACHE_BIBLIOTECA, encoding="utf-8") as f:
+            tipo, prefijo = f.read().split("\n")[:2]
+    except (OSError, ValueError):
+        return None
+    return tipo if prefijo == sys.prefix else None
 
-def leer_sensor_clasico(dht, pin):
-    """Lee los datos usando la biblioteca clásica"""
+def _guardar_cache_biblioteca(tipo):
     try:
-        humedad, temperatura = dht.read_retry(dht.DHT11, pin)
-        if humedad is not None and temperatura is not None:
-            return temperatura, humedad
-        else:
-            return None, None
-    except Exception as e:
-        print(f"❌ Error al leer sensor clásico: {e}")
-        return None, None
+        os.makedirs(os.path.dirname(CACHE_BIBLIOTECA), exist_ok=True)
+        with open(CACHE_BIBLIOTECA, "w", encoding="utf-8") as f:
+            f.write(f"{tipo}\n{sys.prefix}\n")
+    except OSError:
+        pass    # Sin caché en disco solo se pierde el atajo de la próxima ejecución
+
+def detectar_biblioteca():
+    """Detecta qué biblioteca DHT está disponible (importa los drivers solo aquí)"""
+    global _biblioteca
+    if _biblioteca is not None:
+        return _biblioteca
+
+    orden = ["moderna", "clasica"]
+    guardada = _leer_cache_biblioteca()
+    if guardada in orden:
+        orden.remove(guardada)
+        orden.insert(0, guardada)
+    for tipo in orden:
+        try:
+            _biblioteca = _importar_biblioteca(tipo)
+        except ImportError:
+            continue
+        if tipo != guardada:
+            _guardar_cache_biblioteca(tipo)
+        return _biblioteca
+    return None, None, None
+
+def leer_sensor_moderno(dht, pin, politica=None):
+    """Lee los datos usando la biblioteca moderna, con reintentos según `politica`"""
+    if politica is None:
+        modelo = getattr(dht, "tipo", type(dht).__name__)     # DHTNativo indica el tipo
+        intervalo = INTERVALOS_MINIMOS.get(modelo, INTERVALO_MINIMO)
+        politica = politica_para(("moderna", pin), intervalo_minimo=intervalo)
+    
+    temperatura, humedad = politica.leer(lambda: (dht.temperature, dht.humidity))
+    if temperatura is None and politica.ultimo_error is not None:
+        print(f"❌ Error al leer sensor moderno: {politica.ultimo_error}")
+    return temperatura, humedad
+
+def leer_sensor_clasico(dht, pin, tipo="DHT11", politica=None):
+    """Lee los datos usando la biblioteca clásica, con reintentos según `politica`"""
+    if politica is None:
+        intervalo = INTERVALOS_MINIMOS.get(tipo, INTERVALO_MINIMO)
+        politica = politica_para(("clasica", pin), intervalo_minimo=intervalo)
+    
+    def intento():
+        # Un solo intento por llamada: los reintentos los decide la política
+        humedad, temperatura = dht.read(getattr(dht, tipo), pin)
+        return temperatura, humedad
+    
+    temperatura, humedad = politica.leer(intento)
+    if temperatura is None and politica.ultimo_error is not None:
+        print(f"❌ Error al leer sensor clásico: {politica.ultimo_error}")
+    return temperatura, humedad
 
 def mostrar_datos(temperatura, humedad, biblioteca):
     """Muestra los datos del sensor de forma formateada"""
@@ -57,83 +109,239 @@ def mostrar_datos(temperatura, humedad, biblioteca):
     print(f"💧 Humedad: {humedad:.1f}%")
     print("=" * 50)
 
-def modo_continuo(dht, pin, biblioteca, intervalo=5):
-    """Modo de lectura continua del sensor"""
+def _leer(dht, pin, biblioteca):
+    """Una lectura con la biblioteca indicada"""
+    if biblioteca in ("moderna", "nativa"):
+        return leer_sensor_moderno(dht, pin)
+    return leer_sensor_clasico(dht, pin)
+
+def _muestras_directas(leer, intervalo):
+    """(instante, temperatura, humedad) leídas en este mismo proceso"""
+    while True:
+        temperatura, humedad = leer()
+        yield time.time(), temperatura, humedad
+        time.sleep(intervalo)
+
+def modo_continuo(dht, pin, biblioteca, intervalo=5, serie=None, registro=None, filtro=None,
+                  estadisticas=None, compartido=False, archivo_metricas=None, salida=None,
+                  timeout=TIMEOUT_LECTURA, reiniciar=None, archivo_latido=None):
+    """
+    Modo de lectura continua del sensor
+    Guarda las lecturas en `serie` (memoria) y/o `registro` (RegistroBinario) si se indican.
+    Con `filtro` (FiltroLecturas) se muestran y guardan en `serie` los valores filtrados;
+    `registro` conserva siempre los valores crudos. Con `estadisticas`
+    (EstadisticasMoviles) se muestran min/media/max ±desvío por ventana en cada lectura.
+    Con `compartido` el sensor se lee en otro proceso (anillo_compartido) y este
+    proceso solo consume las muestras: la salida no atrasa el muestreo. Las métricas de
+    lectura quedan en ese proceso, que escribe `archivo_metricas` si se indica.
+    Con `salida` (SalidaDatos) cada lectura es una línea JSONL/CSV en lugar del recuadro
+    Cada lectura tiene un `timeout` (LecturaVigilada; 0 lo desactiva): si el driver se
+    cuelga, la lectura cuenta como error y el sensor se reinicializa con `reiniciar()`.
+    Con `archivo_latido` (Latido) el bucle deja constancia de que sigue vivo
+    """
     print(f"🔄 Modo continuo - Lecturas cada {intervalo} segundos")
     print(f"📚 Biblioteca: {biblioteca}")
     print("📍 Pin 11 (GPIO17)")
+    if registro is not None:
+        print(f"💾 Historial binario en: {registro.directorio}")
+    if filtro is not None:
+        print(f"🧹 Filtro: {filtro.especificacion}")
+    vigilada = None
+    if timeout:
+        # La misma clave que usan leer_sensor_moderno / leer_sensor_clasico
+        clave = ("clasica" if biblioteca == "clasica" else "moderna", pin)
+        vigilada = LecturaVigilada(dht, lambda sensor: _leer(sensor, pin, biblioteca),
+                                   reiniciar, timeout, clave_politica=clave)
+        leer = vigilada.leer
+        print(f"🐕 Timeout por lectura: {timeout:g} s")
+    else:
+        def leer():
+            return _leer(dht, pin, biblioteca)
+    latido = None
+    if archivo_latido is not None:
+        # Con --shm la vigilancia corre en el proceso hijo: sus contadores no llegan acá
+        latido = Latido(archivo_latido, intervalo + (timeout or TIMEOUT_LECTURA),
+                        None if compartido else vigilada)
+        print(f"💓 Latido en: {archivo_latido}")
+    adquisicion = lector = None
+    if compartido:
+        from anillo_compartido import Lector, iniciar_adquisicion
+        
+        def exportar():
+            # Los hilos no pasan por fork: el exportador se arranca en el hijo
+            if archivo_metricas is not None:
+                metricas.exportar_periodicamente(archivo_metricas)
+        
+        def volcar():
+            if archivo_metricas is not None:
+                metricas.escribir(archivo_metricas)
+        
+        adquisicion = iniciar_adquisicion(leer, intervalo, al_iniciar=exportar,
+                                          al_terminar=volcar)
+        lector = Lector(adquisicion[1])
+        muestras = lector
+        print(f"🧵 Adquisición en el proceso {adquisicion[0].pid}, "
+              f"anillo compartido: {adquisicion[1].nombre}")
+    else:
+        muestras = _muestras_directas(leer, intervalo)
     print("⏹️  Presiona Ctrl+C para detener")
     print()
     
     try:
-        while True:
-            if biblioteca == "moderna":
-                temperatura, humedad = leer_sensor_moderno(dht, pin)
-            else:
-                temperatura, humedad = leer_sensor_clasico(dht, pin)
+        for ahora, temperatura, humedad in muestras:
+            if latido is not None:
+                latido.marcar(temperatura is not None and humedad is not None)
+            if registro is not None:
+                registro.agregar(ahora, temperatura, humedad)
                 
             if temperatura is not None and humedad is not None:
-                mostrar_datos(temperatura, humedad, biblioteca)
+                bandera = None
+                if filtro is not None:
+                    temperatura, humedad, bandera = filtro.procesar(temperatura, humedad)
+                if bandera == RECHAZADA:
+                    if salida is not None:
+                        salida.escribir(ahora, temperatura, humedad, "descartada")
+                    else:
+                        print(f"[{time.strftime('%H:%M:%S')}] ⚠️  Lectura descartada (salto)")
+                else:
+                    if salida is not None:
+                        estado = "corregida" if bandera == CORREGIDA else "ok"
+                        salida.escribir(ahora, temperatura, humedad, estado)
+                    else:
+                        mostrar_datos(temperatura, humedad, biblioteca)
+                        if bandera == CORREGIDA:
+                            print("🔧 Valores corregidos por el filtro")
+                    if serie is not None:
+                        serie.agregar(ahora, temperatura, humedad)
+                    if estadisticas is not None:
+                        estadisticas.agregar(ahora, temperatura, humedad)
+                        if salida is None:
+                            for linea in formatear(estadisticas):
+                                print(f"📊 {linea}")
+            elif salida is not None:
+                salida.escribir(ahora, None, None, "error")
             else:
                 print(f"[{time.strftime('%H:%M:%S')}] ❌ Error en la lectura")
-            
-            time.sleep(intervalo)
+        # Con --shm el bucle solo termina si el proceso de adquisición se cayó
+        if lector is not None and lector.error is not None:
+            print(f"❌ {lector.error}")
+            sys.exit(1)
     except KeyboardInterrupt:
         print("\n\n⏹️  Demo detenida por el usuario")
+        if serie is not None:
+            mostrar_resumen(serie)
+        if filtro is not None:
+            print(f"🧹 Filtro: {filtro.resumen()}")
+        if vigilada is not None and vigilada.timeouts:
+            print(f"🐕 {vigilada.timeouts} lecturas colgadas, "
+                  f"{vigilada.reinicios} reinicios del sensor")
+        if lector is not None and lector.perdidas:
+            print(f"⚠️  {lector.perdidas} muestras perdidas por atraso de la salida")
         print("👋 ¡Hasta luego!")
+    except RuntimeError as e:
+        # El driver no se recupera: salir con error para que el supervisor reinicie
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        if latido is not None:
+            latido.cerrar()
+        if adquisicion is not None:
+            from anillo_compartido import detener_adquisicion
+            detener_adquisicion(*adquisicion)
+        if registro is not None:
+            registro.cerrar()
+        if salida is not None:
+            salida.cerrar()
 
-def modo_single(dht, pin, biblioteca):
-    """Modo de lectura única del sensor"""
+def mostrar_resumen(serie):
+    """Muestra un resumen de las lecturas guardadas en memoria"""
+    ventana = serie.ventana("raw")
+    if len(ventana) == 0:
+        return
+    temperaturas = list(ventana.valores("temperatura"))
+    humedades = list(ventana.valores("humedad"))
+    print(f"📈 {len(ventana)} lecturas en memoria ({serie.memoria() // 1024} KB fijos)")
+    print(f"🌡️  Temperatura: min {min(temperaturas):.1f}°C / "
+          f"max {max(temperaturas):.1f}°C / "
+          f"media {sum(temperaturas) / len(temperaturas):.1f}°C")
+    print(f"💧 Humedad: min {min(humedades):.1f}% / max {max(humedades):.1f}% / "
+          f"media {sum(humedades) / len(humedades):.1f}%")
+
+def modo_single(dht, pin, biblioteca, salida=None):
+    """Modo de lectura única del sensor (con `salida`, una línea JSONL/CSV)"""
     print("📡 Modo de lectura única")
     print(f"📚 Biblioteca: {biblioteca}")
     print("📍 Pin 11 (GPIO17)")
     print()
     
-    if biblioteca == "moderna":
-        temperatura, humedad = leer_sensor_moderno(dht, pin)
-    else:
-        temperatura, humedad = leer_sensor_clasico(dht, pin)
-        
-    if temperatura is not None and humedad is not None:
+    temperatura, humedad = _leer(dht, pin, biblioteca)
+    if salida is not None:
+        correcta = temperatura is not None and humedad is not None
+        salida.escribir(time.time(), temperatura, humedad, "ok" if correcta else "error")
+        salida.cerrar()
+    elif temperatura is not None and humedad is not None:
         mostrar_datos(temperatura, humedad, biblioteca)
     else:
         print("❌ No se pudieron leer los datos del sensor")
         print("💡 Verifica las conexiones en el pin 11")
 
-def inicializar_sensor_moderno(board_module):
+def inicializar_sensor_moderno(board_module, gpio=17, tipo="DHT11"):
     """Inicializa el sensor usando la biblioteca moderna"""
     try:
         import adafruit_dht
-        # GPIO17 = Pin 11
-        pin = board_module.D17
-        dht = adafruit_dht.DHT11(pin)
+        # GPIO17 = Pin 11 por defecto
+        pin = getattr(board_module, f"D{gpio}")
+        dht = getattr(adafruit_dht, tipo)(pin)
         return dht, pin
     except Exception as e:
         print(f"❌ Error al inicializar sensor moderno: {e}")
         return None, None
 
-def inicializar_sensor_clasico(dht_module):
+def inicializar_sensor_clasico(dht_module, gpio=17):
     """Inicializa el sensor usando la biblioteca clásica"""
     try:
-        # GPIO17 = Pin 11
-        pin = 17
+        # GPIO17 = Pin 11 por defecto
+        pin = gpio
         return dht_module, pin
     except Exception as e:
         print(f"❌ Error al inicializar sensor clásico: {e}")
         return None, None
 
+def inicializar_sensor_nativo(gpio=17, tipo="DHT11"):
+    """Inicializa el lector nativo (GPIO character device, sin bibliotecas DHT)"""
+    try:
+        from dht11_nativo import DHTNativo
+        return DHTNativo(gpio, tipo), gpio
+    except (OSError, ValueError) as e:
+        print(f"❌ Error al inicializar sensor nativo: {e}")
+        return None, None
+
 def mostrar_ayuda():
     """Muestra la ayuda del programa"""
     print("Uso: python dht11_modern.py [OPCIONES]")
     print()
     print("Opciones:")
     print("  --continuous, -c [intervalo]  Modo continuo con lecturas cada N segundos")
+    print("  --persist DIR                 Guarda el historial binario en DIR (modo continuo)")
+    print("  --metrics ARCHIVO             Escribe métricas Prometheus en ARCHIVO (cada 15 s)")
+    print("  --filter FILTROS              Filtra el modo continuo, p.ej. hampel:7:3,ema:0.5")
+    print("  --shm                         Lee el sensor en otro proceso (memoria compartida)")
+    print("  --native                      Lector nativo por /dev/gpiochip (sin adafruit_dht)")
+    print("  --format jsonl|csv            Una línea de datos por lectura (mensajes a stderr)")
+    print("  --output ARCHIVO              Con --format, agrega las líneas a ARCHIVO")
+    print(f"  --timeout S                   Límite por lectura en modo continuo "
+          f"(default: {TIMEOUT_LECTURA:g}, 0 = sin límite)")
+    print("  --heartbeat ARCHIVO           Latido del modo continuo (ver vigilancia.py)")
     print("  --help, -h                    Muestra esta ayuda")
     print()
     print("Ejemplos:")
     print("  python dht11_modern.py                    # Lectura única")
     print("  python dht11_modern.py --continuous      # Continuo cada 5 segundos")
     print("  python dht11_modern.py -c 10             # Continuo cada 10 segundos")
+    print("  python dht11_modern.py -c 10 --persist historial  # Continuo con historial")
+    print("  python dht11_modern.py -c 5 --format jsonl --output lecturas.jsonl")
+    print("  python dht11_modern.py -c 5 --native     # Continuo con el lector nativo")
+    print("  python dht11_modern.py -c 5 --heartbeat /run/user/1000/dht.latido")
     print()
     print("📍 Conexiones:")
     print("  VCC  → 3.3V (Pin 1 o 17)")
@@ -142,11 +350,69 @@ def mostrar_ayuda():
 
 def main():
     """Función principal"""
+    # Con --format la salida estándar queda para los datos: los mensajes van a stderr
+    if "--format" in sys.argv:
+        sys.stdout = sys.stderr
     print("🌡️  Demo DHT11 Moderno - Pin 11 (GPIO17)")
     print("=" * 50)
     
-    # Detectar biblioteca disponible
-    tipo_biblioteca, dht_module, board_module = detectar_biblioteca()
+    # Procesar argumentos antes de importar los drivers (--help no los necesita)
+    argumentos = sys.argv[1:]
+    compartido = "--shm" in argumentos
+    if compartido:
+        argumentos.remove("--shm")
+    nativo = "--native" in argumentos
+    if nativo:
+        argumentos.remove("--native")
+    opciones = {"--persist": None, "--metrics": None, "--filter": None, "--format": None,
+                "--output": None, "--timeout": None, "--heartbeat": None}
+    for opcion in opciones:
+        if opcion in argumentos:
+            i = argumentos.index(opcion)
+            if i + 1 >= len(argumentos):
+                print(f"Falta el valor de {opcion}. Usa --help para ver las opciones")
+                sys.exit(1)
+            opciones[opcion] = argumentos[i + 1]
+            del argumentos[i:i + 2]
+    directorio_registro = opciones["--persist"]
+    archivo_metricas = opciones["--metrics"]
+    timeout = TIMEOUT_LECTURA
+    if opciones["--timeout"] is not None:
+        try:
+            timeout = float(opciones["--timeout"])
+        except ValueError:
+            timeout = -1
+        if timeout < 0:
+            print(f"❌ Timeout inválido: {opciones['--timeout']}")
+            sys.exit(1)
+    filtro = None
+    if opciones["--filter"] is not None:
+        try:
+            filtro = FiltroLecturas(opciones["--filter"])
+        except ValueError as e:
+            print(f"❌ Filtro inválido: {e}")
+            sys.exit(1)
+    salida = None
+    if opciones["--format"] is not None:
+        from salida_datos import SalidaDatos
+        try:
+            salida = SalidaDatos(opciones["--format"], opciones["--output"])
+        except (ValueError, OSError) as e:
+            print(f"❌ Salida inválida: {e}")
+            sys.exit(1)
+
+    if argumentos and argumentos[0] in ("--help", "-h"):
+        mostrar_ayuda()
+        return
+    if argumentos and argumentos[0] not in ("--continuous", "-c"):
+        print("Argumento no reconocido. Usa --help para ver las opciones")
+        return
+
+    # Detectar biblioteca disponible (el lector nativo no necesita ninguna)
+    if nativo:
+        tipo_biblioteca, dht_module, board_module = "nativa", None, None
+    else:
+        tipo_biblioteca, dht_module, board_module = detectar_biblioteca()
     
     if tipo_biblioteca is None:
         print("❌ Error: No se encontró ninguna biblioteca DHT")
@@ -156,9 +422,14 @@ def main():
     
     print(f"✅ Biblioteca detectada: {tipo_biblioteca}")
     
-    # Inicializar sensor
+    # Inicializar sensor (la misma función lo reinicializa si el driver se cuelga)
+    reiniciar = None
     if tipo_biblioteca == "moderna":
         dht, pin = inicializar_sensor_moderno(board_module)
+        reiniciar = lambda: inicializar_sensor_moderno(board_module)[0]
+    elif tipo_biblioteca == "nativa":
+        dht, pin = inicializar_sensor_nativo()
+        reiniciar = lambda: inicializar_sensor_nativo()[0]
     else:
         dht, pin = inicializar_sensor_clasico(dht_module)
     
@@ -166,22 +437,32 @@ def main():
         print("❌ Error: No se pudo inicializar el sensor")
         sys.exit(1)
     
-    # Procesar argumentos
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--continuous" or sys.argv[1] == "-c":
+    # Con --shm las lecturas (y sus métricas) ocurren en el proceso de adquisición
+    exportar = archivo_metricas is not None and not (compartido and argumentos)
+    if exportar:
+        metricas.exportar_periodicamente(archivo_metricas)
+    try:
+        if argumentos:    # --continuous / -c
             intervalo = 5
-            if len(sys.argv) > 2:
+            if len(argumentos) > 1:
                 try:
-                    intervalo = int(sys.argv[2])
+                    intervalo = int(argumentos[1])
                 except ValueError:
                     print("Intervalo inválido, usando 5 segundos por defecto")
-            modo_continuo(dht, pin, tipo_biblioteca, intervalo)
-        elif sys.argv[1] == "--help" or sys.argv[1] == "-h":
-            mostrar_ayuda()
+            registro = None
+            if directorio_registro is not None:
+                import signal
+                registro = RegistroBinario(directorio_registro)
+                # pkill envía SIGTERM: salir con sys.exit para vaciar el lote pendiente
+                signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+            modo_continuo(dht, pin, tipo_biblioteca, intervalo, SerieTiempo(), registro, filtro,
+                          EstadisticasMoviles(), compartido, archivo_metricas, salida,
+                          timeout, reiniciar, opciones["--heartbeat"])
         else:
-            print("Argumento no reconocido. Usa --help para ver las opciones")
-    else:
-        modo_single(dht, pin, tipo_biblioteca)
+            modo_single(dht, pin, tipo_biblioteca, salida)
+    finally:
+        if exportar:
+            metricas.escribir(archivo_metricas)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Motor de sondeo concurrente para varios sensores DHT en Raspberry Pi
+Lee una lista de sensores (pin, tipo) en paralelo sobre un pool acotado de hilos,
+con un timeout por lectura para que un sensor colgado no frene a los demás
+"""
+import math
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dht11_modern import (
+    detectar_biblioteca,
+    inicializar_sensor_clasico,
+    inicializar_sensor_moderno,
+    leer_sensor_clasico,
+    leer_sensor_moderno,
+)
+
+# Configuración por defecto del motor
+MAX_HILOS = 8          # Tamaño máximo del pool de lectura
+TIMEOUT_LECTURA = 5    # Segundos que puede tardar una lectura antes de descartarla
+
+
+class _Sensor:
+    """Estado interno de un sensor dentro del motor"""
+
+    def __init__(self, gpio, tipo, dht, pin):
+        self.gpio = gpio
+        self.tipo = tipo
+        self.dht = dht
+        self.pin = pin
+        self.inicio = None     # Momento (monotonic) en que empezó la lectura en curso
+        self.fin = None        # Momento (monotonic) en que terminó la última lectura
+        self.futuro = None     # Lectura en curso, si la hay
+
+
+class MotorSondeo:
+    """Lee varios sensores DHT en paralelo con un pool acotado de hilos"""
+
+    def __init__(self, sensores, max_hilos=MAX_HILOS, timeout=TIMEOUT_LECTURA,
+                 biblioteca=None):
+        """
+        sensores: lista de tuplas (gpio, tipo), p.ej. [(17, "DHT11"), (27, "DHT22")]
+        biblioteca: tupla devuelta por detectar_biblioteca() (se detecta si es None)
+        """
+        if biblioteca is None:
+            biblioteca = detectar_biblioteca()
+        self.biblioteca, dht_module, board_module = biblioteca
+        if self.biblioteca is None:
+            raise RuntimeError("No se encontró ninguna biblioteca DHT")
+
+        self.timeout = timeout
+        self.sensores = []
+        gpios = set()
+        for gpio, _ in sensores:
+            # Los resultados se indexan por GPIO: uno repetido taparía al otro sensor
+            if gpio in gpios:
+                raise ValueError(f"GPIO{gpio} repetido")
+            gpios.add(gpio)
+        for gpio, tipo in sensores:
+            if self.biblioteca == "moderna":
+                dht, pin = inicializar_sensor_moderno(board_module, gpio, tipo)
+            else:
+                dht, pin = inicializar_sensor_clasico(dht_module, gpio)
+            if dht is None:
+                raise RuntimeError(f"No se pudo inicializar el sensor en GPIO{gpio}")
+            self.sensores.append(_Sensor(gpio, tipo, dht, pin))
+
+        self.max_hilos = max(1, min(max_hilos, len(self.sensores)))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_hilos,
+                                        thread_name_prefix="dht")
+
+    def _leer(self, sensor):
+        """Lectura física de un sensor (se ejecuta en un hilo del pool)"""
+        sensor.inicio = time.monotonic()
+        try:
+            if self.biblioteca == "moderna":
+                return leer_sensor_moderno(sensor.dht, sensor.pin)
+            return leer_sensor_clasico(sensor.dht, sensor.pin, sensor.tipo)
+        finally:
+            sensor.fin = time.monotonic()
+
+    def _resultado(self, sensor, estado, temperatura=None, humedad=None):
+        """Construye el resultado de un sensor para una ronda de lectura"""
+        terminada = estado in ("ok", "error")
+        duracion = None
+        if sensor.inicio is not None:
+            duracion = (sensor.fin if terminada else time.monotonic()) - sensor.inicio
+        return {
+            "gpio": sensor.gpio,
+            "tipo": sensor.tipo,
+            "temperatura": temperatura,
+            "humedad": humedad,
+            "estado": estado,
+            "duracion": duracion,
+            "instante": sensor.fin if terminada else None,
+        }
+
+    def leer_todos(self, al_leer=None):
+        """
+        Lanza una ronda de lecturas y devuelve un dict gpio -> resultado.
+        El estado de cada resultado es "ok", "error", "timeout" u "ocupado"
+        (el sensor sigue colgado de una ronda anterior y no se relanza).
+        Si se indica, al_leer(resultado) se llama en cuanto termina cada lectura,
+        sin esperar al resto de la ronda. "instante" es el time.monotonic() de la lectura.
+        """
+        resultados = {}
+        futuros = {}
+        for sensor in self.sensores:
+            if sensor.futuro is not None and not sensor.futuro.done():
+                resultados[sensor.gpio] = self._resultado(sensor, "ocupado")
+                continue
+            sensor.inicio = None
+            sensor.futuro = self._pool.submit(self._leer, sensor)
+            futuros[sensor.futuro] = sensor
+
+        # Límite global: las lecturas que esperan en cola también tienen plazo
+        rondas = math.ceil(len(futuros) / self.max_hilos) if futuros else 0
+        limite_global = time.monotonic() + self.timeout * rondas
+
+        pendientes = set(futuros)
+        while pendientes:
+            ahora = time.monotonic()
+            plazos = [limite_global]
+            for futuro in pendientes:
+                inicio = futuros[futuro].inicio
+                if inicio is not None:
+                    plazos.append(inicio + self.timeout)
+            espera = max(0, min(plazos) - ahora)
+
+            hechos, pendientes = wait(pendientes, timeout=espera,
+                                      return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                sensor = futuros[futuro]
+                temperatura, humedad = futuro.result()
+                estado = "ok" if temperatura is not None and humedad is not None else "error"
+                resultados[sensor.gpio] = self._resultado(sensor, estado, temperatura, humedad)
+                if al_leer is not None:
+                    al_leer(resultados[sensor.gpio])
+
+            ahora = time.monotonic()
+            for futuro in list(pendientes):
+                sensor = futuros[futuro]
+                vencido = ahora >= limite_global
+                if sensor.inicio is not None and ahora - sensor.inicio >= self.timeout:
+                    vencido = True
+                if vencido:
+                    # Si aún no arrancó se cancela; si está colgado queda "ocupado"
+                    futuro.cancel()
+                    resultados[sensor.gpio] = self._resultado(sensor, "timeout")
+                    pendientes.discard(futuro)
+
+        return resultados
+
+    def sondear(self, intervalo, callback, al_leer=None):
+        """Lee todos los sensores cada `intervalo` segundos y entrega cada ronda a callback"""
+        siguiente = time.monotonic()
+        while True:
+            callback(self.leer_todos(al_leer))
+            siguiente += intervalo
+            espera = siguiente - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            else:
+                siguiente = time.monotonic()
+
+    def cerrar(self):
+        """Libera el pool de hilos sin esperar lecturas colgadas"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def mostrar_resultados(resultados):
+    """Muestra una ronda de lecturas, una línea por sensor"""
+    print(f"[{time.strftime('%H:%M:%S')}]")
+    for gpio in sorted(resultados):
+        r = resultados[gpio]
+        if r["estado"] == "ok":
+            print(f"  🌡️  GPIO{gpio} ({r['tipo']}): {r['temperatura']:.1f}°C  "
+                  f"💧 {r['humedad']:.1f}%  ⏱️  {r['duracion']:.2f}s")
+        else:
+            print(f"  ❌ GPIO{gpio} ({r['tipo']}): {r['estado']}")
+
+
+def parsear_sensores(argumentos):
+    """Convierte argumentos 'gpio[:tipo]' en una lista de tuplas (gpio, tipo)"""
+    sensores = []
+    for arg in argumentos:
+        gpio, _, tipo = arg.partition(":")
+        sensores.append((int(gpio), tipo.upper() or "DHT11"))
+    return sensores
+
+
+def mostrar_ayuda():
+    """Muestra la ayuda del programa"""
+    print("Uso: python dht11_multi.py SENSOR [SENSOR ...] [OPCIONES]")
+    print()
+    print("SENSOR tiene la forma gpio[:tipo], tipo DHT11 (por defecto) o DHT22")
+    print()
+    print("Opciones:")
+    print("  --continuous, -c [intervalo]  Modo continuo con lecturas cada N segundos")
+    print("  --workers, -w N               Tamaño del pool de lectura (default: 8)")
+    print("  --timeout, -t N               Timeout por lectura en segundos (default: 5)")
+    print("  --help, -h                    Muestra esta ayuda")
+    print()
+    print("Ejemplos:")
+    print("  python dht11_multi.py 17 27:DHT22          # Lectura única de dos sensores")
+    print("  python dht11_multi.py 17 22 27 -c 10       # Continuo cada 10 segundos")
+
+
+def main():
+    """Función principal"""
+    args = sys.argv[1:]
+    if not args or "--help" in args or "-h" in args:
+        mostrar_ayuda()
+        return
+
+    intervalo = None
+    max_hilos = MAX_HILOS
+    timeout = TIMEOUT_LECTURA
+    posicionales = []
+    i = 0
+    try:
+        while i < len(args):
+            if args[i] in ("--continuous", "-c"):
+                # El número que sigue a -c es el intervalo, no un sensor
+                intervalo = 5
+                if i + 1 < len(args) and args[i + 1].isdigit():
+                    intervalo = int(args[i + 1])
+                    i += 1
+            elif args[i] in ("--workers", "-w"):
+                max_hilos = int(args[i + 1])
+                i += 1
+            elif args[i] in ("--timeout", "-t"):
+                timeout = float(args[i + 1])
+                i += 1
+            else:
+                posicionales.append(args[i])
+            i += 1
+        sensores = parsear_sensores(posicionales)
+    except (ValueError, IndexError):
+        print("Argumentos inválidos. Usa --help para ver las opciones")
+        sys.exit(1)
+
+    print("🌡️  Sondeo multi-sensor DHT")
+    print("=" * 50)
+    try:
+        motor = MotorSondeo(sensores, max_hilos=max_hilos, timeout=timeout)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    print(f"✅ Biblioteca: {motor.biblioteca} - {len(sensores)} sensores, "
+          f"{motor.max_hilos} hilos")
+    try:
+        if intervalo is None:
+            mostrar_resultados(motor.leer_todos())
+        else:
+            print(f"🔄 Modo continuo - Lecturas cada {intervalo} segundos")
+            print("⏹️  Presiona Ctrl+C para detener")
+            motor.sondear(intervalo, mostrar_resultados)
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Sondeo detenido por el usuario")
+    finally:
+        motor.cerrar()
+
+
+if __name__ == "__main__":
+    main()
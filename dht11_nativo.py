@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Lector nativo del DHT11/DHT22 por el GPIO character device (/dev/gpiochipN, uAPI v2)
+adafruit_dht y Adafruit_DHT miden los 40 bits del protocolo desde espacio de usuario:
+con la CPU ocupada se pierden flancos y falla el checksum (de ahí read_retry). Acá el
+kernel marca cada flanco con su timestamp en la interrupción y los deja en una cola;
+el proceso solo los copia después a un buffer preasignado y los decodifica offline:
+1. La línea se pide como salida en bajo 18 ms (arranque de la medición).
+2. Se reconfigura como entrada con detección de ambos flancos: el sensor responde
+   (80 µs bajo, 80 µs alto) y manda 40 bits: 50 µs bajo + alto de ~27 µs (0) o 70 µs (1).
+3. Decodificación: duración de cada pulso alto, los últimos 40 contra un umbral,
+   5 bytes y checksum (suma de los 4 primeros). Con NumPy se vectoriza, y
+   decodificar_lote() procesa muchas tramas a la vez (p.ej. capturas grabadas).
+
+Sin dependencias: las estructuras del uAPI se arman con struct y se pasan por ioctl.
+Necesita Linux >= 5.10 y permiso sobre /dev/gpiochipN (grupo gpio en Raspberry Pi OS).
+
+Uso:
+    python dht11_nativo.py [GPIO]                       Una lectura
+    python dht11_nativo.py capturar N ARCHIVO [GPIO]    Graba N tramas crudas (JSONL)
+    python dht11_nativo.py verificar ARCHIVO            Decodifica tramas grabadas
+    python dht11_nativo.py comparar N [GPIO] [--carga P]
+                                                        Éxito y latencia contra las bibliotecas
+"""
+import fcntl
+import glob
+import json
+import os
+import struct
+import sys
+import time
+
+GPIO = 17                   # GPIO17 = Pin 11
+TIPOS = ("DHT11", "DHT22")
+UMBRAL_NS = 48000           # Pulso alto más largo que esto = bit 1 (27 µs vs 70 µs)
+ARRANQUE = {"DHT11": 0.018, "DHT22": 0.0011}   # Segundos en bajo para iniciar la medición
+ESPERA_TRAMA = 0.008        # La trama completa dura ~5 ms
+RETENCION = 2.0             # Como adafruit_dht: antes de 2 s se repite la última medición
+CAPACIDAD = 128             # Eventos de la cola del kernel y del buffer (una trama: ~83)
+
+# uAPI v2 de linux/gpio.h
+_FLAG_INPUT = 1 << 2
+_FLAG_OUTPUT = 1 << 3
+_FLAG_EDGE_RISING = 1 << 4
+_FLAG_EDGE_FALLING = 1 << 5
+_FLAG_BIAS_PULL_UP = 1 << 8
+SUBIDA, BAJADA = 1, 2       # gpio_v2_line_event.id
+
+_INFO_CHIP = struct.Struct("<32s32sI")                   # gpiochip_info
+_CONFIG = struct.Struct("<QI20x240x")                    # gpio_v2_line_config (sin atributos)
+_PEDIDO = struct.Struct("<64I32s272sII20xi")             # gpio_v2_line_request
+EVENTO = struct.Struct("<QIIII24x")                      # gpio_v2_line_event
+
+
+def _ioc(direccion, numero, tamano):
+    return (direccion << 30) | (tamano << 16) | (0xB4 << 8) | numero
+
+
+_GPIO_GET_CHIPINFO_IOCTL = _ioc(2, 0x01, _INFO_CHIP.size)
+_GPIO_V2_GET_LINE_IOCTL = _ioc(3, 0x07, _PEDIDO.size)
+_GPIO_V2_LINE_SET_CONFIG_IOCTL = _ioc(3, 0x0D, _CONFIG.size)
+
+
+def _numpy():
+    """NumPy si está instalado (decodificación vectorizada), si no None"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def buscar_chip():
+    """Ruta del gpiochip del conector de 40 pines (pinctrl-bcm2835/2711 o rp1)"""
+    for ruta in sorted(glob.glob("/dev/gpiochip*")):
+        try:
+            fd = os.open(ruta, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            info = bytearray(_INFO_CHIP.size)
+            fcntl.ioctl(fd, _GPIO_GET_CHIPINFO_IOCTL, info, True)
+            etiqueta = _INFO_CHIP.unpack(info)[1].rstrip(b"\0")
+        except OSError:
+            continue
+        finally:
+            os.close(fd)
+        if etiqueta.startswith(b"pinctrl-"):
+            return ruta
+    return "/dev/gpiochip0"
+
+
+def duraciones_altas(eventos):
+    """Duraciones (ns) de los pulsos altos de una secuencia de (timestamp_ns, flanco)"""
+    altas, subida = [], None
+    for instante, flanco in eventos:
+        if flanco == SUBIDA:
+            subida = instante
+        elif subida is not None:
+            altas.append(instante - subida)
+            subida = None
+    return altas
+
+
+def _valores(datos, tipo):
+    """(temperatura, humedad) de los 4 bytes de datos, como adafruit_dht"""
+    if tipo == "DHT11":
+        humedad = datos[0] + datos[1] / 10
+        temperatura = datos[2] + (datos[3] & 0x0F) / 10
+        if datos[3] & 0x80:
+            temperatura = -temperatura
+    else:
+        humedad = ((datos[0] << 8) | datos[1]) / 10
+        temperatura = (((datos[2] & 0x7F) << 8) | datos[3]) / 10
+        if datos[2] & 0x80:
+            temperatura = -temperatura
+    return temperatura, humedad
+
+
+def decodificar(altas, tipo="DHT11", umbral_ns=UMBRAL_NS):
+    """
+    (temperatura, humedad) de las duraciones de los pulsos altos de una trama.
+    RuntimeError con los mensajes de adafruit_dht si faltan bits o falla el checksum
+    """
+    if len(altas) < 40:
+        raise RuntimeError("A full buffer was not returned. Try again.")
+    bytes_ = [0] * 5
+    # Los últimos 40: antes puede estar el pulso alto de respuesta (80 µs)
+    for i, duracion in enumerate(altas[-40:]):
+        bytes_[i // 8] = (bytes_[i // 8] << 1) | (duracion > umbral_ns)
+    if sum(bytes_[:4]) & 0xFF != bytes_[4]:
+        raise RuntimeError("Checksum did not validate. Try again.")
+    return _valores(bytes_, tipo)
+
+
+def decodificar_lote(tramas, tipo="DHT11", umbral_ns=UMBRAL_NS):
+    """
+    Decodifica muchas tramas a la vez. tramas: matriz N×40 con las duraciones (ns) de
+    los 40 pulsos altos de datos. Devuelve (temperaturas, humedades, validas); las
+    inválidas quedan en NaN (listas si no hay NumPy)
+    """
+    np = _numpy()
+    if np is None:
+        temperaturas, humedades, validas = [], [], []
+        for altas in tramas:
+            try:
+                temperatura, humedad = decodificar(altas, tipo, umbral_ns)
+            except RuntimeError:
+                temperatura = humedad = float("nan")
+            temperaturas.append(temperatura)
+            humedades.append(humedad)
+            validas.append(temperatura == temperatura)
+        return temperaturas, humedades, validas
+
+    bits = (np.asarray(tramas, dtype=np.int64).reshape(-1, 5, 8) > umbral_ns)
+    bytes_ = bits.astype(np.int64) @ (1 << np.arange(7, -1, -1))      # N×5
+    validas = (bytes_[:, :4].sum(axis=1) & 0xFF) == bytes_[:, 4]
+    b0, b1, b2, b3 = (bytes_[:, i] for i in range(4))
+    if tipo == "DHT11":
+        humedades = b0 + b1 / 10
+        temperaturas = (b2 + (b3 & 0x0F) / 10) * np.where(b3 & 0x80, -1, 1)
+    else:
+        humedades = ((b0 << 8) | b1) / 10
+        temperaturas = (((b2 & 0x7F) << 8) | b3) / 10 * np.where(b2 & 0x80, -1, 1)
+    temperaturas = np.where(validas, temperaturas, np.nan)
+    humedades = np.where(validas, humedades, np.nan)
+    return temperaturas, humedades, validas
+
+
+class DHTNativo:
+    """Sensor DHT por el GPIO character device, con la API de adafruit_dht"""
+
+    def __init__(self, gpio=GPIO, tipo="DHT11", chip=None, umbral_ns=UMBRAL_NS):
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo desconocido: {tipo} (usa {', '.join(TIPOS)})")
+        self.gpio = gpio
+        self.tipo = tipo
+        self.chip = chip or buscar_chip()
+        self.umbral_ns = umbral_ns
+        self._fd = None
+        self._buffer = bytearray(EVENTO.size * CAPACIDAD)    # Se reutiliza en cada lectura
+        self._vista = memoryview(self._buffer)
+        self._ultima = None           # (instante, temperatura, humedad)
+        self._pull_up = True
+        self.eventos = 0              # Eventos de la última captura
+        self.lecturas = 0
+        self.fallidas = 0
+
+    def _pedir_linea(self):
+        """Pide la línea al kernel (entrada, cola de CAPACIDAD eventos)"""
+        chip = os.open(self.chip, os.O_RDONLY)
+        try:
+            offsets = [self.gpio] + [0] * 63
+            pedido = bytearray(_PEDIDO.pack(*offsets, b"demoraspberry",
+                                            _CONFIG.pack(_FLAG_INPUT, 0), 1, CAPACIDAD, 0))
+            fcntl.ioctl(chip, _GPIO_V2_GET_LINE_IOCTL, pedido, True)
+        finally:
+            os.close(chip)
+        self._fd = _PEDIDO.unpack(pedido)[-1]
+        os.set_blocking(self._fd, False)
+
+    def _configurar(self, flags):
+        fcntl.ioctl(self._fd, _GPIO_V2_LINE_SET_CONFIG_IOCTL,
+                    bytearray(_CONFIG.pack(flags, 0)), True)
+
+    def _escuchar(self):
+        """Suelta la línea y activa la detección de flancos en una sola llamada"""
+        flags = _FLAG_INPUT | _FLAG_EDGE_RISING | _FLAG_EDGE_FALLING
+        if self._pull_up:
+            try:
+                self._configurar(flags | _FLAG_BIAS_PULL_UP)
+                return
+            except OSError:
+                self._pull_up = False     # Chip sin bias configurable: pull-up externo
+        self._configurar(flags)
+
+    def _vaciar_cola(self):
+        """Lee la cola del kernel al buffer; devuelve los bytes leídos"""
+        leidos = 0
+        while leidos < len(self._buffer):
+            try:
+                n = os.readv(self._fd, [self._vista[leidos:]])
+            except BlockingIOError:
+                break
+            if n == 0:
+                break
+            leidos += n
+        return leidos
+
+    def capturar(self):
+        """Dispara una medición y devuelve los eventos como [(timestamp_ns, flanco)]"""
+        if self._fd is None:
+            self._pedir_linea()
+        self._configurar(_FLAG_OUTPUT)                      # Salida en 0: arranque
+        self._vaciar_cola()                                 # Eventos viejos, si quedó alguno
+        time.sleep(ARRANQUE[self.tipo])
+        self._escuchar()
+        time.sleep(ESPERA_TRAMA)
+        leidos = self._vaciar_cola()
+        self._configurar(_FLAG_INPUT)                       # Sin flancos hasta la próxima
+        self.eventos = leidos // EVENTO.size
+        return self.eventos_capturados()
+
+    def eventos_capturados(self):
+        """Eventos de la última captura, leídos del buffer"""
+        eventos, anterior = [], None
+        for instante, flanco, _, _, secuencia in EVENTO.iter_unpack(
+                self._vista[:self.eventos * EVENTO.size]):
+            if anterior is not None and secuencia != anterior + 1:
+                raise RuntimeError("Se perdieron flancos (cola del kernel llena)")
+            anterior = secuencia
+            eventos.append((instante, flanco))
+        return eventos
+
+    def duraciones_capturadas(self):
+        """Duraciones de los pulsos altos de la última captura (vectorizado con NumPy)"""
+        np = _numpy()
+        if np is None:
+            return duraciones_altas(self.eventos_capturados())
+        registros = np.frombuffer(self._buffer, dtype=np.dtype(
+            [("instante", "<u8"), ("flanco", "<u4"), ("linea", "<u4"), ("secuencia", "<u4"),
+             ("secuencia_linea", "<u4"), ("relleno", "V24")]), count=self.eventos)
+        if np.any(np.diff(registros["secuencia_linea"].astype(np.int64)) != 1):
+            raise RuntimeError("Se perdieron flancos (cola del kernel llena)")
+        instantes = registros["instante"].astype(np.int64)
+        flancos = registros["flanco"]
+        # Pulso alto: una subida seguida de una bajada
+        inicio = np.flatnonzero((flancos[:-1] == SUBIDA) & (flancos[1:] == BAJADA))
+        return (instantes[inicio + 1] - instantes[inicio]).tolist()
+
+    def medir(self):
+        """Una medición física: (temperatura, humedad) o RuntimeError"""
+        self.lecturas += 1
+        try:
+            self.capturar()
+            return decodificar(self.duraciones_capturadas(), self.tipo, self.umbral_ns)
+        except RuntimeError:
+            self.fallidas += 1
+            raise
+
+    def _medir(self):
+        ahora = time.monotonic()
+        if self._ultima is None or ahora - self._ultima[0] >= RETENCION:
+            temperatura, humedad = self.medir()
+            self._ultima = (ahora, temperatura, humedad)
+
+    @property
+    def temperature(self):
+        self._medir()
+        return self._ultima[1]
+
+    @property
+    def humidity(self):
+        self._medir()
+        return self._ultima[2]
+
+    def exit(self):
+        """Libera la línea"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def leer_fixtures(ruta):
+    """Tramas grabadas: lista de dicts con tipo, flancos [[ns, flanco], ...] y esperado"""
+    with open(ruta, encoding="utf-8") as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def verificar(ruta, umbral_ns=UMBRAL_NS):
+    """
+    Decodifica las tramas grabadas; devuelve (correctas, total) y muestra las fallas.
+    Una trama con "esperado": null es correcta solo si se rechaza (checksum, incompleta)
+    """
+    tramas = leer_fixtures(ruta)
+    correctas = 0
+    for i, trama in enumerate(tramas, 1):
+        esperado = trama.get("esperado")
+        try:
+            obtenido = list(decodificar(duraciones_altas(trama["flancos"]),
+                                        trama.get("tipo", "DHT11"), umbral_ns))
+        except RuntimeError as e:
+            obtenido = None
+            detalle = str(e)
+        else:
+            detalle = f"{obtenido[0]:.1f}°C {obtenido[1]:.1f}%"
+        if obtenido == esperado:
+            correctas += 1
+        else:
+            print(f"❌ Trama {i}: esperado {esperado}, obtenido {detalle}")
+    return correctas, len(tramas)
+
+
+def capturar_fixtures(n, ruta, gpio=GPIO, tipo="DHT11"):
+    """Graba n tramas crudas (timestamps relativos) con su decodificación como esperado"""
+    sensor = DHTNativo(gpio, tipo)
+    try:
+        with open(ruta, "a", encoding="utf-8") as f:
+            for i in range(n):
+                try:
+                    eventos = sensor.capturar()
+                except (OSError, RuntimeError) as e:
+                    print(f"❌ Captura {i + 1}: {e}")
+                    eventos = []
+                origen = eventos[0][0] if eventos else 0
+                try:
+                    esperado = list(decodificar(duraciones_altas(eventos), tipo))
+                except RuntimeError:
+                    esperado = None
+                f.write(json.dumps({"tipo": tipo, "esperado": esperado,
+                                    "flancos": [[t - origen, e] for t, e in eventos]},
+                                   separators=(",", ":")) + "\n")
+                print(f"📼 Trama {i + 1}/{n}: {len(eventos)} flancos, {esperado}")
+                time.sleep(RETENCION)
+    finally:
+        sensor.exit()
+
+
+def _lectores(gpio, tipo):
+    """{nombre: función sin argumentos -> (temperatura, humedad) o excepción}"""
+    lectores = {}
+    try:
+        nativo = DHTNativo(gpio, tipo)
+        lectores["nativo"] = nativo.medir
+    except OSError as e:
+        print(f"⚠️  Sin lector nativo: {e}")
+    try:
+        import adafruit_dht
+        import board
+        moderno = getattr(adafruit_dht, tipo)(getattr(board, f"D{gpio}"))
+        # Entre intentos pasan más de 2 s: cada llamada es una medición real
+        lectores["moderna"] = lambda: (moderno.temperature, moderno.humidity)
+    except (ImportError, AttributeError, RuntimeError) as e:
+        print(f"⚠️  Sin adafruit_dht: {e}")
+    try:
+        import Adafruit_DHT
+
+        def clasico():
+            humedad, temperatura = Adafruit_DHT.read(getattr(Adafruit_DHT, tipo), gpio)
+            if humedad is None:
+                raise RuntimeError("lectura fallida")
+            return temperatura, humedad
+
+        lectores["clasica"] = clasico
+    except ImportError as e:
+        print(f"⚠️  Sin Adafruit_DHT: {e}")
+    return lectores
+
+
+def _ocupar():
+    while True:
+        pass
+
+
+def _cargar_cpu(procesos):
+    """Arranca procesos que ocupan la CPU (para medir bajo carga)"""
+    import multiprocessing
+    hijos = [multiprocessing.Process(target=_ocupar, daemon=True) for _ in range(procesos)]
+    for hijo in hijos:
+        hijo.start()
+    return hijos
+
+
+def comparar(n, gpio=GPIO, tipo="DHT11", carga=0):
+    """Tasa de éxito y latencia de un intento con cada lector, intercalados"""
+    lectores = _lectores(gpio, tipo)
+    hijos = _cargar_cpu(carga) if carga else []
+    resultados = {nombre: [] for nombre in lectores}     # latencias de los intentos exitosos
+    try:
+        for i in range(n):
+            for nombre, leer in lectores.items():
+                inicio = time.perf_counter()
+                try:
+                    leer()
+                except (OSError, RuntimeError):
+                    pass
+                else:
+                    resultados[nombre].append(time.perf_counter() - inicio)
+                time.sleep(RETENCION)
+            print(f"🔄 Ronda {i + 1}/{n}", end="\r", flush=True)
+    finally:
+        for hijo in hijos:
+            hijo.terminate()
+    print()
+    for nombre, latencias in resultados.items():
+        if not latencias:
+            print(f"📊 {nombre:8s} éxito 0%")
+            continue
+        latencias.sort()
+        p50 = latencias[len(latencias) // 2]
+        p99 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))]
+        print(f"📊 {nombre:8s} éxito {len(latencias) / n:6.1%}  latencia p50 "
+              f"{p50 * 1000:.1f} ms  p99 {p99 * 1000:.1f} ms")
+    return resultados
+
+
+def mostrar_ayuda():
+    """Muestra la ayuda del programa"""
+    print("Uso: python dht11_nativo.py [GPIO]")
+    print("     python dht11_nativo.py capturar N ARCHIVO [GPIO]")
+    print("     python dht11_nativo.py verificar ARCHIVO")
+    print("     python dht11_nativo.py comparar N [GPIO] [--carga P]")
+    print()
+    print("Lee el DHT11 por el GPIO character device (flancos con timestamp del kernel)")
+    print()
+    print("Comandos:")
+    print("  (sin comando)  Una lectura")
+    print("  capturar       Graba N tramas crudas en ARCHIVO (JSONL) para usarlas de prueba")
+    print("  verificar      Decodifica las tramas de ARCHIVO y las compara con lo esperado")
+    print("  comparar       N lecturas con el lector nativo, adafruit_dht y Adafruit_DHT:")
+    print("                 tasa de éxito y latencia (--carga P: P procesos ocupando la CPU)")
+    print()
+    print("Opciones:")
+    print("  --dht22        Sensor DHT22 en lugar de DHT11")
+    print("  --help, -h     Muestra esta ayuda")
+
+
+def main():
+    """Función principal"""
+    argumentos = sys.argv[1:]
+    if "--help" in argumentos or "-h" in argumentos:
+        mostrar_ayuda()
+        return
+    tipo = "DHT11"
+    if "--dht22" in argumentos:
+        argumentos.remove("--dht22")
+        tipo = "DHT22"
+    carga = 0
+    try:
+        if "--carga" in argumentos:
+            i = argumentos.index("--carga")
+            carga = int(argumentos[i + 1])
+            del argumentos[i:i + 2]
+        comando = argumentos[0] if argumentos and not argumentos[0].isdigit() else None
+        if comando == "verificar":
+            correctas, total = verificar(argumentos[1])
+            print(f"✅ {correctas}/{total} tramas decodificadas como se esperaba")
+            sys.exit(0 if correctas == total else 1)
+        if comando == "capturar":
+            gpio = int(argumentos[3]) if len(argumentos) > 3 else GPIO
+            capturar_fixtures(int(argumentos[1]), argumentos[2], gpio, tipo)
+            return
+        if comando == "comparar":
+            gpio = int(argumentos[2]) if len(argumentos) > 2 else GPIO
+            comparar(int(argumentos[1]), gpio, tipo, carga)
+            return
+        if comando is not None:
+            print("Argumento no reconocido. Usa --help para ver las opciones")
+            sys.exit(1)
+        gpio = int(argumentos[0]) if argumentos else GPIO
+    except (IndexError, ValueError):
+        print("Argumentos inválidos. Usa --help para ver las opciones")
+        sys.exit(1)
+    except OSError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    sensor = None
+    try:
+        sensor = DHTNativo(gpio, tipo)
+        temperatura, humedad = sensor.medir()
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Error al leer GPIO{gpio}: {e}")
+        sys.exit(1)
+    finally:
+        if sensor is not None:
+            sensor.exit()
+    print(f"🌡️  {temperatura:.1f}°C  💧 {humedad:.1f}%  ({sensor.eventos} flancos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ Conectado al Pin 11 (GPIO17)
 import time
 import sys
 
+from reintentos import politica_para
+
 try:
     import Adafruit_DHT
 except ImportError:
@@ -18,18 +20,20 @@ except ImportError:
 DHT_SENSOR = Adafruit_DHT.DHT11
 DHT_PIN = 17  # GPIO17 (Pin 11 en la placa)
 
+# Reintentos con presupuesto de latencia (en lugar de read_retry, hasta ~30 s)
+politica = politica_para(("clasica", DHT_PIN))
+
 def leer_sensor():
     """Lee los datos del sensor DHT11"""
-    try:
-        humedad, temperatura = Adafruit_DHT.read_retry(DHT_SENSOR, DHT_PIN)
-        
-        if humedad is not None and temperatura is not None:
-            return temperatura, humedad
-        else:
-            return None, None
-    except Exception as e:
-        print(f"❌ Error al leer el sensor: {e}")
-        return None, None
+    def intento():
+        # Un solo intento por llamada: los reintentos los decide la política
+        humedad, temperatura = Adafruit_DHT.read(DHT_SENSOR, DHT_PIN)
+        return temperatura, humedad
+    
+    temperatura, humedad = politica.leer(intento)
+    if temperatura is None and politica.ultimo_error is not None:
+        print(f"❌ Error al leer el sensor: {politica.ultimo_error}")
+    return temperatura, humedad
 
 def mostrar_datos(temperatura, humedad):
     """Muestra los datos del sensor de forma formateada"""
@@ -42,8 +46,8 @@ def mostrar_datos(temperatura, humedad):
     print(f"💧 Humedad: {humedad:.1f}%")
     print("=" * 50)
 
-def modo_continuo(intervalo=5):
-    """Modo de lectura continua del sensor"""
+def modo_continuo(intervalo=5, salida=None):
+    """Modo de lectura continua del sensor (con `salida`, líneas JSONL/CSV)"""
     print(f"🔄 Modo continuo - Lecturas cada {intervalo} segundos")
     print("📍 Pin 11 (GPIO17)")
     print("⏹️  Presiona Ctrl+C para detener")
@@ -52,8 +56,11 @@ def modo_continuo(intervalo=5):
     try:
         while True:
             temperatura, humedad = leer_sensor()
+            correcta = temperatura is not None and humedad is not None
             
-            if temperatura is not None and humedad is not None:
+            if salida is not None:
+                salida.escribir(time.time(), temperatura, humedad, "ok" if correcta else "error")
+            elif correcta:
                 mostrar_datos(temperatura, humedad)
             else:
                 print(f"[{time.strftime('%H:%M:%S')}] ❌ Error en la lectura")
@@ -63,16 +70,23 @@ def modo_continuo(intervalo=5):
     except KeyboardInterrupt:
         print("\n\n⏹️  Demo detenida por el usuario")
         print("👋 ¡Hasta luego!")
+    finally:
+        if salida is not None:
+            salida.cerrar()
 
-def modo_single():
-    """Modo de lectura única del sensor"""
+def modo_single(salida=None):
+    """Modo de lectura única del sensor (con `salida`, una línea JSONL/CSV)"""
     print("📡 Modo de lectura única")
     print("📍 Pin 11 (GPIO17)")
     print()
     
     temperatura, humedad = leer_sensor()
     
-    if temperatura is not None and humedad is not None:
+    if salida is not None:
+        correcta = temperatura is not None and humedad is not None
+        salida.escribir(time.time(), temperatura, humedad, "ok" if correcta else "error")
+        salida.cerrar()
+    elif temperatura is not None and humedad is not None:
         mostrar_datos(temperatura, humedad)
     else:
         print("❌ No se pudieron leer los datos del sensor")
@@ -80,25 +94,47 @@ def modo_single():
 
 def main():
     """Función principal"""
+    # Con --format la salida estándar queda para los datos: los mensajes van a stderr
+    if "--format" in sys.argv:
+        sys.stdout = sys.stderr
     print("🌡️  Demo DHT11 - Pin 11 (GPIO17)")
     print("=" * 50)
     
+    argumentos = sys.argv[1:]
+    opciones = {"--format": None, "--output": None}
+    for opcion in opciones:
+        if opcion in argumentos:
+            i = argumentos.index(opcion)
+            if i + 1 >= len(argumentos):
+                print(f"Falta el valor de {opcion}. Usa --help para ver las opciones")
+                sys.exit(1)
+            opciones[opcion] = argumentos[i + 1]
+            del argumentos[i:i + 2]
+    salida = None
+    if opciones["--format"] is not None:
+        from salida_datos import SalidaDatos
+        try:
+            salida = SalidaDatos(opciones["--format"], opciones["--output"])
+        except (ValueError, OSError) as e:
+            print(f"❌ Salida inválida: {e}")
+            sys.exit(1)
+    
     # Verificar argumentos de línea de comandos
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--continuous" or sys.argv[1] == "-c":
+    if argumentos:
+        if argumentos[0] == "--continuous" or argumentos[0] == "-c":
             intervalo = 5
-            if len(sys.argv) > 2:
+            if len(argumentos) > 1:
                 try:
-                    intervalo = int(sys.argv[2])
+                    intervalo = int(argumentos[1])
                 except ValueError:
                     print("Intervalo inválido, usando 5 segundos por defecto")
-            modo_continuo(intervalo)
-        elif sys.argv[1] == "--help" or sys.argv[1] == "-h":
+            modo_continuo(intervalo, salida)
+        elif argumentos[0] == "--help" or argumentos[0] == "-h":
             mostrar_ayuda()
         else:
             print("Argumento no reconocido. Usa --help para ver las opciones")
     else:
-        modo_single()
+        modo_single(salida)
 
 def mostrar_ayuda():
     """Muestra la ayuda del programa"""
@@ -106,12 +142,15 @@ def mostrar_ayuda():
     print()
     print("Opciones:")
     print("  --continuous, -c [intervalo]  Modo continuo con lecturas cada N segundos")
+    print("  --format jsonl|csv            Una línea de datos por lectura (mensajes a stderr)")
+    print("  --output ARCHIVO              Con --format, agrega las líneas a ARCHIVO")
     print("  --help, -h                    Muestra esta ayuda")
     print()
     print("Ejemplos:")
     print("  python dht11_pin11.py                    # Lectura única")
     print("  python dht11_pin11.py --continuous      # Continuo cada 5 segundos")
     print("  python dht11_pin11.py -c 10             # Continuo cada 10 segundos")
+    print("  python dht11_pin11.py -c 5 --format csv > lecturas.csv")
     print()
     print("📍 Conexiones:")
     print("  VCC  → 3.3V (Pin 1 o 17)")
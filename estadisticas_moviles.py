@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Estadísticas móviles por ventana de tiempo (mínimo, máximo, media y desvío)
+Cada muestra nueva actualiza todas las ventanas en O(1) amortizado, sin recorrer
+el historial:
+- media y desvío con Welford (sumar la muestra que entra, restar las que salen)
+- mínimo y máximo con colas monótonas (solo guardan los candidatos a extremo)
+Las muestras se guardan una sola vez en un anillo de arrays que cubre la ventana
+más larga; las ventanas más cortas son solo índices dentro de ese anillo.
+"""
+import array
+import collections
+import math
+
+# Ventanas por defecto: nombre -> duración en segundos
+VENTANAS = {"1min": 60, "15min": 900, "24h": 86400}
+
+Agregado = collections.namedtuple("Agregado", "n minimo maximo media desvio")
+
+
+class _Anillo:
+    """Muestras (timestamp + una columna por variable) con índices absolutos crecientes"""
+
+    def __init__(self, columnas, capacidad=1024):
+        self.capacidad = capacidad
+        self.columnas = [array.array("d", bytes(8 * capacidad)) for _ in range(columnas)]
+        self.siguiente = 0      # Índice absoluto de la próxima muestra
+
+    def agregar(self, valores, primero_vivo):
+        """Agrega una muestra; crece (x2) si pisaría una muestra aún en uso"""
+        if self.siguiente - primero_vivo >= self.capacidad:
+            self._crecer(primero_vivo)
+        posicion = self.siguiente % self.capacidad
+        for columna, valor in zip(self.columnas, valores):
+            columna[posicion] = valor
+        self.siguiente += 1
+
+    def _crecer(self, primero_vivo):
+        nueva = self.capacidad * 2
+        columnas = []
+        for columna in self.columnas:
+            copia = array.array("d", bytes(8 * nueva))
+            for i in range(primero_vivo, self.siguiente):
+                copia[i % nueva] = columna[i % self.capacidad]
+            columnas.append(copia)
+        self.columnas = columnas
+        self.capacidad = nueva
+
+
+class _Ventana:
+    """Agregados de una variable en una ventana: Welford + colas monótonas"""
+
+    __slots__ = ("n", "media", "m2", "minimos", "maximos")
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimos = collections.deque()    # (indice, valor) con valores crecientes
+        self.maximos = collections.deque()    # (indice, valor) con valores decrecientes
+
+    def entrar(self, indice, valor):
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+        while self.minimos and self.minimos[-1][1] >= valor:
+            self.minimos.pop()
+        self.minimos.append((indice, valor))
+        while self.maximos and self.maximos[-1][1] <= valor:
+            self.maximos.pop()
+        self.maximos.append((indice, valor))
+
+    def salir(self, indice, valor):
+        if self.n == 1:
+            self.n, self.media, self.m2 = 0, 0.0, 0.0
+        else:
+            media = self.media
+            self.n -= 1
+            self.media -= (valor - media) / self.n
+            # max(): el redondeo acumulado podría dejar m2 apenas negativo
+            self.m2 = max(0.0, self.m2 - (valor - media) * (valor - self.media))
+        if self.minimos and self.minimos[0][0] == indice:
+            self.minimos.popleft()
+        if self.maximos and self.maximos[0][0] == indice:
+            self.maximos.popleft()
+
+    def agregado(self):
+        if self.n == 0:
+            return Agregado(0, None, None, None, None)
+        desvio = math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+        return Agregado(self.n, self.minimos[0][1], self.maximos[0][1], self.media, desvio)
+
+
+class EstadisticasMoviles:
+    """Mínimo, máximo, media y desvío de varias variables en varias ventanas de tiempo"""
+
+    def __init__(self, ventanas=VENTANAS, variables=("temperatura", "humedad")):
+        self.duraciones = dict(ventanas)
+        self.variables = tuple(variables)
+        self._anillo = _Anillo(1 + len(self.variables))
+        # Por ventana: índice absoluto de su muestra más vieja y un _Ventana por variable
+        self._inicio = {nombre: 0 for nombre in self.duraciones}
+        self._ventanas = {nombre: [_Ventana() for _ in self.variables]
+                          for nombre in self.duraciones}
+        self.ultimo = None
+        self.atrasadas = 0      # Muestras con el reloj atrasado (p.ej. ajuste de NTP)
+
+    def agregar(self, ts, *valores):
+        """
+        Agrega una muestra, un valor por variable. Un timestamp menor al último (el reloj
+        retrocedió) se toma como el último: las ventanas necesitan tiempos no decrecientes
+        """
+        if len(valores) != len(self.variables):
+            raise ValueError(f"Se esperan {len(self.variables)} valores")
+        if self.ultimo is not None and ts < self.ultimo:
+            ts = self.ultimo
+            self.atrasadas += 1
+        self.ultimo = ts
+        self._anillo.agregar((ts,) + valores, min(self._inicio.values()))
+        indice = self._anillo.siguiente - 1
+        for nombre, duracion in self.duraciones.items():
+            ventanas = self._ventanas[nombre]
+            for ventana, valor in zip(ventanas, valores):
+                ventana.entrar(indice, valor)
+            self._expirar(nombre, ts - duracion)
+
+    def _expirar(self, nombre, limite):
+        """Saca de la ventana las muestras con timestamp <= limite"""
+        inicio = self._inicio[nombre]
+        columnas, capacidad = self._anillo.columnas, self._anillo.capacidad
+        if columnas[0][inicio % capacidad] > limite:
+            return      # Caso habitual: nada que expirar
+        ventanas = self._ventanas[nombre]
+        while columnas[0][inicio % capacidad] <= limite:
+            for columna, ventana in zip(columnas[1:], ventanas):
+                ventana.salir(inicio, columna[inicio % capacidad])
+            inicio += 1
+        self._inicio[nombre] = inicio
+
+    def resumen(self, nombre):
+        """{variable: Agregado(n, minimo, maximo, media, desvio)} de una ventana"""
+        if self.ultimo is not None:
+            # Una ventana sin muestras nuevas también envejece
+            self._expirar(nombre, self.ultimo - self.duraciones[nombre])
+        return {variable: ventana.agregado()
+                for variable, ventana in zip(self.variables, self._ventanas[nombre])}
+
+    def memoria(self):
+        """Bytes aproximados del anillo de muestras"""
+        return sum(columna.buffer_info()[1] * columna.itemsize for columna in self._anillo.columnas)
+
+
+def formatear(estadisticas, unidades=("°C", "%")):
+    """Una línea por ventana: 'nombre  min/media/max ±desvío' para cada variable"""
+    lineas = []
+    for nombre in estadisticas.duraciones:
+        partes = []
+        for agregado, unidad in zip(estadisticas.resumen(nombre).values(), unidades):
+            if agregado.n == 0:
+                partes.append("sin datos")
+            else:
+                partes.append(f"{agregado.minimo:.1f}/{agregado.media:.1f}/{agregado.maximo:.1f}"
+                              f"{unidad} ±{agregado.desvio:.1f}")
+        lineas.append(f"{nombre:>6}: " + "  ".join(partes))
+    return lineas
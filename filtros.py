@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Filtros para el flujo de lecturas del DHT11: mediana de N, Hampel y suavizado exponencial
+Cada muestra sale con una bandera: aceptada (sin cambios), corregida (el filtro cambió
+el valor) o rechazada (salto descartado). Los filtros funcionan en dos modos con el
+mismo resultado:
+- procesar(valor): una muestra a la vez, para el modo continuo
+- lote(valores): un historial completo de una vez, vectorizado con NumPy si está
+  instalado (ventanas con sliding_window_view); si no, en Python puro
+
+Especificación de una cadena de filtros (CLI y dht11_modern.py --filter):
+    mediana:N      mediana de las últimas N muestras
+    hampel:N:K     descarta muestras a más de K desvíos (MAD) de la mediana de N
+    ema:ALFA       suavizado exponencial, 0 < ALFA <= 1
+    p.ej. "hampel:7:3,ema:0.5"
+"""
+import abc
+import collections
+import math
+import sys
+import time
+
+ACEPTADA = 0
+CORREGIDA = 1
+RECHAZADA = 2
+BANDERAS = ("aceptada", "corregida", "rechazada")
+
+TOLERANCIA = 0.05        # Diferencia que cuenta como "corregida"
+ESCALA_MAD = 1.4826      # MAD -> desvío estándar para ruido gaussiano
+UMBRAL_MINIMO = 1.0      # El DHT11 entrega enteros: con MAD 0, un paso de 1 no es un salto
+
+Filtrada = collections.namedtuple("Filtrada", "temperatura humedad bandera")
+
+_np = False    # Módulo numpy, None si no está instalado (se importa en el primer lote)
+
+
+def _numpy():
+    """NumPy si está disponible (se importa solo al procesar un lote)"""
+    global _np
+    if _np is False:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+    return _np
+
+
+def _mediana(valores):
+    """Mediana de una ventana corta (sin importar statistics: arranque más rápido)"""
+    ordenados = sorted(valores)
+    mitad = len(ordenados) // 2
+    if len(ordenados) % 2:
+        return ordenados[mitad]
+    return (ordenados[mitad - 1] + ordenados[mitad]) / 2
+
+
+def _bandera(entrada, salida, tolerancia):
+    return CORREGIDA if abs(salida - entrada) > tolerancia else ACEPTADA
+
+
+class Filtro(abc.ABC):
+    """Base de los filtros: estado para el modo en línea y lote() sobre un historial"""
+
+    def __init__(self, tolerancia=TOLERANCIA):
+        self.tolerancia = tolerancia
+
+    @abc.abstractmethod
+    def nuevo(self):
+        """Copia con los mismos parámetros y sin estado"""
+
+    @abc.abstractmethod
+    def procesar(self, valor):
+        """Filtra una muestra; devuelve (valor, bandera), valor None si se rechaza"""
+
+    def lote(self, valores):
+        """Filtra un historial completo desde cero; devuelve (valores, banderas)"""
+        np = _numpy()
+        if np is not None:
+            x = np.asarray(valores, dtype=float)
+            return self._lote_numpy(np, x)
+        filtro = self.nuevo()
+        salida, banderas = [], []
+        for valor in valores:
+            valor, bandera = filtro.procesar(valor)
+            salida.append(valor)
+            banderas.append(bandera)
+        return salida, banderas
+
+    @abc.abstractmethod
+    def _lote_numpy(self, np, x):
+        """lote() vectorizado sobre el array x; devuelve (valores, banderas)"""
+
+
+class _FiltroVentana(Filtro):
+    """Filtro sobre las últimas N entradas (ventana causal que incluye la actual)"""
+
+    def __init__(self, n, tolerancia=TOLERANCIA):
+        super().__init__(tolerancia)
+        if n < 1:
+            raise ValueError("La ventana debe tener al menos 1 muestra")
+        self.n = n
+        self._ventana = collections.deque(maxlen=n)
+
+    def _ventanas_numpy(self, np, x):
+        """Matriz (len(x), n) de ventanas; las primeras n-1 completadas con NaN"""
+        relleno = np.concatenate([np.full(self.n - 1, np.nan), x])
+        return np.lib.stride_tricks.sliding_window_view(relleno, self.n)
+
+
+class FiltroMediana(_FiltroVentana):
+    """Reemplaza cada muestra por la mediana de las últimas N"""
+
+    def nuevo(self):
+        return FiltroMediana(self.n, self.tolerancia)
+
+    def procesar(self, valor):
+        self._ventana.append(valor)
+        mediana = _mediana(self._ventana)
+        return mediana, _bandera(valor, mediana, self.tolerancia)
+
+    def _lote_numpy(self, np, x):
+        medianas = np.nanmedian(self._ventanas_numpy(np, x), axis=1) if len(x) else x
+        banderas = np.where(np.abs(medianas - x) > self.tolerancia, CORREGIDA, ACEPTADA)
+        return medianas, banderas.astype(np.int8)
+
+
+class FiltroHampel(_FiltroVentana):
+    """Detecta saltos: |x - mediana| > K * 1.4826 * MAD de las últimas N"""
+
+    def __init__(self, n=7, k=3.0, accion="rechazar", umbral_minimo=UMBRAL_MINIMO,
+                 tolerancia=TOLERANCIA):
+        super().__init__(n, tolerancia)
+        if accion not in ("rechazar", "corregir"):
+            raise ValueError(f"Acción inválida: {accion} (usa rechazar o corregir)")
+        self.k = k
+        self.accion = accion
+        self.umbral_minimo = umbral_minimo
+
+    def nuevo(self):
+        return FiltroHampel(self.n, self.k, self.accion, self.umbral_minimo, self.tolerancia)
+
+    def procesar(self, valor):
+        self._ventana.append(valor)
+        mediana = _mediana(self._ventana)
+        mad = _mediana([abs(v - mediana) for v in self._ventana])
+        umbral = max(self.k * ESCALA_MAD * mad, self.umbral_minimo)
+        if abs(valor - mediana) <= umbral:
+            return valor, ACEPTADA
+        if self.accion == "corregir":
+            return mediana, CORREGIDA
+        return None, RECHAZADA
+
+    def _lote_numpy(self, np, x):
+        if not len(x):
+            return x, np.zeros(0, dtype=np.int8)
+        ventanas = self._ventanas_numpy(np, x)
+        medianas = np.nanmedian(ventanas, axis=1)
+        mad = np.nanmedian(np.abs(ventanas - medianas[:, None]), axis=1)
+        umbral = np.maximum(self.k * ESCALA_MAD * mad, self.umbral_minimo)
+        saltos = np.abs(x - medianas) > umbral
+        if self.accion == "corregir":
+            salida, bandera = np.where(saltos, medianas, x), CORREGIDA
+        else:
+            salida, bandera = np.where(saltos, np.nan, x), RECHAZADA
+        return salida, np.where(saltos, bandera, ACEPTADA).astype(np.int8)
+
+
+class FiltroEMA(Filtro):
+    """Suavizado exponencial: y = alfa * x + (1 - alfa) * y_anterior"""
+
+    def __init__(self, alfa=0.5, tolerancia=TOLERANCIA):
+        super().__init__(tolerancia)
+        if not 0 < alfa <= 1:
+            raise ValueError("alfa debe estar en (0, 1]")
+        self.alfa = alfa
+        self._estado = None
+
+    def nuevo(self):
+        return FiltroEMA(self.alfa, self.tolerancia)
+
+    def procesar(self, valor):
+        if self._estado is None:
+            self._estado = valor
+        else:
+            self._estado = self.alfa * valor + (1 - self.alfa) * self._estado
+        return self._estado, _bandera(valor, self._estado, self.tolerancia)
+
+    def _lote_numpy(self, np, x):
+        """
+        Recurrencia resuelta por bloques: dentro de un bloque
+        y_k = r^(k+1) * y_previo + alfa * r^k * cumsum(x_j * r^-j), con r = 1 - alfa.
+        El tamaño del bloque mantiene r^-j acotado (sin desbordes ni pérdida de precisión)
+        """
+        salida = np.empty_like(x)
+        r = 1 - self.alfa
+        if not len(x) or r == 0:
+            salida[:] = x
+        else:
+            bloque = max(1, min(1024, int(8 * math.log(10) / -math.log(r))))
+            anterior = x[0]    # El primer valor inicializa el estado
+            for inicio in range(0, len(x), bloque):
+                tramo = x[inicio:inicio + bloque]
+                k = np.arange(len(tramo))
+                potencias = r ** k
+                suma = np.cumsum(tramo / potencias)
+                salida[inicio:inicio + bloque] = (r * potencias * anterior
+                                                  + self.alfa * potencias * suma)
+                anterior = salida[inicio + len(tramo) - 1]
+        banderas = np.where(np.abs(salida - x) > self.tolerancia, CORREGIDA, ACEPTADA)
+        return salida, banderas.astype(np.int8)
+
+
+class Cadena(Filtro):
+    """Filtros en serie; una muestra rechazada no llega a las etapas siguientes"""
+
+    def __init__(self, etapas):
+        super().__init__()
+        self.etapas = list(etapas)
+
+    def nuevo(self):
+        return Cadena(etapa.nuevo() for etapa in self.etapas)
+
+    def procesar(self, valor):
+        bandera = ACEPTADA
+        for etapa in self.etapas:
+            valor, propia = etapa.procesar(valor)
+            bandera = max(bandera, propia)
+            if bandera == RECHAZADA:
+                return None, RECHAZADA
+        return valor, bandera
+
+    def _lote_numpy(self, np, x):
+        banderas = np.zeros(len(x), dtype=np.int8)
+        vivas = np.arange(len(x))     # Índices de las muestras aún no rechazadas
+        for etapa in self.etapas:
+            salida, propias = etapa._lote_numpy(np, x[vivas])
+            x[vivas] = salida
+            banderas[vivas] = np.maximum(banderas[vivas], propias)
+            vivas = vivas[propias != RECHAZADA]
+        x[banderas == RECHAZADA] = np.nan
+        return x, banderas
+
+
+def crear_filtro(especificacion):
+    """Crea una Cadena desde un texto como "hampel:7:3,ema:0.5" (ver el docstring)"""
+    etapas = []
+    for parte in especificacion.split(","):
+        nombre, *parametros = parte.strip().lower().split(":")
+        try:
+            if nombre == "mediana":
+                etapas.append(FiltroMediana(int(parametros[0]) if parametros else 5))
+            elif nombre == "hampel":
+                n = int(parametros[0]) if parametros else 7
+                k = float(parametros[1]) if len(parametros) > 1 else 3.0
+                etapas.append(FiltroHampel(n, k))
+            elif nombre == "ema":
+                etapas.append(FiltroEMA(float(parametros[0]) if parametros else 0.5))
+            else:
+                raise ValueError(f"Filtro desconocido: {nombre}")
+        except IndexError:
+            raise ValueError(f"Faltan parámetros en {parte}")
+    return Cadena(etapas)
+
+
+class FiltroLecturas:
+    """Una cadena de filtros independiente para temperatura y otra para humedad"""
+
+    def __init__(self, especificacion):
+        self.especificacion = especificacion
+        self.temperatura = crear_filtro(especificacion)
+        self.humedad = crear_filtro(especificacion)
+        self.contadores = [0, 0, 0]     # Muestras por bandera
+
+    def procesar(self, temperatura, humedad):
+        """
+        Filtra una lectura; la bandera es la peor de las dos variables y, si una se
+        rechaza, la lectura entera se descarta (un glitch corrompe la trama completa)
+        """
+        temperatura, bandera_t = self.temperatura.procesar(temperatura)
+        humedad, bandera_h = self.humedad.procesar(humedad)
+        bandera = max(bandera_t, bandera_h)
+        self.contadores[bandera] += 1
+        if bandera == RECHAZADA:
+            return Filtrada(None, None, bandera)
+        return Filtrada(temperatura, humedad, bandera)
+
+    def resumen(self):
+        """Texto con las muestras aceptadas, corregidas y rechazadas"""
+        return ", ".join(f"{n} {nombre}s" for n, nombre in zip(self.contadores, BANDERAS))
+
+
+def filtrar_historial(directorio, especificacion, desde=None, hasta=None):
+    """
+    Filtra en lote las lecturas válidas de un historial (registro_binario).
+    Devuelve (timestamps, temperaturas, humedades, banderas) con la peor bandera por muestra
+    """
+    from registro_binario import ESTADO_OK, leer_rango
+    registros = [r for r in leer_rango(directorio, desde, hasta) if r[3] == ESTADO_OK]
+    timestamps = [r[0] for r in registros]
+    temperaturas, banderas_t = crear_filtro(especificacion).lote([r[1] for r in registros])
+    humedades, banderas_h = crear_filtro(especificacion).lote([r[2] for r in registros])
+    banderas = [max(bt, bh) for bt, bh in zip(banderas_t, banderas_h)]
+    return timestamps, temperaturas, humedades, banderas
+
+
+def mostrar_ayuda():
+    """Muestra la ayuda del programa"""
+    print("Uso: python filtros.py DIRECTORIO [desde] [hasta] [--filter ESPECIFICACION]")
+    print()
+    print("Reprocesa en lote un historial de registro_binario con una cadena de filtros")
+    print("y muestra las muestras corregidas o rechazadas")
+    print()
+    print("Filtros: mediana:N, hampel:N:K, ema:ALFA (separados por comas)")
+    print("desde/hasta en formato 'YYYY-MM-DD HH:MM:SS' (hora local)")
+    print()
+    print("Ejemplo:")
+    print("  python filtros.py historial --filter hampel:7:3,ema:0.5")
+
+
+def main():
+    """Función principal"""
+    argumentos = sys.argv[1:]
+    if not argumentos or argumentos[0] in ("--help", "-h"):
+        mostrar_ayuda()
+        return
+
+    especificacion = "hampel:7:3"
+    if "--filter" in argumentos:
+        i = argumentos.index("--filter")
+        if i + 1 >= len(argumentos):
+            print("Falta la especificación de --filter. Usa --help para ver las opciones")
+            sys.exit(1)
+        especificacion = argumentos[i + 1]
+        del argumentos[i:i + 2]
+
+    limites = []
+    for texto in argumentos[1:3]:
+        try:
+            limites.append(time.mktime(time.strptime(texto, "%Y-%m-%d %H:%M:%S")))
+        except ValueError:
+            print(f"Fecha inválida: {texto}")
+            sys.exit(1)
+    limites += [None] * (2 - len(limites))
+
+    try:
+        inicio = time.perf_counter()
+        timestamps, temperaturas, humedades, banderas = filtrar_historial(
+            argumentos[0], especificacion, *limites)
+        duracion = time.perf_counter() - inicio
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    contadores = [0, 0, 0]
+    for ts, temperatura, humedad, bandera in zip(timestamps, temperaturas, humedades, banderas):
+        contadores[bandera] += 1
+        if bandera == ACEPTADA:
+            continue
+        fecha = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+        if bandera == RECHAZADA:
+            print(f"{fecha}  ❌ rechazada")
+        else:
+            print(f"{fecha}  🔧 corregida → {temperatura:.1f}°C  {humedad:.1f}%")
+
+    motor = "NumPy" if _numpy() is not None else "Python"
+    print(f"📊 {len(timestamps)} muestras ({especificacion}) en {duracion * 1000:.1f} ms "
+          f"con {motor}: " + ", ".join(f"{n} {nombre}s" for n, nombre in zip(contadores, BANDERAS)))
+
+
+if __name__ == "__main__":
+    main()
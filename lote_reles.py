@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Modo lote para los relés: scripts de comandos desde un archivo o por tubería (stdin)
+Usa los mismos comandos del modo manual (on1, off2, toggleall, status...), separados por
+líneas o por ';'. Un comando puede llevar un tiempo:
+    on1 @+500ms     500 ms después del comando temporizado anterior
+    off1 @2s        2 s después del inicio del lote
+Los comandos contiguos sin tiempo se fusionan en un solo estado final ("on1; off1; on1"
+es una sola escritura: relé 1 activado) que se aplica al llegar un comando temporizado,
+un status, el fin de la entrada o cuando la tubería no trae más datos por el momento.
+'#' inicia un comentario.
+
+Cada escritura deja una línea en el log (salida estándar):
+    <segundos> set <cambios> <estados>     p.ej. "0.500 set 1+,2- 10"
+    <segundos> status - <estados>
+    <segundos> err <linea> <mensaje>
+"""
+import os
+import re
+import select
+import sys
+import time
+
+# Tiempo de un comando: "@+500ms" (relativo) o "@2s" (desde el inicio)
+_TIEMPO = re.compile(r"^@(\+?)(\d+(?:\.\d+)?)(ms|s|min)?$")
+_UNIDADES = {"ms": 0.001, "s": 1.0, "min": 60.0, None: 1.0}
+
+
+def parsear_tiempo(texto):
+    """(relativo, segundos) de "@+500ms" / "@2s"; ValueError si no es válido"""
+    coincidencia = _TIEMPO.match(texto)
+    if coincidencia is None:
+        raise ValueError(f"tiempo no válido '{texto}'")
+    signo, numero, unidad = coincidencia.groups()
+    return signo == "+", float(numero) * _UNIDADES[unidad]
+
+
+def bloques(fd, tamano=65536):
+    """
+    Lee fd con os.read y genera (lineas, bloquearia): las líneas completas leídas y si
+    la siguiente lectura tendría que esperar (la tubería no trae más datos por ahora)
+    """
+    resto = b""
+    while True:
+        datos = os.read(fd, tamano)
+        if not datos:
+            if resto:
+                yield [resto.decode("utf-8", "replace")], True
+            return
+        *lineas, resto = (resto + datos).split(b"\n")
+        bloquearia = not select.select([fd], [], [], 0)[0]
+        yield [linea.decode("utf-8", "replace") for linea in lineas], bloquearia
+
+
+class EjecutorLote:
+    """Aplica un script de comandos a un RelayBank con fusión y tiempos"""
+
+    def __init__(self, banco, parsear, salida=sys.stdout, reloj=time.monotonic,
+                 dormir=time.sleep):
+        """parsear(comando) -> (accion, numero_rele|None), como rele_demo.parsear_comando"""
+        self.banco = banco
+        self.parsear = parsear
+        self.salida = salida
+        self.reloj = reloj
+        self.dormir = dormir
+        self._pendiente = {}      # Estado final pedido desde la última escritura
+        self._inicio = reloj()
+        self._ultimo = 0.0        # Plazo (desde el inicio) del último comando temporizado
+        self._reanudar = False    # La entrada esperó: "@+" cuenta desde que se reanudó
+        self.comandos = 0
+        self.escrituras = 0
+        self.errores = 0
+
+    def _tiempo(self):
+        return self.reloj() - self._inicio
+
+    def _log(self, *campos):
+        self.salida.write(f"{self._tiempo():.3f} " + " ".join(map(str, campos)) + "\n")
+
+    def _estados(self):
+        return "".join("1" if activo else "0" for activo in self.banco.estados())
+
+    def _estado(self, numero):
+        """Estado que tendrá el relé al aplicar lo pendiente"""
+        return self._pendiente.get(numero, self.banco.estado(numero))
+
+    def vaciar(self):
+        """Aplica el estado pendiente en una sola escritura (si cambia algo)"""
+        if not self._pendiente:
+            return
+        cambios, self._pendiente = self._pendiente, {}
+        cambiados = self.banco.aplicar(cambios)
+        if cambiados:
+            self.escrituras += 1
+            detalle = ",".join(f"{n}{'+' if cambios[n] else '-'}" for n in cambiados)
+            self._log("set", detalle, self._estados())
+
+    def _esperar(self, relativo, segundos):
+        """Vacía lo pendiente y duerme hasta el plazo del comando temporizado"""
+        self.vaciar()
+        plazo = (self._ultimo if relativo else 0.0) + segundos
+        espera = plazo - self._tiempo()
+        if espera > 0:
+            self.dormir(espera)
+        self._ultimo = plazo
+
+    def comando(self, texto, numero_linea=0):
+        """Procesa un comando (con tiempo opcional); devuelve False si no es válido"""
+        partes = texto.split()
+        try:
+            if len(partes) == 2:
+                relativo, segundos = parsear_tiempo(partes[1])
+            elif len(partes) != 1:
+                raise ValueError(f"comando no válido '{texto}'")
+            accion, numero = self.parsear(partes[0].lower())
+            if accion is None:
+                raise ValueError(f"comando no válido '{partes[0]}'")
+        except ValueError as e:
+            self.errores += 1
+            self._log("err", numero_linea, e)
+            return False
+
+        self.comandos += 1
+        if len(partes) == 2:
+            self._esperar(relativo, segundos)
+        if accion == "status":
+            self.vaciar()
+            self._log("status", "-", self._estados())
+            return True
+        numeros = range(1, len(self.banco) + 1) if numero is None else (numero,)
+        for n in numeros:
+            self._pendiente[n] = (accion == "on" or
+                                  accion == "toggle" and not self._estado(n))
+        return True
+
+    def linea(self, texto, numero_linea=0):
+        """Procesa una línea del script; devuelve False si pide terminar (quit)"""
+        if self._reanudar:
+            self._reanudar = False
+            self._ultimo = max(self._ultimo, self._tiempo())
+        for comando in texto.split("#", 1)[0].split(";"):
+            comando = comando.strip()
+            if comando.lower() == "quit":
+                return False
+            if comando:
+                self.comando(comando, numero_linea)
+        return True
+
+    def ejecutar(self, fd):
+        """Ejecuta el script leído de fd hasta el fin de la entrada o quit"""
+        self._inicio = self.reloj()
+        numero_linea = 0
+        try:
+            for lineas, bloquearia in bloques(fd):
+                for texto in lineas:
+                    numero_linea += 1
+                    if not self.linea(texto, numero_linea):
+                        return
+                if bloquearia:
+                    self.vaciar()
+                    self.salida.flush()
+                    self._reanudar = True
+        finally:
+            self.vaciar()
+            self.salida.flush()
+
+    def resumen(self):
+        """Texto con los contadores del lote"""
+        return (f"{self.comandos} comandos, {self.escrituras} escrituras, "
+                f"{self.errores} errores")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Métricas del proyecto (contadores, medidores e histogramas) en formato Prometheus
+Pensadas para quedar siempre activas: cada serie etiquetada se resuelve una sola vez
+(etiquetar()) y en el camino caliente solo queda una suma bajo el lock propio de la
+serie: varias se actualizan desde más de un hilo (temporizadores del termostato, hilos
+de lectura, el hilo principal) y un += sin lock puede perder valores. La exportación
+se hace a pedido: texto Prometheus para un archivo (textfile collector de
+node_exporter) o para el comando "metrics" del demonio.
+"""
+import bisect
+import math
+import os
+import threading
+import time
+
+# Límites de los histogramas (segundos)
+LIMITES_LECTURA = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_ESCRITURA = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+
+INTERVALO_EXPORTACION = 15    # Segundos entre escrituras del archivo de métricas
+
+
+def _numero(valor):
+    """Valor en formato Prometheus"""
+    if valor == math.inf:
+        return "+Inf"
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Serie:
+    """Valor de una métrica para una combinación de etiquetas"""
+
+    def __init__(self):
+        self.valor = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n=1):
+        with self._lock:
+            self.valor += n
+
+    def set(self, valor):
+        self.valor = valor
+
+
+class _SerieHistograma:
+    """Buckets, suma y cantidad de observaciones de un histograma"""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.buckets = [0] * (len(limites) + 1)    # El último es +Inf
+        self.suma = 0.0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def observar(self, valor):
+        i = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            self.buckets[i] += 1
+            self.suma += valor
+            self.total += 1
+
+    def leer(self):
+        """(buckets, suma, total) consistentes entre sí"""
+        with self._lock:
+            return list(self.buckets), self.suma, self.total
+
+
+class Metrica:
+    """Métrica con nombre, ayuda y nombres de etiquetas; una serie por combinación"""
+
+    tipo = "untyped"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _nueva_serie(self):
+        return _Serie()
+
+    def etiquetar(self, *valores):
+        """Serie para esos valores de etiquetas (guardarla evita buscarla en cada uso)"""
+        if len(valores) != len(self.etiquetas):
+            raise ValueError(f"{self.nombre} espera etiquetas {self.etiquetas}")
+        clave = tuple(str(v) for v in valores)
+        serie = self._series.get(clave)
+        if serie is None:
+            with self._lock:
+                serie = self._series.setdefault(clave, self._nueva_serie())
+        return serie
+
+    def _texto_etiquetas(self, clave, extra=()):
+        pares = [f'{n}="{_escapar(v)}"' for n, v in zip(self.etiquetas, clave)]
+        pares.extend(f'{n}="{v}"' for n, v in extra)
+        return "{" + ",".join(pares) + "}" if pares else ""
+
+    def exportar(self):
+        """Líneas en formato de exposición de Prometheus"""
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for clave, serie in series:
+            lineas.extend(self._exportar_serie(clave, serie))
+        return lineas
+
+    def _exportar_serie(self, clave, serie):
+        return [f"{self.nombre}{self._texto_etiquetas(clave)} {_numero(serie.valor)}"]
+
+
+class Contador(Metrica):
+    """Valor que solo crece (el nombre termina en _total)"""
+
+    tipo = "counter"
+
+    def inc(self, n=1):
+        self.etiquetar().inc(n)
+
+
+class Medidor(Metrica):
+    """Valor que sube y baja (estado de un relé, última temperatura...)"""
+
+    tipo = "gauge"
+
+    def set(self, valor):
+        self.etiquetar().set(valor)
+
+
+class Histograma(Metrica):
+    """Distribución de valores (latencias) en buckets acumulados"""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_LECTURA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.limites = tuple(sorted(limites))
+
+    def _nueva_serie(self):
+        return _SerieHistograma(self.limites)
+
+    def observar(self, valor):
+        self.etiquetar().observar(valor)
+
+    def _exportar_serie(self, clave, serie):
+        buckets, suma, total = serie.leer()
+        lineas = []
+        acumulado = 0
+        for limite, cantidad in zip(self.limites + (math.inf,), buckets):
+            acumulado += cantidad
+            etiquetas = self._texto_etiquetas(clave, [("le", _numero(float(limite)))])
+            lineas.append(f"{self.nombre}_bucket{etiquetas} {acumulado}")
+        etiquetas = self._texto_etiquetas(clave)
+        lineas.append(f"{self.nombre}_sum{etiquetas} {_numero(suma)}")
+        lineas.append(f"{self.nombre}_count{etiquetas} {total}")
+        return lineas
+
+
+# Registro de métricas del proceso
+_metricas = {}
+_metricas_lock = threading.Lock()
+
+
+def _registrar(clase, nombre, ayuda, etiquetas, **opciones):
+    with _metricas_lock:
+        metrica = _metricas.get(nombre)
+        if metrica is None:
+            metrica = _metricas[nombre] = clase(nombre, ayuda, etiquetas, **opciones)
+        elif not isinstance(metrica, clase):
+            raise ValueError(f"La métrica {nombre} ya existe como {metrica.tipo}")
+        return metrica
+
+
+def contador(nombre, ayuda, etiquetas=()):
+    """Contador registrado (se crea la primera vez)"""
+    return _registrar(Contador, nombre, ayuda, etiquetas)
+
+
+def medidor(nombre, ayuda, etiquetas=()):
+    """Medidor registrado (se crea la primera vez)"""
+    return _registrar(Medidor, nombre, ayuda, etiquetas)
+
+
+def histograma(nombre, ayuda, etiquetas=(), limites=LIMITES_LECTURA):
+    """Histograma registrado (se crea la primera vez)"""
+    return _registrar(Histograma, nombre, ayuda, etiquetas, limites=limites)
+
+
+def exportar():
+    """Todas las métricas en formato de texto de Prometheus"""
+    with _metricas_lock:
+        metricas = sorted(_metricas.values(), key=lambda m: m.nombre)
+    lineas = []
+    for metrica in metricas:
+        lineas.extend(metrica.exportar())
+    return "\n".join(lineas) + "\n"
+
+
+def escribir(ruta):
+    """Escribe las métricas en `ruta` de forma atómica (archivo temporal + rename)"""
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(exportar())
+    os.replace(temporal, ruta)
+
+
+def exportar_periodicamente(ruta, intervalo=INTERVALO_EXPORTACION):
+    """Escribe el archivo de métricas cada `intervalo` segundos en un hilo de fondo"""
+    def bucle():
+        while True:
+            try:
+                escribir(ruta)
+            except OSError as e:
+                print(f"⚠️  No se pudieron escribir las métricas en {ruta}: {e}")
+            time.sleep(intervalo)
+
+    hilo = threading.Thread(target=bucle, daemon=True, name="metricas")
+    hilo.start()
+    return hilo
+
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Tareas programadas de relés con diario persistente
+Reemplaza al cron que lanza un rele_demo.py por acción: las tareas viven en el demonio
+(o en cualquier proceso que tenga el banco) y sobreviven a un reinicio.
+
+Tipos de tarea:
+    pulse2 90s              activa el relé 2 ahora y lo desactiva a los 90 s
+    off2 @+30min            cuenta regresiva: desactiva el relé 2 dentro de 30 minutos
+    on1 @07:30 lun-vie      calendario: activa el relé 1 a las 07:30 de lunes a viernes
+                            (días: diario, lun-vie, sab,dom, lun,mie,vie...)
+Un pulso o una cuenta regresiva nueva reemplaza a la pendiente del mismo relé: cada
+relé tiene a lo sumo una cuenta regresiva (ver restante()).
+
+- Próximo vencimiento en O(log n) con el heap del Temporizador (un solo hilo), aunque
+  haya miles de tareas.
+- Diario append-only de registros binarios de ancho fijo (alta / baja). Al abrirlo se
+  reproduce y se reescribe solo con las tareas vigentes (compactación). Un registro
+  cortado al final (corte de luz) se ignora.
+- Los plazos son de reloj de pared (time.time()) para que valgan después de reiniciar.
+  Una cuenta regresiva que venció con el proceso detenido se ejecuta al abrir (p.ej. el
+  apagado de un pulso); las ocurrencias de calendario perdidas no se recuperan.
+"""
+import os
+import struct
+import threading
+import time
+
+from temporizador import Temporizador
+
+RUTA_DIARIO = os.path.join(
+    os.environ.get("XDG_STATE_HOME", os.path.expanduser("~/.local/state")),
+    "demoraspberry", "tareas.diario")
+
+# Cabecera: marca, versión. Registro: operación, id, tipo, relé, acción, minuto del día,
+# días (bit 0 = lunes), plazo (epoch, solo cuentas regresivas)
+CABECERA = struct.Struct("<4sH")
+MARCA = b"DHTJ"
+VERSION = 1
+REGISTRO = struct.Struct("<BIBBBHBd")
+
+ALTA, BAJA = 1, 2
+CUENTA, CALENDARIO = 1, 2
+ACCIONES = ("on", "off", "toggle")
+DIAS = ("lun", "mar", "mie", "jue", "vie", "sab", "dom")
+TODOS_LOS_DIAS = 0x7F
+COMPACTAR = 1024            # Registros de más (bajas y altas muertas) antes de compactar
+
+_UNIDADES = {"ms": 0.001, "s": 1.0, "min": 60.0, "h": 3600.0}
+
+
+def parsear_duracion(texto):
+    """Segundos de "90s", "30min", "1.5h", "500ms" o "90" (segundos)"""
+    for unidad in sorted(_UNIDADES, key=len, reverse=True):
+        if texto.endswith(unidad):
+            numero = texto[:-len(unidad)]
+            break
+    else:
+        unidad, numero = "s", texto
+    try:
+        segundos = float(numero) * _UNIDADES[unidad]
+    except ValueError:
+        raise ValueError(f"duración no válida '{texto}'") from None
+    if segundos <= 0:
+        raise ValueError(f"duración no válida '{texto}'")
+    return segundos
+
+
+def parsear_dias(texto):
+    """Máscara de días de "diario", "lun-vie" o "sab,dom" (bit 0 = lunes)"""
+    if texto in ("diario", "todos"):
+        return TODOS_LOS_DIAS
+    mascara = 0
+    for parte in texto.split(","):
+        desde, _, hasta = parte.partition("-")
+        if desde not in DIAS or hasta and hasta not in DIAS:
+            raise ValueError(f"días no válidos '{texto}' (usa {','.join(DIAS)}, diario)")
+        i, j = DIAS.index(desde), DIAS.index(hasta or desde)
+        for dia in range(i, j + 1) if i <= j else [*range(i, 7), *range(j + 1)]:
+            mascara |= 1 << dia
+    return mascara
+
+
+def describir_dias(mascara):
+    """Texto de una máscara de días"""
+    if mascara == TODOS_LOS_DIAS:
+        return "diario"
+    return ",".join(dia for i, dia in enumerate(DIAS) if mascara & 1 << i)
+
+
+def proxima_ocurrencia(minuto, dias, ahora):
+    """Epoch de la próxima hora local `minuto` (del día) posterior a `ahora` en `dias`"""
+    local = time.localtime(ahora)
+    for d in range(8):
+        # mktime normaliza el día fuera de rango y resuelve el horario de verano (-1)
+        instante = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + d,
+                                minuto // 60, minuto % 60, 0, 0, 0, -1))
+        if instante > ahora and dias & 1 << time.localtime(instante).tm_wday:
+            return instante
+    return None
+
+
+class Tarea:
+    """Tarea programada de un relé"""
+
+    __slots__ = ("id", "tipo", "rele", "accion", "minuto", "dias", "plazo", "evento")
+
+    def __init__(self, id, tipo, rele, accion, minuto=0, dias=0, plazo=0.0):
+        self.id = id
+        self.tipo = tipo
+        self.rele = rele
+        self.accion = accion
+        self.minuto = minuto
+        self.dias = dias
+        self.plazo = plazo          # Próximo vencimiento (epoch)
+        self.evento = None          # Evento del temporizador
+
+    def registro(self, operacion=ALTA):
+        """Registro binario del diario"""
+        return REGISTRO.pack(operacion, self.id, self.tipo, self.rele,
+                             ACCIONES.index(self.accion), self.minuto, self.dias,
+                             self.plazo if self.tipo == CUENTA else 0.0)
+
+    def describir(self, ahora=None):
+        """Texto de la tarea en la sintaxis de los comandos"""
+        if self.tipo == CALENDARIO:
+            return (f"{self.accion}{self.rele} @{self.minuto // 60:02d}:{self.minuto % 60:02d} "
+                    f"{describir_dias(self.dias)}")
+        restante = max(0.0, self.plazo - (time.time() if ahora is None else ahora))
+        return f"{self.accion}{self.rele} @+{restante:.0f}s"
+
+
+class Diario:
+    """Archivo append-only de altas y bajas de tareas"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._fd = None
+        self.registros = 0          # Registros en el archivo (altas y bajas)
+
+    def leer(self):
+        """Tareas vigentes según el diario ({id: Tarea}); {} si no existe"""
+        try:
+            with open(self.ruta, "rb") as f:
+                datos = f.read()
+        except FileNotFoundError:
+            return {}
+        if len(datos) < CABECERA.size:
+            return {}
+        marca, version = CABECERA.unpack_from(datos)
+        if marca != MARCA or version != VERSION:
+            raise ValueError(f"{self.ruta} no es un diario de tareas")
+        tareas = {}
+        # Un registro incompleto al final (escritura cortada) se descarta
+        fin = len(datos) - (len(datos) - CABECERA.size) % REGISTRO.size
+        for campos in REGISTRO.iter_unpack(datos[CABECERA.size:fin]):
+            operacion, id, tipo, rele, accion, minuto, dias, plazo = campos
+            if operacion == ALTA:
+                tareas[id] = Tarea(id, tipo, rele, ACCIONES[accion], minuto, dias, plazo)
+            else:
+                tareas.pop(id, None)
+        return tareas
+
+    def reescribir(self, tareas):
+        """Compacta: deja solo las altas de `tareas` (archivo temporal + os.replace)"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(CABECERA.pack(MARCA, VERSION) +
+                    b"".join(tarea.registro() for tarea in tareas))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta)
+        self.cerrar()
+        self._fd = os.open(self.ruta, os.O_WRONLY | os.O_APPEND)
+        self.registros = len(tareas)
+
+    def anotar(self, datos):
+        """Agrega registros en una sola escritura y los sincroniza a disco"""
+        os.write(self._fd, datos)
+        os.fsync(self._fd)
+        self.registros += len(datos) // REGISTRO.size
+
+    def cerrar(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class Planificador:
+    """Tareas de relés sobre un Temporizador, con diario persistente"""
+
+    def __init__(self, ejecutar, ruta=RUTA_DIARIO, temporizador=None):
+        """ejecutar(accion, rele): aplica "on"/"off"/"toggle" a un relé"""
+        self.ejecutar = ejecutar
+        self.diario = Diario(ruta)
+        self.temporizador = temporizador or Temporizador(reloj=time.time, nombre="tareas",
+                                                         espera_max=60)
+        self._lock = threading.Lock()
+        self._tareas = {}           # id -> Tarea
+        self._cuentas = {}          # rele -> Tarea de cuenta regresiva pendiente
+        self._siguiente_id = 1
+        self.ejecutadas = 0
+
+    def abrir(self):
+        """Carga y compacta el diario, programa las tareas y arranca el temporizador"""
+        tareas = self.diario.leer()
+        ahora = time.time()
+        with self._lock:
+            for tarea in sorted(tareas.values(), key=lambda t: t.id):
+                if tarea.tipo == CALENDARIO:
+                    tarea.plazo = proxima_ocurrencia(tarea.minuto, tarea.dias, ahora)
+                self._tareas[tarea.id] = tarea
+                if tarea.tipo == CUENTA:
+                    self._cuentas[tarea.rele] = tarea
+                self._siguiente_id = max(self._siguiente_id, tarea.id + 1)
+            self.diario.reescribir(list(self._tareas.values()))
+            for tarea in self._tareas.values():
+                # Una cuenta vencida con el proceso detenido sale en la primera tanda
+                self._programar(tarea)
+            pendientes = len(self._tareas)
+        self.temporizador.iniciar()
+        return pendientes
+
+    def _programar(self, tarea):
+        tarea.evento = self.temporizador.programar(tarea.plazo, self._vencer, tarea)
+
+    def _agregar(self, tarea):
+        """Da de alta una tarea (con el lock tomado); devuelve su id"""
+        tarea.id = self._siguiente_id
+        self._siguiente_id += 1
+        datos = tarea.registro()
+        if tarea.tipo == CUENTA:
+            anterior = self._cuentas.get(tarea.rele)
+            if anterior is not None:
+                datos = self._quitar(anterior) + datos
+            self._cuentas[tarea.rele] = tarea
+        self._tareas[tarea.id] = tarea
+        self._anotar(datos)
+        self._programar(tarea)
+        return tarea.id
+
+    def _anotar(self, datos):
+        """Anota en el diario (con el lock tomado) y lo compacta si tiene muchas bajas"""
+        self.diario.anotar(datos)
+        if self.diario.registros > 2 * len(self._tareas) + COMPACTAR:
+            self.diario.reescribir(list(self._tareas.values()))
+
+    def _quitar(self, tarea):
+        """Saca una tarea (con el lock tomado); devuelve su registro de baja"""
+        del self._tareas[tarea.id]
+        if self._cuentas.get(tarea.rele) is tarea:
+            del self._cuentas[tarea.rele]
+        if tarea.evento is not None:
+            self.temporizador.cancelar(tarea.evento)
+        return tarea.registro(BAJA)
+
+    def cuenta(self, rele, accion, segundos):
+        """Ejecuta `accion` sobre el relé dentro de `segundos`; devuelve el id"""
+        if accion not in ACCIONES:
+            raise ValueError(f"acción no válida '{accion}'")
+        with self._lock:
+            return self._agregar(Tarea(0, CUENTA, rele, accion, plazo=time.time() + segundos))
+
+    def pulso(self, rele, segundos):
+        """Activa el relé ahora y lo desactiva dentro de `segundos`; devuelve el id"""
+        # Primero el apagado en el diario: si el proceso muere, el relé no queda activado
+        id = self.cuenta(rele, "off", segundos)
+        self.ejecutar("on", rele)
+        return id
+
+    def calendario(self, rele, accion, hora, dias=TODOS_LOS_DIAS):
+        """Ejecuta `accion` a la hora "HH:MM" los días de la máscara; devuelve el id"""
+        if accion not in ACCIONES:
+            raise ValueError(f"acción no válida '{accion}'")
+        horas, _, minutos = hora.partition(":")
+        if not (horas.isdigit() and minutos.isdigit() and int(horas) < 24 and
+                int(minutos) < 60):
+            raise ValueError(f"hora no válida '{hora}' (usa HH:MM)")
+        if not 0 < dias <= TODOS_LOS_DIAS:
+            raise ValueError("sin días")
+        minuto = int(horas) * 60 + int(minutos)
+        tarea = Tarea(0, CALENDARIO, rele, accion, minuto, dias,
+                      proxima_ocurrencia(minuto, dias, time.time()))
+        with self._lock:
+            return self._agregar(tarea)
+
+    def cancelar(self, id):
+        """Cancela una tarea; devuelve False si no existe"""
+        with self._lock:
+            tarea = self._tareas.get(id)
+            if tarea is None:
+                return False
+            self._anotar(self._quitar(tarea))
+            return True
+
+    def _vencer(self, tarea):
+        """
+        Ejecuta una tarea vencida (hilo del temporizador). Primero la acción y después la
+        baja en el diario: si el proceso muere entre las dos, la cuenta se repite al
+        reabrir (on/off son idempotentes) en lugar de darse por hecha sin ejecutarse
+        """
+        with self._lock:
+            if self._tareas.get(tarea.id) is not tarea:
+                return          # Cancelada mientras vencía
+        # Sin el lock: ejecutar() puede esperar al event loop, que también usa el planificador
+        self.ejecutar(tarea.accion, tarea.rele)
+        self.ejecutadas += 1
+        with self._lock:
+            if self._tareas.get(tarea.id) is not tarea:
+                return          # Cancelada o reemplazada mientras se ejecutaba
+            if tarea.tipo == CALENDARIO:
+                # Desde ahora, no desde el plazo: si venció tarde no se repite para alcanzar
+                tarea.plazo = proxima_ocurrencia(tarea.minuto, tarea.dias,
+                                                 max(tarea.plazo, time.time()))
+                self._programar(tarea)
+            else:
+                tarea.evento = None
+                self._anotar(self._quitar(tarea))
+
+    def restante(self, rele):
+        """Segundos de la cuenta regresiva del relé, o None si no tiene"""
+        tarea = self._cuentas.get(rele)
+        return None if tarea is None else max(0.0, tarea.plazo - time.time())
+
+    def tareas(self):
+        """Tareas pendientes ordenadas por próximo vencimiento"""
+        with self._lock:
+            return sorted(self._tareas.values(), key=lambda t: (t.plazo, t.id))
+
+    def cerrar(self):
+        """Detiene el temporizador (las tareas quedan en el diario)"""
+        self.temporizador.detener()
+        self.diario.cerrar()
+
+
+def parsear_tarea(texto):
+    """
+    (tipo, accion, rele, argumento) de "pulse2 90s", "off2 @+30min" u "on1 @07:30 lun-vie":
+    tipo "pulso" (argumento: segundos), "cuenta" (segundos) o "calendario" ((hora, dias)).
+    Devuelve None si el texto no es una tarea; ValueError si lo es pero no es válida.
+    """
+    partes = texto.split()
+    if len(partes) < 2:
+        return None
+    comando = partes[0]
+    accion = comando.rstrip("0123456789")
+    numero = comando[len(accion):]
+    if not numero.isdigit() or accion not in ("pulse",) + ACCIONES:
+        return None
+    rele = int(numero)
+    if accion == "pulse":
+        if len(partes) != 2:
+            raise ValueError("uso: pulseN DURACION")
+        return "pulso", "on", rele, parsear_duracion(partes[1])
+    if partes[1].startswith("@+"):
+        if len(partes) != 2:
+            raise ValueError("uso: accionN @+DURACION")
+        return "cuenta", accion, rele, parsear_duracion(partes[1][2:])
+    if partes[1].startswith("@") and len(partes) <= 3:
+        dias = parsear_dias(partes[2]) if len(partes) == 3 else TODOS_LOS_DIAS
+        return "calendario", accion, rele, (partes[1][1:], dias)
+    raise ValueError(f"tarea no válida '{texto}'")
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Registro binario append-only del historial del DHT11
+Registros de ancho fijo (timestamp, temperatura, humedad, estado) escritos por lotes
+alineados a página en segmentos preasignados y mapeados en memoria (mmap), con rotación
+de segmentos. Los lectores buscan rangos de tiempo por búsqueda binaria, sin parsear texto.
+Pensado para la tarjeta SD: pocas escrituras grandes en lugar de una línea por lectura.
+"""
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+
+# Cabecera (una página): magic, versión, tamaño de registro, registros válidos,
+# primer timestamp, último timestamp
+CABECERA = struct.Struct("<4sHHIdd")
+MAGIC = b"DHTL"
+VERSION = 1
+# Registro: timestamp (s), temperatura y humedad en décimas (int16), estado, relleno
+REGISTRO = struct.Struct("<dhhB3x")
+
+ESTADO_OK = 0
+ESTADO_ERROR = 1
+
+PAGINA = mmap.PAGESIZE
+REGISTROS_POR_PAGINA = PAGINA // REGISTRO.size
+REGISTROS_POR_SEGMENTO = 65536     # 1 MiB por segmento (~3.8 días a una lectura cada 5 s)
+INTERVALO_FLUSH = 60               # Segundos máximos que un lote espera en memoria
+
+
+def _nombre_segmento(numero):
+    """Nombre del archivo de un segmento"""
+    return f"dht11_{numero:06d}.seg"
+
+
+def listar_segmentos(directorio):
+    """Rutas de los segmentos del directorio en orden"""
+    if not os.path.isdir(directorio):
+        return []
+    nombres = sorted(n for n in os.listdir(directorio)
+                     if n.startswith("dht11_") and n.endswith(".seg"))
+    return [os.path.join(directorio, n) for n in nombres]
+
+
+class Segmento:
+    """Un archivo de segmento preasignado y mapeado en memoria"""
+
+    def __init__(self, ruta, capacidad=REGISTROS_POR_SEGMENTO, escritura=False):
+        self.ruta = ruta
+        nuevo = escritura and not os.path.exists(ruta)
+        modo = "r+b" if escritura else "rb"
+        if nuevo:
+            # Capacidad redondeada a páginas completas
+            paginas = math.ceil(capacidad / REGISTROS_POR_PAGINA)
+            with open(ruta, "wb") as f:
+                f.truncate(PAGINA * (1 + paginas))
+        self._archivo = open(ruta, modo)
+        acceso = mmap.ACCESS_WRITE if escritura else mmap.ACCESS_READ
+        self._mm = mmap.mmap(self._archivo.fileno(), 0, access=acceso)
+        self.capacidad = (len(self._mm) - PAGINA) // REGISTRO.size
+
+        if nuevo:
+            self.cantidad, self.primero, self.ultimo = 0, 0.0, 0.0
+            self._escribir_cabecera()
+        else:
+            magic, version, tamano, self.cantidad, self.primero, self.ultimo = \
+                CABECERA.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION or tamano != REGISTRO.size:
+                self.cerrar()
+                raise ValueError(f"Segmento inválido: {ruta}")
+
+    def _escribir_cabecera(self):
+        """Actualiza la cabecera y la sincroniza a disco"""
+        CABECERA.pack_into(self._mm, 0, MAGIC, VERSION, REGISTRO.size,
+                           self.cantidad, self.primero, self.ultimo)
+        self._mm.flush(0, PAGINA)
+
+    def escribir_lote(self, datos, n, primero, ultimo):
+        """Copia n registros empaquetados al final y sincroniza las páginas tocadas"""
+        offset = PAGINA + self.cantidad * REGISTRO.size
+        self._mm[offset:offset + len(datos)] = datos
+        inicio_pagina = offset - offset % PAGINA
+        fin = offset + len(datos)
+        self._mm.flush(inicio_pagina, fin - inicio_pagina)
+        # La cabecera se actualiza después de los datos: un corte deja el segmento coherente
+        if self.cantidad == 0:
+            self.primero = primero
+        self.cantidad += n
+        self.ultimo = ultimo
+        self._escribir_cabecera()
+
+    def timestamp(self, i):
+        """Timestamp del registro i"""
+        return struct.unpack_from("<d", self._mm, PAGINA + i * REGISTRO.size)[0]
+
+    def registro(self, i):
+        """Registro i como tupla (timestamp, temperatura, humedad, estado)"""
+        ts, t, h, estado = REGISTRO.unpack_from(self._mm, PAGINA + i * REGISTRO.size)
+        if estado != ESTADO_OK:
+            return ts, None, None, estado
+        return ts, t / 10, h / 10, estado
+
+    def buscar(self, timestamp):
+        """Primer índice con timestamp >= dado (búsqueda binaria)"""
+        bajo, alto = 0, self.cantidad
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self.timestamp(medio) < timestamp:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def cerrar(self):
+        """Libera el mapeo y el archivo"""
+        self._mm.close()
+        self._archivo.close()
+
+
+class RegistroBinario:
+    """Escritor append-only con lotes alineados a página y rotación de segmentos"""
+
+    def __init__(self, directorio, registros_por_segmento=REGISTROS_POR_SEGMENTO,
+                 intervalo_flush=INTERVALO_FLUSH):
+        self.directorio = directorio
+        self.registros_por_segmento = registros_por_segmento
+        self.intervalo_flush = intervalo_flush
+        os.makedirs(directorio, exist_ok=True)
+
+        segmentos = listar_segmentos(directorio)
+        if segmentos:
+            self._numero = int(os.path.basename(segmentos[-1])[6:12])
+            self._segmento = Segmento(segmentos[-1], escritura=True)
+            if self._segmento.cantidad >= self._segmento.capacidad:
+                self._segmento.cerrar()
+                self._numero += 1
+                self._segmento = self._nuevo_segmento()
+        else:
+            self._numero = 0
+            self._segmento = self._nuevo_segmento()
+        self._ultimo = self._segmento.ultimo
+        self.atrasados = 0      # Registros con el reloj atrasado (p.ej. ajuste de NTP)
+
+        self._lote = bytearray()
+        self._n_lote = 0
+        self._primero_lote = None
+        self._ultimo_flush = time.monotonic()
+
+    def _nuevo_segmento(self):
+        """Crea el siguiente segmento de la secuencia"""
+        ruta = os.path.join(self.directorio, _nombre_segmento(self._numero))
+        return Segmento(ruta, self.registros_por_segmento, escritura=True)
+
+    def agregar(self, timestamp, temperatura, humedad, estado=ESTADO_OK):
+        """
+        Agrega un registro al lote en memoria; se escribe al completar una página.
+        Un timestamp menor al último (el reloj retrocedió) se guarda con el último: la
+        búsqueda binaria necesita timestamps no decrecientes
+        """
+        if timestamp < self._ultimo:
+            timestamp = self._ultimo
+            self.atrasados += 1
+        if temperatura is None or humedad is None:
+            estado = ESTADO_ERROR
+        if estado != ESTADO_OK:
+            t = h = 0
+        else:
+            t, h = round(temperatura * 10), round(humedad * 10)
+        self._lote += REGISTRO.pack(timestamp, t, h, estado)
+        self._n_lote += 1
+        if self._primero_lote is None:
+            self._primero_lote = timestamp
+        self._ultimo = timestamp
+
+        # El lote se vacía al llenar la página en curso o al vencer el intervalo
+        posicion = self._segmento.cantidad + self._n_lote
+        if (posicion % REGISTROS_POR_PAGINA == 0
+                or posicion >= self._segmento.capacidad
+                or time.monotonic() - self._ultimo_flush >= self.intervalo_flush):
+            self.flush()
+
+    def flush(self):
+        """Escribe el lote pendiente en el segmento, rotando si se llena"""
+        self._ultimo_flush = time.monotonic()
+        if not self._n_lote:
+            return
+        self._segmento.escribir_lote(bytes(self._lote), self._n_lote,
+                                     self._primero_lote, self._ultimo)
+        self._lote.clear()
+        self._n_lote = 0
+        self._primero_lote = None
+        if self._segmento.cantidad >= self._segmento.capacidad:
+            self._segmento.cerrar()
+            self._numero += 1
+            self._segmento = self._nuevo_segmento()
+
+    def cerrar(self):
+        """Vacía el lote pendiente y cierra el segmento"""
+        self.flush()
+        self._segmento.cerrar()
+
+
+def leer_rango(directorio, desde=None, hasta=None):
+    """Genera los registros con desde <= timestamp < hasta de todos los segmentos"""
+    for ruta in listar_segmentos(directorio):
+        segmento = Segmento(ruta)
+        try:
+            if segmento.cantidad == 0:
+                continue
+            if hasta is not None and segmento.primero >= hasta:
+                break
+            if desde is not None and segmento.ultimo < desde:
+                continue
+            inicio = 0 if desde is None else segmento.buscar(desde)
+            fin = segmento.cantidad if hasta is None else segmento.buscar(hasta)
+            for i in range(inicio, fin):
+                yield segmento.registro(i)
+        finally:
+            segmento.cerrar()
+
+
+def main():
+    """Vuelca el historial de un directorio de registro"""
+    if len(sys.argv) < 2 or sys.argv[1] in ("--help", "-h"):
+        print("Uso: python registro_binario.py DIRECTORIO [desde] [hasta]")
+        print()
+        print("desde/hasta en formato 'YYYY-MM-DD HH:MM:SS' (hora local)")
+        return
+
+    limites = []
+    for texto in sys.argv[2:4]:
+        try:
+            limites.append(time.mktime(time.strptime(texto, "%Y-%m-%d %H:%M:%S")))
+        except ValueError:
+            print(f"Fecha inválida: {texto}")
+            sys.exit(1)
+    limites += [None] * (2 - len(limites))
+
+    for ts, temperatura, humedad, estado in leer_rango(sys.argv[1], *limites):
+        fecha = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+        if estado == ESTADO_OK:
+            print(f"{fecha}  {temperatura:.1f}°C  {humedad:.1f}%")
+        else:
+            print(f"{fecha}  ❌ Error en la lectura")
+
+
+if __name__ == "__main__":
+    main()
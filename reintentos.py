@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Motor de reintentos para lecturas del DHT11/DHT22
+Reemplaza a Adafruit_DHT.read_retry (15 intentos fijos cada 2 s, hasta ~30 s) y al
+intento único de la biblioteca moderna con una sola política para ambas:
+- presupuesto de latencia por lectura
+- backoff con jitter que nunca baja del intervalo mínimo entre lecturas del sensor
+- abandono temprano si el sensor está claramente desconectado o el driver falla
+- contadores de intentos y éxitos
+"""
+import random
+import threading
+import time
+
+import metricas
+
+PRESUPUESTO = 4.0          # Segundos máximos por lectura (todos los intentos incluidos)
+INTERVALO_MINIMO = 1.0     # El DHT11 no admite lecturas más seguidas (DHT22: 2 s)
+FACTOR_BACKOFF = 1.5       # Crecimiento de la espera entre reintentos
+JITTER = 0.2               # ±20% aleatorio sobre la espera (evita sincronizar sensores)
+DESCONEXIONES_MAX = 2      # Errores "sensor no encontrado" seguidos antes de abandonar
+
+# Intervalo mínimo entre lecturas según el tipo de sensor
+INTERVALOS_MINIMOS = {"DHT11": 1.0, "DHT22": 2.0}
+
+TRANSITORIO = "transitorio"
+DESCONECTADO = "desconectado"
+FATAL = "fatal"
+
+# Métricas (etiqueta "sensor": nombre de la política, p.ej. "moderna:17")
+LECTURAS = metricas.contador("dht_lecturas_total",
+                             "Lecturas pedidas por resultado (ok, agotado, abortado)",
+                             ("sensor", "resultado"))
+INTENTOS = metricas.contador("dht_intentos_total", "Accesos físicos al sensor", ("sensor",))
+REINTENTOS = metricas.contador("dht_reintentos_total",
+                               "Intentos más allá del primero de cada lectura", ("sensor",))
+ERRORES = metricas.contador("dht_errores_total", "Errores del driver por clase",
+                            ("sensor", "clase"))
+DURACION = metricas.histograma("dht_lectura_segundos",
+                               "Duración de una lectura incluyendo reintentos", ("sensor",))
+TEMPERATURA = metricas.medidor("dht_temperatura_celsius", "Última temperatura leída",
+                               ("sensor",))
+HUMEDAD = metricas.medidor("dht_humedad_porcentaje", "Última humedad leída", ("sensor",))
+
+
+def clasificar_error(error):
+    """Clasifica una excepción del driver en transitorio, desconectado o fatal"""
+    if isinstance(error, RuntimeError):
+        mensaje = str(error).lower()
+        if "not found" in mensaje or "check wiring" in mensaje:
+            return DESCONECTADO
+        if "pulsein" in mensaje or "gpio" in mensaje:
+            # Falta libgpiod o no hay acceso a GPIO: reintentar no sirve
+            return FATAL
+        # Checksum, buffer incompleto, datos no plausibles...
+        return TRANSITORIO
+    return FATAL
+
+
+class PoliticaReintentos:
+    """Política de reintentos de un sensor (guarda el instante de su último intento)"""
+
+    def __init__(self, presupuesto=PRESUPUESTO, intervalo_minimo=INTERVALO_MINIMO,
+                 factor=FACTOR_BACKOFF, jitter=JITTER, desconexiones_max=DESCONEXIONES_MAX,
+                 reloj=time.monotonic, dormir=time.sleep, azar=random.random, nombre="sensor"):
+        self.presupuesto = presupuesto
+        self.intervalo_minimo = intervalo_minimo
+        self.factor = factor
+        self.jitter = jitter
+        self.desconexiones_max = desconexiones_max
+        self.reloj = reloj
+        self.dormir = dormir
+        self.azar = azar
+        self.nombre = nombre
+        self._ultimo_intento = None
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.lecturas = 0       # Llamadas a leer()
+        self.intentos = 0       # Accesos físicos al sensor
+        self.exitos = 0
+        self.agotados = 0       # Sin éxito dentro del presupuesto
+        self.abortos = 0        # Abandonos tempranos (desconectado o fatal)
+        self.ultimo_error = None
+
+        # Series de métricas resueltas una vez (camino caliente sin búsquedas)
+        self._m_ok = LECTURAS.etiquetar(nombre, "ok")
+        self._m_agotado = LECTURAS.etiquetar(nombre, "agotado")
+        self._m_abortado = LECTURAS.etiquetar(nombre, "abortado")
+        self._m_intentos = INTENTOS.etiquetar(nombre)
+        self._m_reintentos = REINTENTOS.etiquetar(nombre)
+        self._m_errores = {clase: ERRORES.etiquetar(nombre, clase)
+                           for clase in (TRANSITORIO, DESCONECTADO, FATAL)}
+        self._m_duracion = DURACION.etiquetar(nombre)
+        self._m_temperatura = TEMPERATURA.etiquetar(nombre)
+        self._m_humedad = HUMEDAD.etiquetar(nombre)
+
+    def _espera(self, reintento):
+        """Espera antes del intento número `reintento` (0 = primer intento)"""
+        if reintento == 0:
+            return self.intervalo_minimo
+        espera = self.intervalo_minimo * self.factor ** (reintento - 1)
+        espera *= 1 + self.jitter * (2 * self.azar() - 1)
+        return max(self.intervalo_minimo, espera)
+
+    def leer(self, intento):
+        """
+        Ejecuta intento() -> (temperatura, humedad) con reintentos.
+        intento() puede devolver None en algún valor (fallo transitorio) o lanzar
+        una excepción del driver. Devuelve (temperatura, humedad) o (None, None).
+        """
+        with self._lock:
+            inicio = time.perf_counter()
+            temperatura, humedad = self._leer(intento)
+            self._m_duracion.observar(time.perf_counter() - inicio)
+            if temperatura is not None:
+                self._m_temperatura.set(temperatura)
+                self._m_humedad.set(humedad)
+            return temperatura, humedad
+
+    def _leer(self, intento):
+        """Cuerpo de leer() (requiere _lock)"""
+        self.lecturas += 1
+        self.ultimo_error = None
+        limite = self.reloj() + self.presupuesto
+        desconexiones = 0
+        reintento = 0
+        while True:
+            # Respetar el intervalo mínimo desde el intento anterior del sensor
+            if self._ultimo_intento is not None:
+                listo = self._ultimo_intento + self._espera(reintento)
+                if listo > limite:
+                    self.agotados += 1
+                    self._m_agotado.inc()
+                    return None, None
+                espera = listo - self.reloj()
+                if espera > 0:
+                    self.dormir(espera)
+
+            self._ultimo_intento = self.reloj()
+            self.intentos += 1
+            self._m_intentos.inc()
+            if reintento:
+                self._m_reintentos.inc()
+            reintento += 1
+            try:
+                temperatura, humedad = intento()
+            except Exception as e:
+                self.ultimo_error = e
+                tipo = clasificar_error(e)
+                self._m_errores[tipo].inc()
+                if tipo == FATAL:
+                    self.abortos += 1
+                    self._m_abortado.inc()
+                    return None, None
+                if tipo == DESCONECTADO:
+                    desconexiones += 1
+                    if desconexiones >= self.desconexiones_max:
+                        self.abortos += 1
+                        self._m_abortado.inc()
+                        return None, None
+                else:
+                    desconexiones = 0
+                continue
+
+            if temperatura is not None and humedad is not None:
+                self.exitos += 1
+                self._m_ok.inc()
+                return temperatura, humedad
+            # La biblioteca clásica informa los fallos devolviendo None
+            self._m_errores[TRANSITORIO].inc()
+            desconexiones = 0
+
+    def renovada(self):
+        """
+        Copia con la misma configuración y contadores pero su propio lock: reemplaza a
+        una política cuyo lock quedó tomado por una lectura colgada (vigilancia.py)
+        """
+        nueva = PoliticaReintentos(self.presupuesto, self.intervalo_minimo, self.factor,
+                                   self.jitter, self.desconexiones_max, self.reloj,
+                                   self.dormir, self.azar, self.nombre)
+        nueva._ultimo_intento = self._ultimo_intento
+        for contador in ("lecturas", "intentos", "exitos", "agotados", "abortos"):
+            setattr(nueva, contador, getattr(self, contador))
+        return nueva
+
+    def estadisticas(self):
+        """Contadores como dict"""
+        return {
+            "lecturas": self.lecturas,
+            "intentos": self.intentos,
+            "exitos": self.exitos,
+            "agotados": self.agotados,
+            "abortos": self.abortos,
+        }
+
+
+# Una política por sensor: el intervalo mínimo es una propiedad de cada sensor físico
+_politicas = {}
+_politicas_lock = threading.Lock()
+
+
+def politica_para(clave, **opciones):
+    """Política compartida para un sensor (se crea la primera vez con `opciones`)"""
+    with _politicas_lock:
+        if clave not in _politicas:
+            opciones.setdefault("nombre", ":".join(map(str, clave)) if isinstance(clave, tuple)
+                                else str(clave))
+            _politicas[clave] = PoliticaReintentos(**opciones)
+        return _politicas[clave]
+
+
+def renovar_politica(clave):
+    """Reemplaza la política de `clave` por una renovada (si existe); devuelve la nueva"""
+    with _politicas_lock:
+        if clave in _politicas:
+            _politicas[clave] = _politicas[clave].renovada()
+        return _politicas.get(clave)
+
+
+def estadisticas():
+    """Contadores de todas las políticas registradas, por clave"""
+    with _politicas_lock:
+        return {clave: p.estadisticas() for clave, p in _politicas.items()}
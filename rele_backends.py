@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Backends de salida para el banco de relés
+- BackendGPIO: relés conectados directamente a pines GPIO (RPi.GPIO)
+- BackendMCP23017: relés en un expansor I2C MCP23017 (16 canales, puertos A y B)
+- ExpansorSimulado: bus I2C en memoria que emula un MCP23017, para probar sin hardware
+
+Todos reciben cambios lógicos {indice: activo} (índice desde 0) y resuelven el
+nivel eléctrico según sean relés activos en bajo o en alto.
+"""
+
+# Registros del MCP23017 con IOCON.BANK = 0 (valor por defecto tras el reset)
+MCP_IODIRA = 0x00
+MCP_IODIRB = 0x01
+MCP_GPIOA = 0x12
+MCP_GPIOB = 0x13
+MCP_OLATA = 0x14
+MCP_OLATB = 0x15
+
+
+class BackendGPIO:
+    """Relés en pines GPIO nativos; un GPIO.output con listas por transición"""
+
+    def __init__(self, gpio, pines, activo_bajo=True):
+        self.gpio = gpio
+        self.pines = list(pines)
+        self.activo_bajo = activo_bajo
+        self.canales = len(self.pines)
+
+    def _nivel(self, activo):
+        """Nivel eléctrico que corresponde a activado/desactivado"""
+        if activo == self.activo_bajo:
+            return self.gpio.LOW
+        return self.gpio.HIGH
+
+    def configurar(self):
+        """Configura los pines como salida con todos los relés desactivados"""
+        self.gpio.setmode(self.gpio.BCM)
+        self.gpio.setwarnings(False)
+        self.gpio.setup(self.pines, self.gpio.OUT, initial=self._nivel(False))
+
+    def escribir(self, cambios):
+        """Aplica {indice: activo} con una sola llamada a GPIO.output"""
+        canales = [self.pines[i] for i in cambios]
+        niveles = [self._nivel(activo) for activo in cambios.values()]
+        self.gpio.output(canales, niveles)
+
+    def describir(self, indice):
+        """Descripción del canal para mensajes"""
+        return f"GPIO{self.pines[indice]}"
+
+    def cerrar(self):
+        """Libera los pines"""
+        self.gpio.cleanup()
+
+
+class BackendMCP23017:
+    """Relés en un MCP23017; una escritura de registro por puerto modificado"""
+
+    def __init__(self, bus, direccion=0x20, canales=16, activo_bajo=True):
+        """
+        bus: objeto SMBus (smbus/smbus2) o ExpansorSimulado
+        canales: relés conectados, GPA0..GPA7 = 0..7 y GPB0..GPB7 = 8..15
+        """
+        if not 1 <= canales <= 16:
+            raise ValueError("El MCP23017 tiene entre 1 y 16 canales")
+        self.bus = bus
+        self.direccion = direccion
+        self.canales = canales
+        self.activo_bajo = activo_bajo
+        self._olat = [0, 0]     # Copia de OLATA/OLATB
+
+    def _byte_inactivo(self, puerto):
+        """Valor de un puerto con todos sus relés desactivados"""
+        if not self.activo_bajo:
+            return 0x00
+        # Solo los bits de canales usados; el resto queda en 0
+        usados = min(8, max(0, self.canales - 8 * puerto))
+        return (1 << usados) - 1
+
+    def configurar(self):
+        """Pone los canales usados como salida con los relés desactivados"""
+        self._olat = [self._byte_inactivo(0), self._byte_inactivo(1)]
+        # Primero los latches (sin glitch al pasar a salida), luego la dirección
+        self.bus.write_i2c_block_data(self.direccion, MCP_OLATA, self._olat)
+        iodir = [0xFF & ~((1 << min(8, max(0, self.canales - 8 * p))) - 1) for p in (0, 1)]
+        self.bus.write_i2c_block_data(self.direccion, MCP_IODIRA, iodir)
+
+    def escribir(self, cambios):
+        """Aplica {indice: activo}: a lo sumo una transacción I2C por transición"""
+        nuevo = list(self._olat)
+        for indice, activo in cambios.items():
+            puerto, bit = divmod(indice, 8)
+            if activo != self.activo_bajo:
+                nuevo[puerto] |= 1 << bit
+            else:
+                nuevo[puerto] &= ~(1 << bit)
+
+        cambia_a = nuevo[0] != self._olat[0]
+        cambia_b = nuevo[1] != self._olat[1]
+        if cambia_a and cambia_b:
+            # OLATA y OLATB son contiguos: ambos puertos en una sola transacción
+            self.bus.write_i2c_block_data(self.direccion, MCP_OLATA, nuevo)
+        elif cambia_a:
+            self.bus.write_byte_data(self.direccion, MCP_OLATA, nuevo[0])
+        elif cambia_b:
+            self.bus.write_byte_data(self.direccion, MCP_OLATB, nuevo[1])
+        self._olat = nuevo
+
+    def describir(self, indice):
+        """Descripción del canal para mensajes"""
+        puerto, bit = divmod(indice, 8)
+        return f"MCP23017@0x{self.direccion:02X} GP{'AB'[puerto]}{bit}"
+
+    def cerrar(self):
+        """Deja todos los relés desactivados"""
+        self.escribir({i: False for i in range(self.canales)})
+
+
+class ExpansorSimulado:
+    """Bus I2C en memoria con un MCP23017; cuenta las transacciones realizadas"""
+
+    def __init__(self, direccion=0x20):
+        self.direccion = direccion
+        self.registros = bytearray(0x16)
+        self.registros[MCP_IODIRA] = 0xFF   # Tras el reset todo es entrada
+        self.registros[MCP_IODIRB] = 0xFF
+        self.transacciones = 0
+
+    def _verificar(self, direccion):
+        if direccion != self.direccion:
+            raise OSError(f"Sin respuesta en la dirección 0x{direccion:02X}")
+        self.transacciones += 1
+
+    def write_byte_data(self, direccion, registro, valor):
+        """Escribe un registro"""
+        self._verificar(direccion)
+        self._escribir(registro, valor)
+
+    def write_i2c_block_data(self, direccion, registro, valores):
+        """Escribe registros consecutivos en una transacción (modo secuencial)"""
+        self._verificar(direccion)
+        for i, valor in enumerate(valores):
+            self._escribir(registro + i, valor)
+
+    def read_byte_data(self, direccion, registro):
+        """Lee un registro"""
+        self._verificar(direccion)
+        return self.registros[registro]
+
+    def _escribir(self, registro, valor):
+        self.registros[registro] = valor & 0xFF
+        # Los latches de salida se reflejan en el puerto GPIO
+        if registro in (MCP_OLATA, MCP_OLATB):
+            self.registros[registro - 2] = valor & 0xFF
+
+    def salidas(self):
+        """Niveles actuales de los 16 pines como lista de 0/1"""
+        puertos = self.registros[MCP_GPIOA] | self.registros[MCP_GPIOB] << 8
+        return [(puertos >> i) & 1 for i in range(16)]
+
+    def close(self):
+        """Compatibilidad con SMBus.close()"""
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Banco de relés con estado sombra
+Guarda en memoria el estado de cada canal, calcula la diferencia con el estado pedido
+y la entrega al backend en una sola escritura por transición (un GPIO.output con
+listas, o un registro por puerto en un expansor). Si nada cambia no se escribe nada
+(sin rebotes innecesarios de contactos). Los backends están en rele_backends.py.
+"""
+import threading
+import time
+
+import metricas
+
+# Conmutaciones por relé: desgaste de los contactos (vida útil típica ~100k ciclos)
+CONMUTACIONES = metricas.contador("rele_conmutaciones_total",
+                                  "Cambios de estado de cada relé", ("rele",))
+ESCRITURAS = metricas.contador("rele_escrituras_total", "Escrituras entregadas al backend")
+DURACION_ESCRITURA = metricas.histograma("rele_escritura_segundos",
+                                         "Duración de una escritura al backend",
+                                         limites=metricas.LIMITES_ESCRITURA)
+ESTADO = metricas.medidor("rele_estado", "Estado de cada relé (1 = activado)", ("rele",))
+
+
+class RelayBank:
+    """Conjunto de relés controlados como una unidad"""
+
+    def __init__(self, backend):
+        """backend: BackendGPIO, BackendMCP23017 o compatible; el relé N es el canal N - 1"""
+        self.backend = backend
+        self._estado = [False] * backend.canales  # Sombra: True = activado
+        self.escrituras = 0                       # Escrituras entregadas al backend
+        # aplicar() se llama desde varios hilos (botones, temporizadores, termostato)
+        self._lock = threading.Lock()
+        self._crear_series()
+
+    def _crear_series(self):
+        """Series de métricas por relé, resueltas una sola vez"""
+        self._m_conmutaciones = [CONMUTACIONES.etiquetar(n) for n in range(1, len(self) + 1)]
+        self._m_estado = [ESTADO.etiquetar(n) for n in range(1, len(self) + 1)]
+        self._m_escrituras = ESCRITURAS.etiquetar()
+        self._m_duracion = DURACION_ESCRITURA.etiquetar()
+        for serie in self._m_estado:
+            serie.set(0)
+
+    def __len__(self):
+        return len(self._estado)
+
+    def configurar(self):
+        """Configura el backend con todos los relés desactivados"""
+        self.backend.configurar()
+        self._estado = [False] * len(self._estado)
+        for serie in self._m_estado:
+            serie.set(0)
+
+    def aplicar(self, cambios):
+        """
+        Aplica {numero_rele: activo} en una sola escritura.
+        Devuelve la lista de relés que realmente cambiaron.
+        """
+        with self._lock:
+            return self._aplicar(cambios)
+
+    def _aplicar(self, cambios):
+        diferencia, cambiados = {}, []
+        for numero, activo in cambios.items():
+            if not 1 <= numero <= len(self._estado):
+                raise ValueError(f"Relé {numero} fuera de rango (1-{len(self._estado)})")
+            activo = bool(activo)
+            if self._estado[numero - 1] != activo:
+                diferencia[numero - 1] = activo
+                cambiados.append(numero)
+        if not diferencia:
+            return cambiados
+
+        inicio = time.perf_counter()
+        self.backend.escribir(diferencia)
+        self._m_duracion.observar(time.perf_counter() - inicio)
+        self.escrituras += 1
+        self._m_escrituras.inc()
+        for numero in cambiados:
+            activo = not self._estado[numero - 1]
+            self._estado[numero - 1] = activo
+            self._m_conmutaciones[numero - 1].inc()
+            self._m_estado[numero - 1].set(int(activo))
+        return cambiados
+
+    def establecer(self, estados):
+        """Lleva el banco completo a `estados` (secuencia de bool, uno por relé)"""
+        return self.aplicar(dict(enumerate(estados, 1)))
+
+    def activar(self, numero):
+        """Activa un relé"""
+        return self.aplicar({numero: True})
+
+    def desactivar(self, numero):
+        """Desactiva un relé"""
+        return self.aplicar({numero: False})
+
+    def alternar(self, *numeros):
+        """
+        Alterna uno o más relés según el estado sombra (sin leer el pin), en una sola
+        escritura. El estado se lee dentro del lock: dos toggles simultáneos no se pisan.
+        """
+        with self._lock:
+            for numero in numeros:
+                if not 1 <= numero <= len(self._estado):
+                    raise ValueError(f"Relé {numero} fuera de rango (1-{len(self._estado)})")
+            return self._aplicar({n: not self._estado[n - 1] for n in numeros})
+
+    def estado(self, numero):
+        """Estado sombra de un relé (True = activado)"""
+        return self._estado[numero - 1]
+
+    def estados(self):
+        """Estado sombra de todos los relés"""
+        return list(self._estado)
+
+    def describir(self, numero):
+        """Descripción del canal físico de un relé"""
+        return self.backend.describir(numero - 1)
+
+    def cerrar(self):
+        """Libera el backend"""
+        self.backend.cerrar()
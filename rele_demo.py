@@ -6,232 +6,480 @@ Controla un relé conectado a GPIO para encender/apagar dispositivos
 
 import time
 import sys
-import RPi.GPIO as GPIO
+
+from rele_backends import BackendGPIO, BackendMCP23017, ExpansorSimulado
+from rele_bank import RelayBank
+from secuenciador import Reproductor, cargar_secuencia, compilar
 
 # Configuración de los relés
-RELE1_PIN = 2   # GPIO2 (Pin 3) - Relé 1
-RELE2_PIN = 3   # GPIO3 (Pin 5) - Relé 2
+# Backend: "gpio" (pines directos), "mcp23017" (expansor I2C) o "simulado" (expansor en memoria)
+RELE_BACKEND = "gpio"
+RELE_PINES = [2, 3]      # GPIO2 (Pin 3) - Relé 1, GPIO3 (Pin 5) - Relé 2, ... (backend gpio)
 RELE_ACTIVO_BAJO = True  # True si los relés se activan con LOW, False si con HIGH
+MCP23017_BUS = 1         # Bus I2C (/dev/i2c-1)
+MCP23017_DIRECCION = 0x20
+MCP23017_CANALES = 16    # Relés conectados al expansor (1-16)
+# Entradas físicas (BCM) -> comando al presionar, p.ej. {5: "toggle1", 6: "offall"};
+# activas en bajo con pull-up (botón a GND). Se usan en el modo manual y con --buttons
+BOTONES = {}
+
+# Pin físico del conector de 40 pines para cada GPIO (BCM)
+PIN_FISICO = {
+    2: 3, 3: 5, 4: 7, 14: 8, 15: 10, 17: 11, 18: 12, 27: 13, 22: 15, 23: 16,
+    24: 18, 10: 19, 9: 21, 25: 22, 11: 23, 8: 24, 7: 26, 0: 27, 1: 28, 5: 29,
+    6: 31, 12: 32, 13: 33, 19: 35, 16: 36, 26: 37, 20: 38, 21: 40,
+}
+
+# Banco de relés (estado sombra); se crea en configurar_gpio()
+banco = None
+
+def _gpio():
+    """Importa RPi.GPIO en el primer uso del hardware (--help no lo necesita)"""
+    import RPi.GPIO as GPIO
+    return GPIO
+
+def crear_backend():
+    """Crea el backend de salida según RELE_BACKEND"""
+    if RELE_BACKEND == "gpio":
+        return BackendGPIO(_gpio(), RELE_PINES, RELE_ACTIVO_BAJO)
+    if RELE_BACKEND == "mcp23017":
+        try:
+            from smbus2 import SMBus
+        except ImportError:
+            from smbus import SMBus
+        return BackendMCP23017(SMBus(MCP23017_BUS), MCP23017_DIRECCION,
+                               MCP23017_CANALES, RELE_ACTIVO_BAJO)
+    if RELE_BACKEND == "simulado":
+        return BackendMCP23017(ExpansorSimulado(MCP23017_DIRECCION), MCP23017_DIRECCION,
+                               MCP23017_CANALES, RELE_ACTIVO_BAJO)
+    raise ValueError(f"Backend de relés desconocido: {RELE_BACKEND}")
 
 def configurar_gpio():
-    """Configura los pines GPIO para los relés"""
+    """Configura las salidas de los relés (todos desactivados)"""
+    global banco
     try:
-        # Configurar modo GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)
-        
-        # Configurar pines de los relés como salida
-        GPIO.setup(RELE1_PIN, GPIO.OUT)
-        GPIO.setup(RELE2_PIN, GPIO.OUT)
-        
-        # Estado inicial: relés desactivados
-        estado_inicial = GPIO.LOW if RELE_ACTIVO_BAJO else GPIO.HIGH
-        GPIO.output(RELE1_PIN, estado_inicial)
-        GPIO.output(RELE2_PIN, estado_inicial)
+        banco = RelayBank(crear_backend())
+        banco.configurar()
         
         print("✅ GPIO configurado correctamente")
-        print(f"📍 Relé 1: GPIO{RELE1_PIN} (Pin 3)")
-        print(f"📍 Relé 2: GPIO{RELE2_PIN} (Pin 5)")
+        for numero_rele in range(1, len(banco) + 1):
+            print(f"📍 Relé {numero_rele}: {describir_rele(numero_rele)}")
         return True
         
     except Exception as e:
         print(f"❌ Error al configurar GPIO: {e}")
         return False
 
+def describir_rele(numero_rele):
+    """Canal físico de un relé, con el pin del conector si es un GPIO directo"""
+    descripcion = banco.describir(numero_rele)
+    if RELE_BACKEND == "gpio":
+        pin = PIN_FISICO.get(RELE_PINES[numero_rele - 1])
+        if pin is not None:
+            descripcion += f" (Pin {pin})"
+    return descripcion
+
+def numeros_reles():
+    """Números de todos los relés del banco"""
+    return range(1, len(banco) + 1)
+
+def mostrar_rele(numero_rele):
+    """Muestra el estado de un relé según el estado sombra"""
+    texto = "ACTIVADO" if banco.estado(numero_rele) else "DESACTIVADO"
+    print(f"🔌 Relé {numero_rele} {texto}")
+
+def aplicar_estados(estados):
+    """Aplica {numero_rele: activo} en una sola escritura y muestra el resultado"""
+    try:
+        banco.aplicar(estados)
+        for numero_rele in estados:
+            mostrar_rele(numero_rele)
+        return True
+    except Exception as e:
+        print(f"❌ Error al cambiar relés: {e}")
+        return False
+
 def activar_rele(numero_rele):
-    """Activa el relé especificado (1 o 2)"""
+    """Activa el relé especificado (1 a N)"""
     try:
-        pin = RELE1_PIN if numero_rele == 1 else RELE2_PIN
-        estado = GPIO.LOW if RELE_ACTIVO_BAJO else GPIO.HIGH
-        GPIO.output(pin, estado)
-        print(f"🔌 Relé {numero_rele} ACTIVADO")
+        banco.activar(numero_rele)
+        mostrar_rele(numero_rele)
         return True
     except Exception as e:
         print(f"❌ Error al activar relé {numero_rele}: {e}")
         return False
 
 def desactivar_rele(numero_rele):
-    """Desactiva el relé especificado (1 o 2)"""
+    """Desactiva el relé especificado (1 a N)"""
     try:
-        pin = RELE1_PIN if numero_rele == 1 else RELE2_PIN
-        estado = GPIO.HIGH if RELE_ACTIVO_BAJO else GPIO.LOW
-        GPIO.output(pin, estado)
-        print(f"🔌 Relé {numero_rele} DESACTIVADO")
+        banco.desactivar(numero_rele)
+        mostrar_rele(numero_rele)
         return True
     except Exception as e:
         print(f"❌ Error al desactivar relé {numero_rele}: {e}")
         return False
 
 def alternar_rele(numero_rele):
-    """Alterna el estado del relé especificado (1 o 2)"""
+    """Alterna el estado del relé especificado (1 a N)"""
     try:
-        pin = RELE1_PIN if numero_rele == 1 else RELE2_PIN
-        estado_actual = GPIO.input(pin)
-        nuevo_estado = GPIO.LOW if estado_actual == GPIO.HIGH else GPIO.HIGH
-        GPIO.output(pin, nuevo_estado)
-        
-        if nuevo_estado == (GPIO.LOW if RELE_ACTIVO_BAJO else GPIO.HIGH):
-            print(f"🔌 Relé {numero_rele} ACTIVADO")
-        else:
-            print(f"🔌 Relé {numero_rele} DESACTIVADO")
-            
+        banco.alternar(numero_rele)
+        mostrar_rele(numero_rele)
         return True
     except Exception as e:
         print(f"❌ Error al alternar relé {numero_rele}: {e}")
         return False
 
 def mostrar_estado():
-    """Muestra el estado actual de ambos relés"""
+    """Muestra el estado actual de todos los relés"""
     try:
-        estado1 = GPIO.input(RELE1_PIN)
-        estado2 = GPIO.input(RELE2_PIN)
-        
-        estado1_texto = "ACTIVADO" if estado1 == (GPIO.LOW if RELE_ACTIVO_BAJO else GPIO.HIGH) else "DESACTIVADO"
-        estado2_texto = "ACTIVADO" if estado2 == (GPIO.LOW if RELE_ACTIVO_BAJO else GPIO.HIGH) else "DESACTIVADO"
-        
-        print(f"🔌 Relé 1: {estado1_texto}")
-        print(f"🔌 Relé 2: {estado2_texto}")
+        for numero_rele in numeros_reles():
+            mostrar_rele(numero_rele)
         return True
     except Exception as e:
         print(f"❌ Error al leer estado: {e}")
         return False
 
 def activar_todos():
-    """Activa ambos relés"""
-    activar_rele(1)
-    activar_rele(2)
+    """Activa todos los relés"""
+    return aplicar_estados({n: True for n in numeros_reles()})
 
 def desactivar_todos():
-    """Desactiva ambos relés"""
-    desactivar_rele(1)
-    desactivar_rele(2)
+    """Desactiva todos los relés"""
+    return aplicar_estados({n: False for n in numeros_reles()})
 
 def alternar_todos():
-    """Alterna el estado de ambos relés"""
-    alternar_rele(1)
-    alternar_rele(2)
+    """Alterna el estado de todos los relés"""
+    try:
+        banco.alternar(*numeros_reles())
+        mostrar_estado()
+        return True
+    except Exception as e:
+        print(f"❌ Error al cambiar relés: {e}")
+        return False
+
+# Comandos del modo manual (también usados por otros front-ends):
+# on<N>/off<N>/toggle<N>, onall/offall/toggleall y status
+ACCIONES_RELE = {
+    "on": activar_rele,
+    "off": desactivar_rele,
+    "toggle": alternar_rele,
+}
+ACCIONES_TODOS = {
+    "on": activar_todos,
+    "off": desactivar_todos,
+    "toggle": alternar_todos,
+}
+
+def parsear_comando(comando):
+    """
+    Devuelve (accion, numero_rele) de un comando; numero_rele es None para "all".
+    Devuelve (None, None) si el comando no es válido.
+    """
+    if comando == "status":
+        return "status", None
+    for accion in ACCIONES_RELE:
+        if comando.startswith(accion):
+            resto = comando[len(accion):]
+            if resto == "all":
+                return accion, None
+            if resto.isdigit() and 1 <= int(resto) <= len(banco):
+                return accion, int(resto)
+    return None, None
+
+def ejecutar_comando(comando):
+    """Ejecuta un comando del modo manual; devuelve False si no es válido"""
+    accion, numero_rele = parsear_comando(comando)
+    if accion is None:
+        return False
+    if accion == "status":
+        mostrar_estado()
+    elif numero_rele is None:
+        ACCIONES_TODOS[accion]()
+    else:
+        ACCIONES_RELE[accion](numero_rele)
+    return True
+
+def reles_comando(comando):
+    """(accion, numeros_reles) de un comando on/off/toggle ((None, None) si no es válido)"""
+    accion, numero_rele = parsear_comando(comando)
+    if accion is None or accion == "status":
+        return None, None
+    return accion, list(numeros_reles()) if numero_rele is None else [numero_rele]
+
+def aplicar_comando(comando):
+    """Aplica un comando de relés sin imprimir; devuelve los relés que cambiaron"""
+    accion, numeros = reles_comando(comando)
+    if accion is None:
+        raise ValueError(f"comando no válido '{comando}'")
+    if accion == "toggle":
+        return banco.alternar(*numeros)
+    return banco.aplicar({n: accion == "on" for n in numeros})
+
+def iniciar_botones(botones):
+    """Conecta las entradas físicas al banco; devuelve la Botonera (None si falla)"""
+    from botones import Botonera
+    
+    def al_accion(boton, comando, cambiados):
+        print(f"\n🔘 GPIO{boton.pin} → {comando}")
+        for numero_rele in cambiados:
+            mostrar_rele(numero_rele)
+    
+    try:
+        gpio = _gpio()
+        if gpio.getmode() is None:
+            gpio.setmode(gpio.BCM)     # Backend MCP23017: el GPIO solo tiene las entradas
+        for boton in botones:
+            for comando in (boton.al_presionar, boton.al_soltar):
+                if comando is not None and reles_comando(comando)[0] is None:
+                    raise ValueError(f"comando no válido '{comando}' en el GPIO{boton.pin}")
+        botonera = Botonera(gpio, botones, aplicar_comando, al_accion)
+        botonera.configurar()
+    except Exception as e:
+        print(f"❌ Error al configurar los botones: {e}")
+        return None
+    for boton in botones:
+        soltar = f" / al soltar: {boton.al_soltar}" if boton.al_soltar else ""
+        print(f"🔘 GPIO{boton.pin}: {boton.al_presionar}{soltar}")
+    return botonera
+
+def modo_botones(botones):
+    """Modo botones: las entradas físicas controlan los relés hasta Ctrl+C"""
+    print("\n🔘 MODO BOTONES - Los relés responden a las entradas físicas")
+    botonera = iniciar_botones(botones)
+    if botonera is None:
+        return
+    print("Presiona Ctrl+C para detener")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Modo botones detenido")
+    finally:
+        botonera.cerrar()
+        print(f"⏱️  {botonera.resumen()}")
 
 def modo_manual():
     """Modo de control manual de los relés"""
     print("\n🎮 MODO MANUAL - Controla los relés con comandos")
     print("Comandos disponibles:")
-    print("  on1      - Activar relé 1")
-    print("  off1     - Desactivar relé 1")
-    print("  toggle1  - Alternar relé 1")
-    print("  on2      - Activar relé 2")
-    print("  off2     - Desactivar relé 2")
-    print("  toggle2  - Alternar relé 2")
-    print("  onall    - Activar ambos relés")
-    print("  offall   - Desactivar ambos relés")
-    print("  toggleall- Alternar ambos relés")
-    print("  status   - Mostrar estado de ambos")
+    print(f"  onN      - Activar relé N (1-{len(banco)}), p.ej. on1")
+    print("  offN     - Desactivar relé N")
+    print("  toggleN  - Alternar relé N")
+    print("  onall    - Activar todos los relés")
+    print("  offall   - Desactivar todos los relés")
+    print("  toggleall- Alternar todos los relés")
+    print("  status   - Mostrar estado de todos")
     print("  quit     - Salir")
     print()
     
+    # Los botones configurados funcionan a la par del teclado
+    botonera = None
+    if BOTONES:
+        from botones import Boton
+        botonera = iniciar_botones([Boton(pin, comando) for pin, comando in BOTONES.items()])
+        print()
+    
     while True:
         try:
             comando = input("Comando > ").strip().lower()
             
-            if comando == "on1":
-                activar_rele(1)
-            elif comando == "off1":
-                desactivar_rele(1)
-            elif comando == "toggle1":
-                alternar_rele(1)
-            elif comando == "on2":
-                activar_rele(2)
-            elif comando == "off2":
-                desactivar_rele(2)
-            elif comando == "toggle2":
-                alternar_rele(2)
-            elif comando == "onall":
-                activar_todos()
-            elif comando == "offall":
-                desactivar_todos()
-            elif comando == "toggleall":
-                alternar_todos()
-            elif comando == "status":
-                mostrar_estado()
-            elif comando == "quit":
+            if comando == "quit":
                 print("👋 ¡Hasta luego!")
                 break
-            else:
+            elif not ejecutar_comando(comando):
                 print("❌ Comando no válido.")
-                print("💡 Comandos: on1, off1, toggle1, on2, off2, toggle2, onall, offall, toggleall, status, quit")
+                print(f"💡 Comandos: onN, offN, toggleN (N = 1-{len(banco)}), onall, offall, toggleall, status, quit")
                 
         except KeyboardInterrupt:
             print("\n\n👋 Modo manual interrumpido")
             break
         except Exception as e:
             print(f"❌ Error: {e}")
+    if botonera is not None:
+        botonera.cerrar()
+        print(f"⏱️  Botones: {botonera.resumen()}")
+
+def patron_automatico(n):
+    """Pasos del modo automático: cada relé solo, todos OFF, todos ON"""
+    pasos = []
+    for numero_rele in range(1, n + 1):
+        estados = {r: r == numero_rele for r in range(1, n + 1)}
+        pasos.append((f"Solo Relé {numero_rele}", estados))
+    pasos.append(("Todos OFF", {r: False for r in range(1, n + 1)}))
+    pasos.append(("Todos ON", {r: True for r in range(1, n + 1)}))
+    return pasos
+
+def patron_secuencia(n):
+    """Pasos del modo secuencia: cada relé ON solo, todos ON, cada relé OFF solo, todos OFF"""
+    pasos = []
+    for numero_rele in range(1, n + 1):
+        estados = {r: r == numero_rele for r in range(1, n + 1)}
+        pasos.append((f"Solo Relé {numero_rele} ON", estados))
+    pasos.append(("Todos los relés ON", {r: True for r in range(1, n + 1)}))
+    for numero_rele in range(1, n + 1):
+        estados = {r: r != numero_rele for r in range(1, n + 1)}
+        pasos.append((f"Solo Relé {numero_rele} OFF", estados))
+    pasos.append(("Todos los relés OFF", {r: False for r in range(1, n + 1)}))
+    return pasos
 
 def modo_automatico(intervalo=2):
     """Modo automático con alternancia de los relés"""
     print(f"\n🤖 MODO AUTOMÁTICO - Alternando relés cada {intervalo} segundos")
-    print("Patrón: Relé1 ON → Relé2 ON → Ambos OFF → Ambos ON")
+    print("Patrón: cada relé solo → Todos OFF → Todos ON")
     print("Presiona Ctrl+C para detener")
     print()
     
+    # Cada paso es el estado final de todos los relés: solo se escriben los cambios
+    linea = compilar(patron_automatico(len(banco)), intervalo, repetir=True)
+    
+    def aplicar(indice, descripcion, estados):
+        aplicar_estados(estados)
+        print(f"🔄 Paso {indice + 1}: {descripcion}")
+    
+    reproductor = Reproductor(linea, aplicar)
     try:
-        paso = 0
-        while True:
-            if paso == 0:
-                desactivar_todos()
-                activar_rele(1)
-                print("🔄 Paso 1: Solo Relé 1")
-            elif paso == 1:
-                desactivar_todos()
-                activar_rele(2)
-                print("🔄 Paso 2: Solo Relé 2")
-            elif paso == 2:
-                desactivar_todos()
-                print("🔄 Paso 3: Ambos OFF")
-            elif paso == 3:
-                activar_todos()
-                print("🔄 Paso 4: Ambos ON")
-            
-            paso = (paso + 1) % 4
-            time.sleep(intervalo)
-            
+        reproductor.ejecutar()
     except KeyboardInterrupt:
         print("\n\n⏹️  Modo automático detenido")
-        # Asegurar que ambos relés estén desactivados al salir
+        reproductor.mostrar_resumen()
+        # Asegurar que todos los relés estén desactivados al salir
         desactivar_todos()
 
-def modo_secuencia():
-    """Modo de secuencia predefinida para ambos relés"""
-    print("\n🎭 MODO SECUENCIA - Ejecutando patrón predefinido")
-    print("Secuencia: R1 ON → R2 ON → Ambos ON → R1 OFF → R2 OFF → Ambos OFF")
+def modo_secuencia(archivo=None):
+    """Modo de secuencia predefinida (o cargada de un archivo JSON) para los relés"""
+    if archivo is None:
+        print("\n🎭 MODO SECUENCIA - Ejecutando patrón predefinido")
+        print("Secuencia: cada relé ON → Todos ON → cada relé OFF → Todos OFF")
+        # Estado final de cada paso: un relé que se mantiene no se apaga y enciende
+        duracion = 1.5  # segundos
+        linea = compilar(patron_secuencia(len(banco)), duracion)
+    else:
+        try:
+            linea = cargar_secuencia(archivo)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Error al cargar la secuencia {archivo}: {e}")
+            return
+        print(f"\n🎭 MODO SECUENCIA - {linea.nombre} ({len(linea)} pasos, "
+              f"ciclo de {linea.periodo:g} s{', repetido' if linea.repetir else ''})")
     print()
     
-    secuencias = [
-        ("Solo Relé 1 ON", lambda: (desactivar_todos(), activar_rele(1))),
-        ("Solo Relé 2 ON", lambda: (desactivar_todos(), activar_rele(2))),
-        ("Ambos relés ON", lambda: activar_todos()),
-        ("Solo Relé 1 OFF", lambda: (activar_todos(), desactivar_rele(1))),
-        ("Solo Relé 2 OFF", lambda: (activar_todos(), desactivar_rele(2))),
-        ("Ambos relés OFF", lambda: desactivar_todos())
-    ]
+    def aplicar(indice, descripcion, estados):
+        print(f"Paso {indice + 1}/{len(linea)}: {descripcion}")
+        aplicar_estados(estados)
     
-    duracion = 1.5  # segundos
+    reproductor = Reproductor(linea, aplicar)
+    try:
+        reproductor.ejecutar()
+        print("\n✅ Secuencia completada")
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Secuencia detenida")
+        desactivar_todos()
+    reproductor.mostrar_resumen()
+
+def modo_lote(archivo=None):
+    """
+    Modo lote: ejecuta comandos de un archivo (o de stdin) con una sola configuración
+    del GPIO. La salida es un log compacto; los errores de configuración van a stderr
+    """
+    global banco
+    from lote_reles import EjecutorLote
     
-    for i, (descripcion, accion) in enumerate(secuencias, 1):
-        print(f"Paso {i}/6: {descripcion}")
-        accion()
-        time.sleep(duracion)
+    try:
+        banco = RelayBank(crear_backend())
+        banco.configurar()
+    except Exception as e:
+        print(f"❌ Error al configurar GPIO: {e}", file=sys.stderr)
+        return False
     
-    print("\n✅ Secuencia completada")
+    ejecutor = EjecutorLote(banco, parsear_comando)
+    try:
+        if archivo is None or archivo == "-":
+            ejecutor.ejecutar(sys.stdin.fileno())
+        else:
+            with open(archivo, "rb") as f:
+                ejecutor.ejecutar(f.fileno())
+    except OSError as e:
+        print(f"❌ Error al leer {archivo}: {e}", file=sys.stderr)
+        return False
+    except KeyboardInterrupt:
+        print("⏹️  Lote interrumpido", file=sys.stderr)
+    finally:
+        banco.cerrar()
+    print(f"📋 {ejecutor.resumen()}", file=sys.stderr)
+    return ejecutor.errores == 0
+
+def modo_proporcional(ciclos, periodo=60.0, minimo=0.0):
+    """
+    Modo proporcional en el tiempo: cada relé de `ciclos` ({rele: 0 a 1}) queda activado
+    esa fracción de cada ventana de `periodo` segundos. Mientras corre, una línea
+    "RELE=PORCENTAJE" cambia el ciclo útil de un relé
+    """
+    from control_proporcional import Canal, ControlProporcional, parsear_ciclos
+    
+    try:
+        for numero_rele in ciclos:
+            if not 1 <= numero_rele <= len(banco):
+                raise ValueError(f"Relé {numero_rele} fuera de rango (1-{len(banco)})")
+        canales = [Canal(rele, ciclo, periodo, minimo) for rele, ciclo in ciclos.items()]
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return
+    
+    def al_conmutar(cambios):
+        for numero_rele in cambios:
+            print(f"[{time.strftime('%H:%M:%S')}] ", end="")
+            mostrar_rele(numero_rele)
+    
+    print(f"\n⏲️  MODO PROPORCIONAL - Ventana de {periodo:g} s, "
+          f"mínimo entre conmutaciones {minimo:g} s")
+    for canal in canales:
+        print(f"📍 Relé {canal.rele}: {canal.ciclo * 100:g}%")
+    print("Escribe RELE=PORCENTAJE para cambiar un ciclo útil - Ctrl+C para detener")
+    print()
+    
+    control = ControlProporcional(banco, canales, al_conmutar=al_conmutar)
+    control.iniciar()
+    try:
+        try:
+            while True:
+                linea = input().strip()
+                if not linea:
+                    continue
+                try:
+                    for numero_rele, ciclo in parsear_ciclos(linea).items():
+                        control.ajustar(numero_rele, ciclo)
+                        print(f"✅ Relé {numero_rele}: {ciclo * 100:g}% desde su próxima ventana")
+                except ValueError as e:
+                    print(f"❌ {e}")
+        except EOFError:
+            # Sin entrada (p.ej. stdin cerrado en un servicio): sigue hasta Ctrl+C
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Modo proporcional detenido")
+    finally:
+        control.detener()
+        print(f"⏱️  {control.resumen()}")
 
 def limpiar_gpio():
     """Limpia la configuración GPIO"""
     try:
-        GPIO.cleanup()
+        if banco is not None:
+            banco.cerrar()
+        elif "RPi.GPIO" in sys.modules:
+            # configurar_gpio() falló a medias: liberar lo que haya quedado
+            _gpio().cleanup()
         print("🧹 GPIO limpiado correctamente")
     except Exception as e:
         print(f"⚠️  Error al limpiar GPIO: {e}")
 
 def main():
     """Función principal"""
+    if len(sys.argv) > 1 and sys.argv[1] in ("--batch", "-b"):
+        # Sin banners: la salida estándar es solo el log del lote
+        archivo = sys.argv[2] if len(sys.argv) > 2 else None
+        sys.exit(0 if modo_lote(archivo) else 1)
+    
     print("🔌 Demo Relé - Raspberry Pi")
     print("=" * 40)
     
@@ -252,8 +500,40 @@ def main():
                 modo_automatico(intervalo)
             limpiar_gpio()
         elif sys.argv[1] == "--sequence" or sys.argv[1] == "-s":
+            archivo = sys.argv[2] if len(sys.argv) > 2 else None
+            if configurar_gpio():
+                modo_secuencia(archivo)
+            limpiar_gpio()
+        elif sys.argv[1] == "--duty" or sys.argv[1] == "-d":
+            from control_proporcional import parsear_ciclos
+            try:
+                ciclos = parsear_ciclos(sys.argv[2])
+                periodo = float(sys.argv[3]) if len(sys.argv) > 3 else 60.0
+                minimo = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+            except IndexError:
+                print("Falta el ciclo útil, p.ej. --duty 1=30,2=75")
+                return
+            except ValueError as e:
+                print(f"❌ Argumento inválido: {e}")
+                return
+            if configurar_gpio():
+                modo_proporcional(ciclos, periodo, minimo)
+            limpiar_gpio()
+        elif sys.argv[1] == "--buttons" or sys.argv[1] == "-B":
+            from botones import Boton, parsear_botones
+            try:
+                if len(sys.argv) > 2:
+                    botones = parsear_botones(sys.argv[2])
+                else:
+                    botones = [Boton(pin, comando) for pin, comando in BOTONES.items()]
+            except ValueError as e:
+                print(f"❌ Argumento inválido: {e}")
+                return
+            if not botones:
+                print("Sin botones: usa --buttons PIN=COMANDO[,...] o configura BOTONES")
+                return
             if configurar_gpio():
-                modo_secuencia()
+                modo_botones(botones)
             limpiar_gpio()
         elif sys.argv[1] == "--help" or sys.argv[1] == "-h":
             mostrar_ayuda()
@@ -303,7 +583,13 @@ def mostrar_ayuda():
     print("Opciones:")
     print("  --manual, -m           Modo manual con comandos")
     print("  --auto, -a [intervalo] Modo automático (default: 2 segundos)")
-    print("  --sequence, -s         Modo secuencia predefinida")
+    print("  --sequence, -s [json]  Modo secuencia predefinida o cargada de un archivo")
+    print("  --batch, -b [archivo]  Modo lote: comandos de un archivo o de stdin ('-')")
+    print("  --duty, -d R=P[,...] [periodo] [min]")
+    print("                         Ciclo útil: relé R activado P% de cada ventana")
+    print("                         (default: 60 s) con un mínimo entre conmutaciones")
+    print("  --buttons, -B [PIN=CMD[/CMD],...]")
+    print("                         Botones físicos: comando al presionar [/al soltar]")
     print("  --help, -h             Muestra esta ayuda")
     print()
     print("Ejemplos:")
@@ -311,6 +597,10 @@ def mostrar_ayuda():
     print("  python rele_demo.py --manual          # Control manual")
     print("  python rele_demo.py --auto 5          # Automático cada 5 segundos")
     print("  python rele_demo.py --sequence        # Secuencia predefinida")
+    print("  python rele_demo.py -s riego.json     # Secuencia definida por el usuario")
+    print("  echo 'on1; off2 @+500ms' | python rele_demo.py --batch")
+    print("  python rele_demo.py --duty 1=30,2=75 60 10  # Calefactor 30%, bomba 75%")
+    print("  python rele_demo.py --buttons 5=toggle1,6=on2/off2")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Salida estructurada de lecturas (JSON Lines o CSV) con escrituras en lote
+Cada lectura es una línea completa:
+    jsonl: {"ts":"2024-01-15T10:30:00.250-03:00","epoch":1705325400.250,
+            "temperatura":22.0,"humedad":45.0,"estado":"ok"}
+    csv:   ts,epoch,temperatura,humedad,estado (con encabezado)
+estado: ok, corregida (por el filtro), descartada (salto) o error (valores vacíos).
+
+- Las líneas se acumulan y se escriben juntas al llenar el buffer o al pasar el
+  intervalo de vaciado, siempre con una sola llamada a os.write por tanda de líneas
+  completas: nunca queda media línea en el archivo.
+- El archivo se abre con O_APPEND y se reabre si logrotate lo movió (como
+  logging.handlers.WatchedFileHandler); con copytruncate, O_APPEND sigue escribiendo
+  al final sin huecos.
+- El timestamp ISO reutiliza el prefijo "AAAA-MM-DDTHH:" y el huso horario de la
+  hora en curso: por lectura solo se formatean minutos, segundos y milisegundos.
+"""
+import math
+import os
+import select
+import stat
+import time
+
+FORMATOS = ("jsonl", "csv")
+CAMPOS = ("ts", "epoch", "temperatura", "humedad", "estado")
+TAMANO_BUFFER = 64 * 1024     # Bytes acumulados que fuerzan una escritura
+INTERVALO_VACIADO = 1.0       # Segundos máximos que una línea espera en el buffer
+
+
+class RelojISO:
+    """Timestamps ISO 8601 locales con el prefijo de la hora en caché"""
+
+    def __init__(self):
+        self._inicio = self._fin = None   # Hora local en caché: [inicio, fin)
+        self._prefijo = ""
+        self._huso = ""
+
+    def _cargar(self, milisegundos):
+        local = time.localtime(milisegundos // 1000)
+        self._inicio = (milisegundos // 1000 - local.tm_min * 60 - local.tm_sec) * 1000
+        self._fin = self._inicio + 3600 * 1000
+        self._prefijo = time.strftime("%Y-%m-%dT%H:", local)
+        offset = local.tm_gmtoff // 60
+        signo = "+" if offset >= 0 else "-"
+        self._huso = f"{signo}{abs(offset) // 60:02d}:{abs(offset) % 60:02d}"
+
+    def formatear_ms(self, milisegundos):
+        """'AAAA-MM-DDTHH:MM:SS.mmm±HH:MM' de un instante en milisegundos enteros"""
+        if self._inicio is None or not self._inicio <= milisegundos < self._fin:
+            self._cargar(milisegundos)
+        segundos, milisegundos = divmod(milisegundos - self._inicio, 1000)
+        minutos, segundos = divmod(segundos, 60)
+        return f"{self._prefijo}{minutos:02d}:{segundos:02d}.{milisegundos:03d}{self._huso}"
+
+    def formatear(self, epoch):
+        """Igual que formatear_ms() para un instante time.time()"""
+        return self.formatear_ms(int(epoch * 1000))
+
+
+class SalidaDatos:
+    """Escritor de lecturas en JSONL o CSV con buffer y vaciado por tamaño o tiempo"""
+
+    def __init__(self, formato="jsonl", ruta=None, tamano_buffer=TAMANO_BUFFER,
+                 intervalo_vaciado=INTERVALO_VACIADO, reloj=time.monotonic):
+        """ruta: archivo (se agrega al final) o None / '-' para la salida estándar"""
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconocido: {formato} (usa {', '.join(FORMATOS)})")
+        self.formato = formato
+        self.ruta = None if ruta in (None, "-") else ruta
+        self.tamano_buffer = tamano_buffer
+        self.intervalo_vaciado = intervalo_vaciado
+        self.reloj = reloj
+        self._iso = RelojISO()
+        self._lineas = []
+        self._bytes = 0
+        self._ultimo_vaciado = reloj()
+        self._fd = None
+        self._inodo = None
+        self._encabezado = False  # El CSV va con encabezado si el destino empieza vacío
+        self.lineas_escritas = 0
+        self.escrituras = 0       # Llamadas a os.write (una por tanda)
+        self._abrir()
+
+    def _abrir(self):
+        if self.ruta is None:
+            self._fd = 1
+            info = os.fstat(1)
+            self._tuberia = stat.S_ISFIFO(info.st_mode)
+            vacio = not stat.S_ISREG(info.st_mode) or info.st_size == 0
+        else:
+            self._fd = os.open(self.ruta, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            info = os.fstat(self._fd)
+            self._tuberia = False
+            self._inodo = (info.st_dev, info.st_ino)
+            vacio = info.st_size == 0
+        self._encabezado = self.formato == "csv" and vacio
+
+    def _reabrir_si_rotado(self):
+        """Reabre el archivo si ya no es el de la ruta (rotado o borrado)"""
+        if self.ruta is None:
+            return
+        try:
+            info = os.stat(self.ruta)
+            actual = (info.st_dev, info.st_ino)
+        except FileNotFoundError:
+            actual = None
+        if actual != self._inodo:
+            os.close(self._fd)
+            self._abrir()
+
+    def _agregar(self, linea):
+        self._lineas.append(linea)
+        self._bytes += len(linea)
+
+    def linea(self, epoch, temperatura, humedad, estado="ok"):
+        """Texto de una lectura en el formato elegido (con el salto de línea)"""
+        # ts y epoch salen del mismo entero: nunca difieren en el último milisegundo
+        milisegundos = int(epoch * 1000)
+        ts = self._iso.formatear_ms(milisegundos)
+        epoch = f"{milisegundos // 1000}.{milisegundos % 1000:03d}"
+        # NaN o infinito no son números JSON: salen como un valor faltante, igual que None
+        if temperatura is not None and not math.isfinite(temperatura):
+            temperatura = None
+        if humedad is not None and not math.isfinite(humedad):
+            humedad = None
+        if self.formato == "jsonl":
+            # Armado a mano: los valores son números, null o palabras fijas (sin escapes)
+            temperatura = "null" if temperatura is None else temperatura
+            humedad = "null" if humedad is None else humedad
+            return (f'{{"ts":"{ts}","epoch":{epoch},"temperatura":{temperatura},'
+                    f'"humedad":{humedad},"estado":"{estado}"}}\n')
+        temperatura = "" if temperatura is None else temperatura
+        humedad = "" if humedad is None else humedad
+        return f"{ts},{epoch},{temperatura},{humedad},{estado}\n"
+
+    def escribir(self, epoch, temperatura, humedad, estado="ok"):
+        """Agrega una lectura; escribe la tanda si se llenó el buffer o pasó el intervalo"""
+        self._agregar(self.linea(epoch, temperatura, humedad, estado))
+        self.lineas_escritas += 1
+        if (self._bytes >= self.tamano_buffer or
+                self.reloj() - self._ultimo_vaciado >= self.intervalo_vaciado):
+            self.vaciar()
+
+    def _escribir_todo(self, datos):
+        while datos:
+            try:
+                escritos = os.write(self._fd, datos)
+            except BlockingIOError:
+                select.select([], [self._fd], [])
+                continue
+            datos = datos[escritos:]
+        self.escrituras += 1
+
+    def vaciar(self):
+        """Escribe las líneas acumuladas, sin cortar ninguna"""
+        self._ultimo_vaciado = self.reloj()
+        if not self._lineas:
+            return
+        self._reabrir_si_rotado()
+        lineas, self._lineas, self._bytes = self._lineas, [], 0
+        if self._encabezado:
+            lineas.insert(0, ",".join(CAMPOS) + "\n")
+            self._encabezado = False
+        if not self._tuberia:
+            self._escribir_todo("".join(lineas).encode("utf-8"))
+            return
+        # En una tubería solo son atómicas las escrituras de hasta PIPE_BUF bytes
+        tanda, tamano = [], 0
+        for linea in lineas:
+            datos = linea.encode("utf-8")
+            if tanda and tamano + len(datos) > select.PIPE_BUF:
+                self._escribir_todo(b"".join(tanda))
+                tanda, tamano = [], 0
+            tanda.append(datos)
+            tamano += len(datos)
+        self._escribir_todo(b"".join(tanda))
+
+    def cerrar(self):
+        """Vacía el buffer y cierra el archivo"""
+        self.vaciar()
+        if self.ruta is not None:
+            os.close(self._fd)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Secuenciador de relés sin deriva
+Los patrones de pasos se compilan en una línea de tiempo con offsets absolutos y se
+ejecutan contra plazos de time.monotonic(): el tiempo que tardan los prints o el GPIO
+no se acumula ciclo a ciclo. Mide el jitter de cada paso y cuenta los overruns
+(pasos que se saltan porque ya venció también el plazo del siguiente).
+
+Formato de archivo de secuencia (JSON):
+    {
+        "nombre": "riego",
+        "repetir": true,
+        "duracion": 2,
+        "pasos": [
+            {"descripcion": "Bomba ON", "estados": {"1": true}, "duracion": 30},
+            {"descripcion": "Bomba OFF", "estados": {"1": false}}
+        ]
+    }
+"duracion" de cada paso es opcional (se usa la general).
+"""
+import json
+import math
+import time
+
+
+class LineaTiempo:
+    """Pasos compilados con su offset desde el inicio del ciclo"""
+
+    def __init__(self, pasos, repetir=False, nombre=""):
+        """pasos: lista de (descripcion, estados, duracion)"""
+        if not pasos:
+            raise ValueError("La secuencia no tiene pasos")
+        self.nombre = nombre
+        self.repetir = repetir
+        self.pasos = []         # (offset, descripcion, estados)
+        offset = 0.0
+        for descripcion, estados, duracion in pasos:
+            if duracion <= 0:
+                raise ValueError(f"Duración inválida en el paso '{descripcion}'")
+            self.pasos.append((offset, descripcion, estados))
+            offset += duracion
+        self.periodo = offset
+
+    def __len__(self):
+        return len(self.pasos)
+
+
+def compilar(pasos, duracion, repetir=False, nombre=""):
+    """Compila [(descripcion, estados)] con la misma duración para todos los pasos"""
+    return LineaTiempo([(d, e, duracion) for d, e in pasos], repetir, nombre)
+
+
+def cargar_secuencia(ruta):
+    """Carga una secuencia definida por el usuario desde un archivo JSON"""
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    duracion_general = datos.get("duracion", 1)
+    pasos = []
+    for i, paso in enumerate(datos["pasos"], 1):
+        estados = {int(numero): bool(activo) for numero, activo in paso["estados"].items()}
+        descripcion = paso.get("descripcion", f"Paso {i}")
+        pasos.append((descripcion, estados, float(paso.get("duracion", duracion_general))))
+    return LineaTiempo(pasos, bool(datos.get("repetir", False)), datos.get("nombre", ruta))
+
+
+class Reproductor:
+    """Ejecuta una línea de tiempo contra plazos absolutos y mide el jitter"""
+
+    def __init__(self, linea, aplicar, reloj=time.monotonic, dormir=time.sleep):
+        """aplicar(indice, descripcion, estados) se llama al vencer cada paso"""
+        self.linea = linea
+        self.aplicar = aplicar
+        self.reloj = reloj
+        self.dormir = dormir
+        self.pasos_ejecutados = 0
+        self.overruns = 0
+        self.jitter_max = 0.0
+        self._jitter_suma = 0.0
+        self._jitter_cuadrados = 0.0
+
+    def _plazo(self, inicio, i):
+        """Plazo absoluto del paso global i"""
+        ciclo, j = divmod(i, len(self.linea))
+        return inicio + ciclo * self.linea.periodo + self.linea.pasos[j][0]
+
+    def _registrar(self, jitter):
+        self.pasos_ejecutados += 1
+        self.jitter_max = max(self.jitter_max, jitter)
+        self._jitter_suma += jitter
+        self._jitter_cuadrados += jitter * jitter
+
+    def ejecutar(self, ciclos=None):
+        """
+        Ejecuta la línea de tiempo. Sin repetir hace un ciclo; con repetir sigue
+        indefinidamente o hasta completar `ciclos`. Termina al acabar el último paso.
+        """
+        if not self.linea.repetir:
+            ciclos = 1
+        total = None if ciclos is None else ciclos * len(self.linea)
+        inicio = self.reloj()
+        i = 0
+        while total is None or i < total:
+            espera = self._plazo(inicio, i) - self.reloj()
+            if espera > 0:
+                self.dormir(espera)
+            ahora = self.reloj()
+            # Si también venció el siguiente paso, este ya no tiene sentido: se salta, pero
+            # sus estados (que pueden ser parciales) se suman a los del paso que se aplica
+            saltados = None
+            while (total is None or i + 1 < total) and self._plazo(inicio, i + 1) <= ahora:
+                self.overruns += 1
+                if saltados is None:
+                    saltados = {}
+                saltados.update(self.linea.pasos[i % len(self.linea)][2])
+                i += 1
+            self._registrar(ahora - self._plazo(inicio, i))
+            _, descripcion, estados = self.linea.pasos[i % len(self.linea)]
+            if saltados is not None:
+                saltados.update(estados)
+                estados = saltados
+            self.aplicar(i % len(self.linea), descripcion, estados)
+            i += 1
+
+        espera = self._plazo(inicio, i) - self.reloj()
+        if espera > 0:
+            self.dormir(espera)
+
+    def resumen(self):
+        """Estadísticas de jitter en segundos: (media, desviación, máximo)"""
+        n = self.pasos_ejecutados
+        if n == 0:
+            return 0.0, 0.0, 0.0
+        media = self._jitter_suma / n
+        varianza = max(0.0, self._jitter_cuadrados / n - media * media)
+        return media, math.sqrt(varianza), self.jitter_max
+
+    def mostrar_resumen(self):
+        """Muestra el jitter medido y los overruns"""
+        media, desviacion, maximo = self.resumen()
+        print(f"⏱️  {self.pasos_ejecutados} pasos - jitter medio {media * 1000:.2f} ms, "
+              f"desv. {desviacion * 1000:.2f} ms, máx {maximo * 1000:.2f} ms - "
+              f"overruns: {self.overruns}")
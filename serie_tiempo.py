@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Almacén en memoria de lecturas del DHT11 (timestamp, temperatura, humedad)
+Buffers circulares de capacidad fija sobre arrays tipados, con niveles de
+reducción automática (crudo, 1 minuto, 1 hora) para que la memoria no crezca
+aunque la Raspberry Pi funcione durante meses
+"""
+from array import array
+
+# (nombre, periodo en segundos, capacidad); periodo 0 = muestras crudas
+NIVELES = (
+    ("raw", 0, 3600),          # ~5 horas a una lectura cada 5 s
+    ("1min", 60, 1440),        # 24 horas
+    ("1h", 3600, 24 * 365),    # 1 año
+)
+
+
+class Ventana:
+    """Vista sin copia de un rango del buffer (uno o dos tramos por columna)"""
+
+    __slots__ = ("timestamp", "temperatura", "humedad")
+
+    def __init__(self, timestamp, temperatura, humedad):
+        self.timestamp = timestamp
+        self.temperatura = temperatura
+        self.humedad = humedad
+
+    def __len__(self):
+        return sum(len(tramo) for tramo in self.timestamp)
+
+    def valores(self, columna):
+        """Itera los valores de una columna en orden cronológico"""
+        for tramo in getattr(self, columna):
+            yield from tramo
+
+
+class BufferCircular:
+    """Buffer circular de capacidad fija con una columna array por campo"""
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        # Preasignados: nunca cambian de tamaño, así las memoryview son siempre válidas
+        self.timestamp = array("d", bytes(8 * capacidad))
+        self.temperatura = array("f", bytes(4 * capacidad))
+        self.humedad = array("f", bytes(4 * capacidad))
+        self._vistas = (memoryview(self.timestamp),
+                        memoryview(self.temperatura),
+                        memoryview(self.humedad))
+        self._inicio = 0       # Posición física de la muestra más antigua
+        self.longitud = 0
+
+    def __len__(self):
+        return self.longitud
+
+    def agregar(self, timestamp, temperatura, humedad):
+        """Agrega una muestra en O(1), pisando la más antigua si está lleno"""
+        fin = (self._inicio + self.longitud) % self.capacidad
+        self.timestamp[fin] = timestamp
+        self.temperatura[fin] = temperatura
+        self.humedad[fin] = humedad
+        if self.longitud < self.capacidad:
+            self.longitud += 1
+        else:
+            self._inicio = (self._inicio + 1) % self.capacidad
+
+    def _timestamp_logico(self, i):
+        """Timestamp de la i-ésima muestra más antigua"""
+        return self.timestamp[(self._inicio + i) % self.capacidad]
+
+    def _buscar(self, timestamp):
+        """Primer índice lógico con timestamp >= dado (búsqueda binaria)"""
+        bajo, alto = 0, self.longitud
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._timestamp_logico(medio) < timestamp:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def _ventana_logica(self, a, b):
+        """Ventana de los índices lógicos [a, b) como tramos de memoryview"""
+        inicio = (self._inicio + a) % self.capacidad
+        fin = inicio + (b - a)
+        if fin <= self.capacidad:
+            tramos = ((inicio, fin),)
+        else:
+            tramos = ((inicio, self.capacidad), (0, fin - self.capacidad))
+        columnas = [tuple(vista[x:y] for x, y in tramos) for vista in self._vistas]
+        return Ventana(*columnas)
+
+    def ventana(self, desde=None, hasta=None):
+        """Muestras con desde <= timestamp < hasta, sin copiar datos"""
+        a = 0 if desde is None else self._buscar(desde)
+        b = self.longitud if hasta is None else self._buscar(hasta)
+        return self._ventana_logica(a, max(a, b))
+
+    def ultimas(self, n):
+        """Las n muestras más recientes, sin copiar datos"""
+        n = min(n, self.longitud)
+        return self._ventana_logica(self.longitud - n, self.longitud)
+
+    def ultima(self):
+        """Muestra más reciente como tupla, o None si está vacío"""
+        if self.longitud == 0:
+            return None
+        i = (self._inicio + self.longitud - 1) % self.capacidad
+        return self.timestamp[i], self.temperatura[i], self.humedad[i]
+
+
+class SerieTiempo:
+    """Serie de lecturas con reducción automática a promedios por minuto y por hora"""
+
+    def __init__(self, niveles=NIVELES):
+        self.niveles = {}
+        self._crudo = None
+        self._periodos = []
+        for nombre, periodo, capacidad in niveles:
+            self.niveles[nombre] = BufferCircular(capacidad)
+            if not periodo:
+                self._crudo = self.niveles[nombre]
+            else:
+                # [inicio del intervalo, n, suma temperatura, suma humedad]
+                self._periodos.append((nombre, periodo, [None, 0, 0.0, 0.0]))
+
+    def agregar(self, timestamp, temperatura, humedad):
+        """Agrega una lectura y la acumula en los niveles reducidos"""
+        if self._crudo is not None:
+            self._crudo.agregar(timestamp, temperatura, humedad)
+        for nombre, periodo, acumulado in self._periodos:
+            intervalo = timestamp - timestamp % periodo
+            if acumulado[0] is not None and intervalo != acumulado[0]:
+                self._volcar(nombre, acumulado)
+            if acumulado[0] is None:
+                acumulado[0] = intervalo
+            acumulado[1] += 1
+            acumulado[2] += temperatura
+            acumulado[3] += humedad
+
+    def _volcar(self, nombre, acumulado):
+        """Cierra el intervalo acumulado y guarda su promedio en el nivel"""
+        inicio, n, suma_t, suma_h = acumulado
+        self.niveles[nombre].agregar(inicio, suma_t / n, suma_h / n)
+        acumulado[:] = [None, 0, 0.0, 0.0]
+
+    def ventana(self, nivel="raw", desde=None, hasta=None):
+        """Ventana sin copia del nivel indicado"""
+        return self.niveles[nivel].ventana(desde, hasta)
+
+    def ultimas(self, n, nivel="raw"):
+        """Las n muestras más recientes del nivel indicado"""
+        return self.niveles[nivel].ultimas(n)
+
+    def memoria(self):
+        """Bytes ocupados por los arrays de todos los niveles (constante)"""
+        total = 0
+        for buffer in self.niveles.values():
+            for columna in (buffer.timestamp, buffer.temperatura, buffer.humedad):
+                total += columna.itemsize * len(columna)
+        return total
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Backends simulados de RPi.GPIO, adafruit_dht (+ board) y Adafruit_DHT
+Permiten ejecutar los scripts sin una Raspberry Pi: instalar() registra módulos
+falsos en sys.modules con la misma API que usan rele_demo.py, dht11_modern.py,
+dht11_pin11.py y test_rele.py. Los sensores simulados tienen latencia de lectura,
+tasa de fallos y ruido configurables.
+
+Uso como lanzador:
+    python simulador.py [--latencia S] [--fallos P] [--ruido C] SCRIPT.py [args...]
+"""
+import math
+import queue
+import random
+import runpy
+import sys
+import threading
+import time
+import types
+
+LATENCIA = 0.02      # Segundos por lectura física del sensor
+FALLOS = 0.1         # Probabilidad de que una lectura falle (checksum)
+RUIDO = 0.3          # Desviación estándar del ruido (°C y %)
+RETENCION = 2.0      # adafruit_dht devuelve la última medición si se pide antes de 2 s
+PICOS = 0.0          # Probabilidad de un salto espurio que pasa el checksum
+
+MODULOS = ("RPi", "RPi.GPIO", "adafruit_dht", "board", "Adafruit_DHT")
+
+
+class ModeloSensor:
+    """Ambiente y comportamiento de los sensores simulados (compartido por todos)"""
+
+    def __init__(self, latencia=LATENCIA, fallos=FALLOS, ruido=RUIDO, retencion=RETENCION,
+                 picos=PICOS, temperatura=22.0, humedad=45.0, semilla=None, dormir=time.sleep):
+        self.latencia = latencia
+        self.fallos = fallos
+        self.ruido = ruido
+        self.retencion = retencion
+        self.picos = picos
+        self.temperatura = temperatura
+        self.humedad = humedad
+        self.desconectados = set()     # Pines sin sensor ("check wiring")
+        self.dormir = dormir
+        self._azar = random.Random(semilla)
+        self._lock = threading.Lock()
+        self.lecturas = 0
+        self.fallidas = 0
+
+    def medir(self, pin, tipo):
+        """
+        Lectura física: devuelve (temperatura, humedad) o lanza RuntimeError
+        con los mismos mensajes que adafruit_dht
+        """
+        if self.latencia:
+            self.dormir(self.latencia)
+        with self._lock:
+            self.lecturas += 1
+            if pin in self.desconectados:
+                self.fallidas += 1
+                raise RuntimeError("DHT sensor not found, check wiring")
+            if self._azar.random() < self.fallos:
+                self.fallidas += 1
+                raise RuntimeError("Checksum did not validate. Try again.")
+            # Deriva lenta (ciclo de una hora) más ruido gaussiano
+            fase = math.sin(time.time() * 2 * math.pi / 3600)
+            temperatura = self.temperatura + fase + self._azar.gauss(0, self.ruido)
+            humedad = self.humedad - 2 * fase + self._azar.gauss(0, self.ruido)
+            if self._azar.random() < self.picos:
+                # Glitch: un bit alto invertido en la trama (saltos de 8-32 unidades)
+                temperatura += self._azar.choice((-1, 1)) * self._azar.choice((8, 16, 32))
+        humedad = min(100.0, max(0.0, humedad))
+        # El DHT11 entrega enteros; el DHT22 una décima
+        decimales = 0 if tipo == "DHT11" else 1
+        return round(temperatura, decimales), round(humedad, decimales)
+
+
+class GPIOSimulado:
+    """Subconjunto de RPi.GPIO usado por el proyecto, con el estado de cada pin"""
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self, latencia=0.0, dormir=time.sleep):
+        self.latencia = latencia      # Segundos por llamada a output()
+        self.dormir = dormir
+        self.modo = None
+        self.pines = {}               # canal -> [dirección, nivel]
+        self.escrituras = 0           # Llamadas a output()
+        self.cambios = 0              # Transiciones de nivel en los pines
+        self.detecciones = {}         # canal -> [flanco, bouncetime (s), último, callbacks]
+        self._eventos = None          # Cola del hilo de callbacks (se crea en el primer uso)
+        self.flancos = 0              # Flancos inyectados en entradas con detección
+
+    def setmode(self, modo):
+        self.modo = modo
+
+    def getmode(self):
+        return self.modo
+
+    def setwarnings(self, activo):
+        pass
+
+    @staticmethod
+    def _lista(valor):
+        return list(valor) if isinstance(valor, (list, tuple)) else [valor]
+
+    def setup(self, canales, direccion, pull_up_down=PUD_OFF, initial=None):
+        if self.modo is None:
+            raise RuntimeError("Please set pin numbering mode using GPIO.setmode(GPIO.BOARD) "
+                               "or GPIO.setmode(GPIO.BCM)")
+        for canal in self._lista(canales):
+            if direccion == self.OUT:
+                nivel = self.LOW if initial is None else initial
+            else:
+                nivel = self.HIGH if pull_up_down == self.PUD_UP else self.LOW
+            self.pines[canal] = [direccion, nivel]
+
+    def output(self, canales, niveles):
+        canales = self._lista(canales)
+        niveles = self._lista(niveles)
+        if len(niveles) == 1:
+            niveles = niveles * len(canales)
+        if len(niveles) != len(canales):
+            raise RuntimeError("Number of channels != number of values")
+        if self.latencia:
+            self.dormir(self.latencia)
+        self.escrituras += 1
+        for canal, nivel in zip(canales, niveles):
+            pin = self.pines.get(canal)
+            if pin is None or pin[0] != self.OUT:
+                raise RuntimeError("The GPIO channel has not been set up as an OUTPUT")
+            nivel = self.HIGH if nivel else self.LOW
+            if pin[1] != nivel:
+                self.cambios += 1
+            pin[1] = nivel
+
+    def input(self, canal):
+        pin = self.pines.get(canal)
+        if pin is None:
+            raise RuntimeError("You must setup() the GPIO channel first")
+        return pin[1]
+
+    def add_event_detect(self, canal, flanco, callback=None, bouncetime=None):
+        pin = self.pines.get(canal)
+        if pin is None or pin[0] != self.IN:
+            raise RuntimeError("You must setup() the GPIO channel as an input first")
+        if canal in self.detecciones:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO "
+                               "channel")
+        rebote = (bouncetime or 0) / 1000
+        self.detecciones[canal] = [flanco, rebote, None, [] if callback is None else [callback]]
+
+    def add_event_callback(self, canal, callback):
+        if canal not in self.detecciones:
+            raise RuntimeError("Add event detection using add_event_detect first before "
+                               "adding a callback")
+        self.detecciones[canal][3].append(callback)
+
+    def remove_event_detect(self, canal):
+        self.detecciones.pop(canal, None)
+
+    def cleanup(self, canales=None):
+        if canales is None:
+            self.pines.clear()
+            self.detecciones.clear()
+            self.modo = None
+        else:
+            for canal in self._lista(canales):
+                self.pines.pop(canal, None)
+                self.detecciones.pop(canal, None)
+
+    def inyectar(self, canal, nivel):
+        """
+        Cambia el nivel de una entrada como lo haría el circuito (botón, fin de carrera).
+        Si el flanco coincide con la detección del canal, sus callbacks se ejecutan en el
+        hilo de eventos, como en RPi.GPIO (nunca en el hilo que inyecta)
+        """
+        pin = self.pines.get(canal)
+        if pin is None or pin[0] != self.IN:
+            raise RuntimeError("El canal no está configurado como entrada")
+        nivel = self.HIGH if nivel else self.LOW
+        if pin[1] == nivel:
+            return
+        pin[1] = nivel
+        deteccion = self.detecciones.get(canal)
+        if deteccion is None:
+            return
+        flanco, rebote, ultimo, _ = deteccion
+        if flanco not in (self.RISING if nivel else self.FALLING, self.BOTH):
+            return
+        ahora = time.monotonic()
+        if rebote and ultimo is not None and ahora - ultimo < rebote:
+            return
+        deteccion[2] = ahora
+        self.flancos += 1
+        if self._eventos is None:
+            self._eventos = queue.SimpleQueue()
+            threading.Thread(target=self._despachar, name="gpio_eventos", daemon=True).start()
+        self._eventos.put(canal)
+
+    def _despachar(self):
+        while True:
+            canal = self._eventos.get()
+            deteccion = self.detecciones.get(canal)
+            if deteccion is None:
+                continue
+            for callback in list(deteccion[3]):
+                try:
+                    callback(canal)
+                except Exception as e:
+                    print(f"❌ Error en el callback del GPIO{canal}: {e}")
+
+    def pulsar(self, canal, duracion=0.1, rebotes=0, intervalo_rebote=0.0005, activo_bajo=True):
+        """
+        Inyecta una pulsación completa: presionar (con `rebotes` idas y vueltas del
+        contacto), mantener `duracion` segundos y soltar (con los mismos rebotes)
+        """
+        presionado, suelto = (self.LOW, self.HIGH) if activo_bajo else (self.HIGH, self.LOW)
+        for final, otro in ((presionado, suelto), (suelto, presionado)):
+            for _ in range(rebotes):
+                self.inyectar(canal, final)
+                self.dormir(intervalo_rebote)
+                self.inyectar(canal, otro)
+                self.dormir(intervalo_rebote)
+            self.inyectar(canal, final)
+            if final == presionado:
+                self.dormir(duracion)
+
+    def pulsar_periodicamente(self, canales, intervalo=2.0, rebotes=3):
+        """Pulsa los canales uno por uno, cada `intervalo` segundos, en un hilo aparte"""
+        def bucle():
+            while True:
+                for canal in canales:
+                    self.dormir(intervalo)
+                    if canal in self.detecciones:
+                        self.pulsar(canal, rebotes=rebotes)
+
+        threading.Thread(target=bucle, name="pulsador_simulado", daemon=True).start()
+
+    def nivel(self, canal):
+        """Nivel actual de un pin (para inspección desde pruebas y benchmarks)"""
+        return self.pines[canal][1]
+
+
+class DHTSimulado:
+    """Sensor con la API de adafruit_dht.DHT11/DHT22 (temperature, humidity, exit)"""
+
+    tipo = "DHT11"
+    modelo = None        # Lo fija instalar()
+
+    def __init__(self, pin, use_pulseio=True):
+        self.pin = pin
+        self._ultima = None           # (instante, temperatura, humedad)
+        self._humedad_pendiente = False
+
+    def _medir(self):
+        ahora = time.monotonic()
+        if self._ultima is None or ahora - self._ultima[0] >= self.modelo.retencion:
+            temperatura, humedad = self.modelo.medir(self.pin, self.tipo)
+            self._ultima = (ahora, temperatura, humedad)
+            self._humedad_pendiente = True
+
+    @property
+    def temperature(self):
+        self._medir()
+        return self._ultima[1]
+
+    @property
+    def humidity(self):
+        # temperature seguido de humidity usa una sola medición, como la biblioteca
+        if not self._humedad_pendiente:
+            self._medir()
+        self._humedad_pendiente = False
+        return self._ultima[2]
+
+    def exit(self):
+        pass
+
+
+def trama_dht(temperatura, humedad, tipo="DHT11", jitter_ns=0, perdida=0.0, azar=None):
+    """
+    Flancos [(timestamp_ns, 1 subida | 2 bajada)] de una trama del sensor, como los
+    entrega el GPIO character device: respuesta de 80/80 µs y 40 bits de 50 µs en bajo
+    más 27 µs (0) o 70 µs (1) en alto. jitter_ns: desviación de cada duración;
+    perdida: probabilidad de perder cada flanco
+    """
+    azar = azar or random
+    negativa = temperatura < 0
+    temperatura = abs(temperatura)
+    if tipo == "DHT11":
+        datos = [int(humedad), round(humedad % 1 * 10), int(temperatura),
+                 round(temperatura % 1 * 10) | (0x80 if negativa else 0)]
+    else:
+        h, t = round(humedad * 10), round(temperatura * 10) | (0x8000 if negativa else 0)
+        datos = [h >> 8, h & 0xFF, t >> 8, t & 0xFF]
+    datos.append(sum(datos) & 0xFF)
+    duraciones = [80000, 80000]     # Respuesta: bajo, alto
+    for byte in datos:
+        for i in range(7, -1, -1):
+            duraciones += [50000, 70000 if byte >> i & 1 else 27000]
+    duraciones.append(50000)        # Último bajo antes de soltar la línea
+    flancos, instante, flanco = [(0, 2)], 0, 1
+    for duracion in duraciones:
+        instante += max(1000, round(duracion + (azar.gauss(0, jitter_ns) if jitter_ns else 0)))
+        flancos.append((instante, flanco))
+        flanco = 3 - flanco
+    if perdida:
+        flancos = [f for f in flancos if azar.random() >= perdida]
+    return flancos
+
+
+class Simulacion:
+    """Módulos simulados instalados y su estado"""
+
+    def __init__(self, modelo, gpio):
+        self.modelo = modelo
+        self.gpio = gpio
+        self.modulos = {}
+        self._anteriores = {}
+
+    def _crear_modulos(self):
+        modelo = self.modelo
+
+        rpi = types.ModuleType("RPi")
+        gpio = types.ModuleType("RPi.GPIO")
+        for nombre in dir(self.gpio):
+            if not nombre.startswith("_"):
+                setattr(gpio, nombre, getattr(self.gpio, nombre))
+        rpi.GPIO = gpio
+
+        moderno = types.ModuleType("adafruit_dht")
+        moderno.DHT11 = type("DHT11", (DHTSimulado,), {"tipo": "DHT11", "modelo": modelo})
+        moderno.DHT22 = type("DHT22", (DHTSimulado,), {"tipo": "DHT22", "modelo": modelo})
+
+        board = types.ModuleType("board")
+        for numero in range(28):
+            setattr(board, f"D{numero}", numero)
+
+        clasico = types.ModuleType("Adafruit_DHT")
+        clasico.DHT11, clasico.DHT22, clasico.AM2302 = 11, 22, 22
+        tipos = {11: "DHT11", 22: "DHT22"}
+
+        def read(sensor, pin):
+            try:
+                temperatura, humedad = modelo.medir(pin, tipos.get(sensor, "DHT11"))
+            except RuntimeError:
+                return None, None
+            return humedad, temperatura
+
+        def read_retry(sensor, pin, retries=15, delay_seconds=2):
+            for _ in range(retries):
+                humedad, temperatura = read(sensor, pin)
+                if humedad is not None and temperatura is not None:
+                    return humedad, temperatura
+                modelo.dormir(delay_seconds)
+            return None, None
+
+        clasico.read = read
+        clasico.read_retry = read_retry
+
+        self.modulos = {"RPi": rpi, "RPi.GPIO": gpio, "adafruit_dht": moderno,
+                        "board": board, "Adafruit_DHT": clasico}
+
+    def instalar(self):
+        self._crear_modulos()
+        for nombre, modulo in self.modulos.items():
+            self._anteriores[nombre] = sys.modules.get(nombre)
+            sys.modules[nombre] = modulo
+
+    def desinstalar(self):
+        """Restaura los módulos que había antes de instalar()"""
+        for nombre, anterior in self._anteriores.items():
+            if anterior is None:
+                sys.modules.pop(nombre, None)
+            else:
+                sys.modules[nombre] = anterior
+        self._anteriores.clear()
+
+
+def instalar(latencia=LATENCIA, fallos=FALLOS, ruido=RUIDO, semilla=None, **opciones):
+    """Registra los módulos simulados en sys.modules y devuelve la Simulacion"""
+    latencia_gpio = opciones.pop("latencia_gpio", 0.0)
+    pulsar = opciones.pop("pulsar", None)
+    simulacion = Simulacion(ModeloSensor(latencia, fallos, ruido, semilla=semilla, **opciones),
+                            GPIOSimulado(latencia_gpio))
+    simulacion.instalar()
+    if pulsar:
+        simulacion.gpio.pulsar_periodicamente(pulsar)
+    return simulacion
+
+
+def mostrar_ayuda():
+    """Muestra la ayuda del programa"""
+    print("Uso: python simulador.py [OPCIONES] SCRIPT.py [ARGUMENTOS...]")
+    print()
+    print("Ejecuta un script del proyecto con GPIO y sensores DHT simulados")
+    print()
+    print("Opciones:")
+    print(f"  --latencia S     Segundos por lectura del sensor (default: {LATENCIA})")
+    print(f"  --fallos P       Probabilidad de fallo por lectura, 0-1 (default: {FALLOS})")
+    print(f"  --ruido C        Desviación del ruido en °C / % (default: {RUIDO})")
+    print(f"  --picos P        Probabilidad de un salto espurio por lectura (default: {PICOS})")
+    print("  --semilla N      Semilla del generador aleatorio (reproducible)")
+    print("  --pulsar PINES   Pulsa (con rebotes) las entradas PIN[,PIN...] cada 2 s")
+    print("  --help, -h       Muestra esta ayuda")
+    print()
+    print("Ejemplos:")
+    print("  python simulador.py rele_demo.py --manual")
+    print("  python simulador.py --fallos 0.5 dht11_modern.py -c 2")
+    print("  python simulador.py test_rele.py")
+    print("  python simulador.py --pulsar 5,6 rele_demo.py --buttons 5=toggle1,6=offall")
+
+
+def main():
+    """Función principal"""
+    argumentos = sys.argv[1:]
+    opciones = {}
+    tipos = {"--latencia": float, "--fallos": float, "--ruido": float, "--picos": float,
+             "--semilla": int, "--pulsar": lambda texto: [int(p) for p in texto.split(",")]}
+    try:
+        while argumentos and argumentos[0].startswith("-"):
+            opcion = argumentos.pop(0)
+            if opcion in ("--help", "-h"):
+                mostrar_ayuda()
+                return
+            opciones[opcion[2:]] = tipos[opcion](argumentos.pop(0))
+    except (KeyError, ValueError, IndexError):
+        print("Argumentos inválidos. Usa --help para ver las opciones")
+        sys.exit(1)
+    if not argumentos:
+        mostrar_ayuda()
+        sys.exit(1)
+
+    instalar(**opciones)
+    sys.argv = argumentos
+    runpy.run_path(argumentos[0], run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Temporizador de plazos con un solo hilo
+Las funciones programadas se guardan en un heap ordenado por plazo absoluto
+(time.monotonic()): programar y cancelar cuestan O(log n) y el hilo duerme en una
+Condition hasta el plazo más próximo, sin sondear. Con decenas de canales sigue habiendo
+un solo hilo y el uso de CPU entre eventos es nulo.
+
+Las funciones cuyo plazo ya venció se ejecutan juntas en una tanda (fuera del lock, de
+modo que pueden programar otras) y al final se llama a al_terminar_tanda: un consumidor
+puede acumular cambios en la tanda y aplicarlos en una sola escritura.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+
+class Evento:
+    """Función programada; se cancela con Temporizador.cancelar()"""
+
+    __slots__ = ("plazo", "orden", "funcion", "argumentos", "cancelado", "en_heap")
+
+    def __init__(self, plazo, orden, funcion, argumentos):
+        self.plazo = plazo
+        self.orden = orden          # Desempate FIFO entre eventos con el mismo plazo
+        self.funcion = funcion
+        self.argumentos = argumentos
+        self.cancelado = False
+        self.en_heap = False        # False otra vez cuando el hilo lo saca para ejecutarlo
+
+    def __lt__(self, otro):
+        return (self.plazo, self.orden) < (otro.plazo, otro.orden)
+
+
+class Temporizador:
+    """Heap de plazos atendido por un hilo que duerme hasta el próximo vencimiento"""
+
+    def __init__(self, reloj=time.monotonic, al_terminar_tanda=None, nombre="temporizador",
+                 espera_max=None):
+        """
+        espera_max: segundos máximos que el hilo duerme sin volver a mirar el reloj
+        (con un reloj de pared, time.time(), acota el efecto de un ajuste de hora)
+        """
+        self.reloj = reloj
+        self.espera_max = espera_max
+        self.al_terminar_tanda = al_terminar_tanda
+        self.nombre = nombre
+        self._heap = []
+        self._orden = itertools.count()
+        self._condicion = threading.Condition()
+        self._hilo = None
+        self._activo = False
+        self._cancelados = 0        # Eventos cancelados que siguen en el heap
+        self.ejecutados = 0
+        self.tandas = 0
+        self.jitter_max = 0.0
+        self._jitter_suma = 0.0
+
+    def __len__(self):
+        return len(self._heap) - self._cancelados
+
+    def programar(self, plazo, funcion, *argumentos):
+        """Ejecuta funcion(*argumentos) en el instante `plazo` del reloj; devuelve el Evento"""
+        evento = Evento(plazo, next(self._orden), funcion, argumentos)
+        with self._condicion:
+            heapq.heappush(self._heap, evento)
+            evento.en_heap = True
+            # Solo hay que despertar al hilo si cambió el plazo más próximo
+            if self._heap[0] is evento:
+                self._condicion.notify()
+        return evento
+
+    def programar_en(self, espera, funcion, *argumentos):
+        """Como programar(), con un plazo relativo a ahora"""
+        return self.programar(self.reloj() + espera, funcion, *argumentos)
+
+    def cancelar(self, evento):
+        """Cancela un evento pendiente (se descarta al llegar a la cima del heap)"""
+        with self._condicion:
+            if evento.cancelado:
+                return
+            evento.cancelado = True
+            if not evento.en_heap:
+                return      # Ya salió en una tanda: no queda nada que descartar del heap
+            self._cancelados += 1
+            # Demasiados cancelados: reconstruir para que el heap no crezca sin límite
+            if self._cancelados > 64 and self._cancelados * 2 > len(self._heap):
+                self._heap = [e for e in self._heap if not e.cancelado]
+                heapq.heapify(self._heap)
+                self._cancelados = 0
+
+    def iniciar(self):
+        """Arranca el hilo del temporizador"""
+        with self._condicion:
+            if self._activo:
+                return
+            self._activo = True
+        self._hilo = threading.Thread(target=self._bucle, name=self.nombre, daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo; los eventos pendientes no se ejecutan"""
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join()
+        self._hilo = None
+
+    def _vencidos(self):
+        """Espera el próximo plazo y saca del heap todos los vencidos (None al detener)"""
+        with self._condicion:
+            while self._activo:
+                while self._heap and self._heap[0].cancelado:
+                    heapq.heappop(self._heap).en_heap = False
+                    self._cancelados -= 1
+                if not self._heap:
+                    self._condicion.wait()
+                    continue
+                ahora = self.reloj()
+                espera = self._heap[0].plazo - ahora
+                if espera > 0:
+                    if self.espera_max is not None:
+                        espera = min(espera, self.espera_max)
+                    self._condicion.wait(espera)
+                    continue
+                tanda = []
+                while self._heap and self._heap[0].plazo <= ahora:
+                    evento = heapq.heappop(self._heap)
+                    evento.en_heap = False
+                    if evento.cancelado:
+                        self._cancelados -= 1
+                    else:
+                        tanda.append(evento)
+                return ahora, tanda
+        return None
+
+    def _bucle(self):
+        while True:
+            vencidos = self._vencidos()
+            if vencidos is None:
+                return
+            ahora, tanda = vencidos
+            for evento in tanda:
+                jitter = ahora - evento.plazo
+                self.jitter_max = max(self.jitter_max, jitter)
+                self._jitter_suma += jitter
+                try:
+                    evento.funcion(*evento.argumentos)
+                except Exception as e:
+                    # Un evento con error no debe detener a los demás
+                    print(f"❌ Error en el evento programado: {e}")
+            self.ejecutados += len(tanda)
+            self.tandas += 1
+            if self.al_terminar_tanda is not None:
+                self.al_terminar_tanda()
+
+    def resumen(self):
+        """Jitter en segundos de los eventos ejecutados: (media, máximo)"""
+        if self.ejecutados == 0:
+            return 0.0, 0.0
+        return self._jitter_suma / self.ejecutados, self.jitter_max
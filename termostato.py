@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Termostato de lazo cerrado: lecturas del DHT11 → relés
+Cada lectura nueva dispara al instante la decisión de los relés (no hay un bucle
+de control aparte), con banda de histéresis, tiempos mínimos de encendido/apagado y
+consigna por relé. Se mide la latencia entre la lectura y la conmutación.
+
+Archivo de configuración (JSON):
+    {
+        "intervalo": 5,
+        "sensores": [[17, "DHT11"]],
+        "reglas": [
+            {"rele": 1, "sensor": 17, "variable": "temperatura", "modo": "enfriar",
+             "consigna": 23.5, "histeresis": 3, "min_encendido": 60, "min_apagado": 120},
+            {"rele": 2, "sensor": 17, "variable": "temperatura", "modo": "calentar",
+             "consigna": 18, "histeresis": 1}
+        ]
+    }
+modo "enfriar": activa el relé por encima de consigna + histeresis/2 (ventilador)
+modo "calentar": activa el relé por debajo de consigna - histeresis/2 (calefacción)
+"""
+import json
+import sys
+import threading
+import time
+
+MODOS = ("enfriar", "calentar")
+VARIABLES = ("temperatura", "humedad")
+
+
+class Regla:
+    """Consigna de un relé sobre una variable de un sensor"""
+
+    def __init__(self, rele, consigna, modo="enfriar", variable="temperatura",
+                 histeresis=1.0, min_encendido=0, min_apagado=0, sensor=None):
+        if modo not in MODOS:
+            raise ValueError(f"Modo inválido: {modo} (usa {', '.join(MODOS)})")
+        if variable not in VARIABLES:
+            raise ValueError(f"Variable inválida: {variable} (usa {', '.join(VARIABLES)})")
+        self.rele = rele
+        self.consigna = consigna
+        self.modo = modo
+        self.variable = variable
+        self.histeresis = histeresis
+        self.min_encendido = min_encendido
+        self.min_apagado = min_apagado
+        self.sensor = sensor        # gpio del sensor; None = cualquier sensor
+
+    def deseado(self, valor, activo):
+        """Estado que pide la regla para `valor`; dentro de la banda mantiene `activo`"""
+        alto = self.consigna + self.histeresis / 2
+        bajo = self.consigna - self.histeresis / 2
+        if self.modo == "enfriar":
+            if valor > alto:
+                return True
+            if valor < bajo:
+                return False
+        else:
+            if valor < bajo:
+                return True
+            if valor > alto:
+                return False
+        return activo
+
+
+class Termostato:
+    """Decide los relés en el momento en que llega cada lectura"""
+
+    def __init__(self, banco, reglas, reloj=time.monotonic):
+        """banco: RelayBank (se usa su estado sombra y aplicar())"""
+        self.banco = banco
+        self.reglas = list(reglas)
+        reles = set()
+        for regla in self.reglas:
+            # Se valida al cargar: un relé inválido fallaría recién con la primera lectura
+            if not isinstance(regla.rele, int) or not 1 <= regla.rele <= len(banco):
+                raise ValueError(f"Relé {regla.rele!r} fuera de rango (1-{len(banco)})")
+            # El estado (cambios, temporizadores) va por relé: dos reglas se pisarían
+            if regla.rele in reles:
+                raise ValueError(f"Relé {regla.rele} repetido")
+            reles.add(regla.rele)
+        self.reloj = reloj
+        self._lock = threading.Lock()
+        self._ultimo_cambio = {}      # rele -> instante del último cambio
+        self._ultimo_valor = {}       # id(regla) -> último valor visto
+        self._temporizadores = {}     # rele -> Timer de reevaluación pendiente
+        self.conmutaciones = 0
+        self.diferidas = 0            # Cambios retrasados por los tiempos mínimos
+        self.latencia_n = 0
+        self.latencia_suma = 0.0
+        self.latencia_max = 0.0
+
+    def _bloqueo(self, regla, activo, ahora):
+        """Segundos que faltan para poder cambiar el relé (0 si ya se puede)"""
+        ultimo = self._ultimo_cambio.get(regla.rele)
+        if ultimo is None:
+            return 0.0
+        minimo = regla.min_encendido if activo else regla.min_apagado
+        return max(0.0, ultimo + minimo - ahora)
+
+    def procesar(self, resultado):
+        """
+        Procesa una lectura (dict con gpio, temperatura, humedad, estado, instante)
+        y conmuta en una sola escritura los relés que correspondan.
+        Devuelve la lista de relés cambiados.
+        """
+        if resultado.get("estado", "ok") != "ok":
+            return []
+        instante = resultado.get("instante") or self.reloj()
+        with self._lock:
+            cambios = {}
+            for regla in self.reglas:
+                if regla.sensor is not None and regla.sensor != resultado.get("gpio"):
+                    continue
+                valor = resultado[regla.variable]
+                self._ultimo_valor[id(regla)] = valor
+                self._decidir(regla, valor, cambios)
+            return self._aplicar(cambios, instante)
+
+    def _decidir(self, regla, valor, cambios):
+        """Agrega a `cambios` lo que pide la regla, o programa su reevaluación"""
+        activo = self.banco.estado(regla.rele)
+        deseado = regla.deseado(valor, activo)
+        if deseado == activo:
+            return
+        espera = self._bloqueo(regla, activo, self.reloj())
+        if espera > 0:
+            self._programar(regla, espera)
+        else:
+            cambios[regla.rele] = deseado
+
+    def _programar(self, regla, espera):
+        """Reevalúa la regla cuando venza su tiempo mínimo (sin esperar otra lectura)"""
+        if regla.rele in self._temporizadores:
+            return
+        temporizador = threading.Timer(espera, self._reevaluar, (regla,))
+        temporizador.daemon = True
+        self._temporizadores[regla.rele] = temporizador
+        temporizador.start()
+
+    def _reevaluar(self, regla):
+        with self._lock:
+            self._temporizadores.pop(regla.rele, None)
+            valor = self._ultimo_valor.get(id(regla))
+            if valor is None:
+                return
+            cambios = {}
+            self._decidir(regla, valor, cambios)
+            if cambios:
+                self.diferidas += 1
+                self._aplicar(cambios, None)
+
+    def _aplicar(self, cambios, instante):
+        """Escribe los cambios y registra la latencia lectura → conmutación"""
+        if not cambios:
+            return []
+        cambiados = self.banco.aplicar(cambios)
+        ahora = self.reloj()
+        for rele in cambiados:
+            self._ultimo_cambio[rele] = ahora
+        self.conmutaciones += len(cambiados)
+        if instante is not None and cambiados:
+            latencia = ahora - instante
+            self.latencia_n += 1
+            self.latencia_suma += latencia
+            self.latencia_max = max(self.latencia_max, latencia)
+        return cambiados
+
+    def cancelar(self):
+        """Cancela las reevaluaciones pendientes"""
+        with self._lock:
+            for temporizador in self._temporizadores.values():
+                temporizador.cancel()
+            self._temporizadores.clear()
+
+    def mostrar_resumen(self):
+        """Muestra conmutaciones y latencia medida"""
+        media = self.latencia_suma / self.latencia_n if self.latencia_n else 0.0
+        print(f"🔁 {self.conmutaciones} conmutaciones ({self.diferidas} diferidas por "
+              f"tiempos mínimos) - latencia lectura→relé media {media * 1000:.2f} ms, "
+              f"máx {self.latencia_max * 1000:.2f} ms")
+
+
+def cargar_configuracion(ruta):
+    """Carga sensores, reglas e intervalo desde un archivo JSON"""
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    sensores = [(int(gpio), tipo) for gpio, tipo in datos.get("sensores", [[17, "DHT11"]])]
+    reglas = [Regla(**regla) for regla in datos["reglas"]]
+    return sensores, reglas, datos.get("intervalo", 5)
+
+
+def main():
+    """Función principal"""
+    if len(sys.argv) < 2 or sys.argv[1] in ("--help", "-h"):
+        print("Uso: python termostato.py CONFIG.json")
+        print()
+        print("Controla los relés según las lecturas del DHT11 (ver formato en termostato.py)")
+        return
+
+    try:
+        sensores, reglas, intervalo = cargar_configuracion(sys.argv[1])
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"❌ Error en la configuración: {e}")
+        sys.exit(1)
+
+    import rele_demo
+    from dht11_multi import MotorSondeo
+
+    print("🌡️ 🔌 Termostato DHT11 + Relés")
+    print("=" * 40)
+    if not rele_demo.configurar_gpio():
+        sys.exit(1)
+    try:
+        termostato = Termostato(rele_demo.banco, reglas)
+    except ValueError as e:
+        print(f"❌ Error en la configuración: {e}")
+        rele_demo.limpiar_gpio()
+        sys.exit(1)
+    try:
+        motor = MotorSondeo(sensores)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        rele_demo.limpiar_gpio()
+        sys.exit(1)
+
+    def al_leer(resultado):
+        for rele in termostato.procesar(resultado):
+            rele_demo.mostrar_rele(rele)
+        if resultado["estado"] == "ok":
+            print(f"[{time.strftime('%H:%M:%S')}] GPIO{resultado['gpio']}: "
+                  f"{resultado['temperatura']:.1f}°C  {resultado['humedad']:.1f}%")
+        else:
+            print(f"[{time.strftime('%H:%M:%S')}] ❌ GPIO{resultado['gpio']}: "
+                  f"{resultado['estado']}")
+
+    for regla in reglas:
+        print(f"📍 Relé {regla.rele}: {regla.modo} {regla.variable} "
+              f"{regla.consigna} ± {regla.histeresis / 2:g}")
+    print(f"🔄 Lecturas cada {intervalo} segundos - Ctrl+C para detener")
+    try:
+        motor.sondear(intervalo, lambda resultados: None, al_leer)
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Termostato detenido")
+    finally:
+        termostato.cancelar()
+        termostato.mostrar_resumen()
+        motor.cerrar()
+        rele_demo.desactivar_todos()
+        rele_demo.limpiar_gpio()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Pruebas del decodificador de dht11_nativo.py sin hardware
+Usa tramas_dht_sinteticas.jsonl: flancos generados con simulador.trama_dht() (semilla
+fija, 3 µs de jitter). Cuatro tramas válidas (DHT11 y DHT22, también bajo cero), una
+con el checksum alterado y una incompleta, que deben rechazarse ("esperado": null).
+"""
+import json
+import os
+import sys
+import tempfile
+
+import dht11_nativo
+
+RUTA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tramas_dht_sinteticas.jsonl")
+
+
+def test_tramas_sinteticas():
+    """verificar() acepta las tramas válidas y rechaza las inválidas de la fixture"""
+    correctas, total = dht11_nativo.verificar(RUTA)
+    assert (correctas, total) == (6, 6)
+
+
+def test_rechazos():
+    """Las tramas inválidas fallan con los mensajes de adafruit_dht"""
+    mensajes = []
+    for trama in dht11_nativo.leer_fixtures(RUTA):
+        if trama["esperado"] is not None:
+            continue
+        try:
+            dht11_nativo.decodificar(dht11_nativo.duraciones_altas(trama["flancos"]),
+                                     trama["tipo"])
+        except RuntimeError as e:
+            mensajes.append(str(e))
+    assert mensajes == ["Checksum did not validate. Try again.",
+                        "A full buffer was not returned. Try again."]
+
+
+def test_verificar_detecta_errores():
+    """Con las tramas inválidas marcadas como válidas, verificar() no las acepta"""
+    tramas = dht11_nativo.leer_fixtures(RUTA)
+    for trama in tramas:
+        if trama["esperado"] is None:
+            trama["esperado"] = [20.0, 40.0]
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+        f.writelines(json.dumps(trama) + "\n" for trama in tramas)
+    try:
+        assert dht11_nativo.verificar(f.name) == (4, 6)
+    finally:
+        os.unlink(f.name)
+
+
+def test_lote():
+    """decodificar_lote() coincide con decodificar() trama a trama"""
+    for tipo in dht11_nativo.TIPOS:
+        tramas = [t for t in dht11_nativo.leer_fixtures(RUTA)
+                  if t["tipo"] == tipo and t["esperado"] is not None]
+        matriz = [dht11_nativo.duraciones_altas(t["flancos"])[-40:] for t in tramas]
+        temperaturas, humedades, validas = dht11_nativo.decodificar_lote(matriz, tipo)
+        assert all(validas)
+        assert [[float(t), float(h)] for t, h in zip(temperaturas, humedades)] == \
+            [t["esperado"] for t in tramas]
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 PRUEBAS DEL DECODIFICADOR DHT NATIVO")
+    print("=" * 40)
+    fallas = 0
+    for prueba in (test_tramas_sinteticas, test_rechazos, test_verificar_detecta_errores,
+                   test_lote):
+        try:
+            prueba()
+            print(f"✅ {prueba.__doc__}")
+        except AssertionError:
+            fallas += 1
+            print(f"❌ {prueba.__doc__}")
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
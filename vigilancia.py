@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Vigilancia del modo continuo: timeout por lectura, reinicio del driver y latido
+Un driver colgado (p.ej. adafruit_dht cuando falla la captura de pulsos) congela el
+bucle sin ningún mensaje. Con LecturaVigilada cada lectura corre en un hilo de trabajo
+y el bucle espera como mucho `timeout` segundos:
+- Si vence, la lectura cuenta como fallida, el hilo colgado se abandona (Python no
+  puede matar un hilo; termina solo si el driver alguna vez vuelve) y el sensor se
+  reinicializa con la función `reiniciar` en un hilo nuevo.
+- Si quedan demasiados hilos colgados a la vez, el driver no se recupera: se lanza
+  RuntimeError para que el proceso termine y lo reinicie su supervisor (systemd).
+Latido escribe un archivo con el estado del bucle y el instante límite del próximo
+latido; `python vigilancia.py ARCHIVO` dice si el bucle sigue vivo (código de salida
+0/1, sirve para un healthcheck o un timer de systemd).
+"""
+import os
+import queue
+import sys
+import threading
+import time
+
+import metricas
+from reintentos import renovar_politica
+
+TIMEOUT_LECTURA = 10.0  # Segundos por lectura (el presupuesto de reintentos es 4 s)
+COLGADOS_MAX = 3        # Hilos colgados a la vez antes de abandonar el proceso
+CADA_LATIDO = 1.0       # Segundos mínimos entre escrituras del archivo de latido
+
+COLGADAS = metricas.contador("dht_lecturas_colgadas_total",
+                             "Lecturas que superaron el timeout del modo continuo")
+REINICIOS = metricas.contador("dht_reinicios_total",
+                              "Reinicializaciones del sensor después de una lectura colgada")
+
+
+def rss_kb():
+    """Memoria residente actual del proceso en KB (None si no hay /proc)"""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def _liberar(dht):
+    """Libera un sensor abandonado (puede colgarse también: corre en su propio hilo)"""
+    salir = getattr(dht, "exit", None)
+    if salir is None:
+        return
+    try:
+        salir()
+    except Exception:
+        pass
+
+
+class LecturaVigilada:
+    """Lecturas con timeout en un hilo de trabajo, con reinicio del sensor si se cuelga"""
+
+    def __init__(self, dht, leer, reiniciar=None, timeout=TIMEOUT_LECTURA,
+                 colgados_max=COLGADOS_MAX, clave_politica=None):
+        """
+        leer(dht) -> (temperatura, humedad): una lectura con reintentos
+        reiniciar() -> dht nuevo (o None si falla); sin ella solo se cambia de hilo
+        clave_politica: clave de politica_para() que usa leer(); el hilo colgado retiene
+        su lock, así que al colgarse se renueva para que las lecturas siguientes no esperen
+        """
+        self.dht = dht
+        self._leer_dht = leer
+        self.reiniciar = reiniciar
+        self.timeout = timeout
+        self.colgados_max = colgados_max
+        self.clave_politica = clave_politica
+        self._trabajo = None            # (hilo, pedidos, respuestas) del hilo actual
+        self.colgados = []              # Hilos abandonados que siguen vivos
+        self.lecturas = 0
+        self.timeouts = 0
+        self.reinicios = 0
+
+    def _trabajar(self, pedidos, respuestas):
+        while True:
+            dht = pedidos.get()
+            if dht is None:
+                return
+            try:
+                respuestas.put((True, self._leer_dht(dht)))
+            except BaseException as e:
+                respuestas.put((False, e))
+
+    def _arrancar(self):
+        # El hilo se crea en la primera lectura: con --shm eso ocurre en el proceso hijo
+        pedidos, respuestas = queue.SimpleQueue(), queue.SimpleQueue()
+        hilo = threading.Thread(target=self._trabajar, args=(pedidos, respuestas),
+                                name="lectura", daemon=True)
+        hilo.start()
+        self._trabajo = (hilo, pedidos, respuestas)
+
+    def leer(self):
+        """(temperatura, humedad); (None, None) si la lectura se colgó"""
+        if self._trabajo is None:
+            self._arrancar()
+        _, pedidos, respuestas = self._trabajo
+        self.lecturas += 1
+        pedidos.put(self.dht)
+        try:
+            correcta, valor = respuestas.get(timeout=self.timeout)
+        except queue.Empty:
+            self._colgada()
+            return None, None
+        if not correcta:
+            raise valor
+        return valor
+
+    def _colgada(self):
+        """Abandona el hilo colgado y reinicializa el sensor"""
+        self.timeouts += 1
+        COLGADAS.inc()
+        hilo, pedidos, _ = self._trabajo
+        self._trabajo = None
+        pedidos.put(None)               # Si el driver vuelve, el hilo termina
+        self.colgados = [h for h in self.colgados if h.is_alive()] + [hilo]
+        print(f"[{time.strftime('%H:%M:%S')}] ⚠️  Lectura colgada más de "
+              f"{self.timeout:g} s: reiniciando el sensor")
+        if len(self.colgados) > self.colgados_max:
+            raise RuntimeError(f"{len(self.colgados)} lecturas siguen colgadas, "
+                               f"el driver no se recupera")
+        if self.clave_politica is not None:
+            renovar_politica(self.clave_politica)
+        if self.reiniciar is None:
+            return
+        threading.Thread(target=_liberar, args=(self.dht,), name="liberar",
+                         daemon=True).start()
+        nuevo = self.reiniciar()
+        if nuevo is not None:
+            self.dht = nuevo
+            self.reinicios += 1
+            REINICIOS.inc()
+
+
+class Latido:
+    """Archivo de latido: el bucle lo reescribe en cada muestra (como mucho cada `cada` s)"""
+
+    def __init__(self, ruta, plazo, vigilada=None, cada=CADA_LATIDO):
+        """plazo: segundos máximos esperables entre dos muestras (intervalo + timeout)"""
+        self.ruta = ruta
+        self.plazo = plazo
+        self.vigilada = vigilada
+        self.cada = cada
+        self._temporal = f"{ruta}.tmp"
+        self._ultimo = None
+        self.muestras = 0
+        self.errores = 0
+
+    def marcar(self, correcta=True, ahora=None):
+        """Cuenta una muestra y reescribe el archivo si pasó `cada` desde la última vez"""
+        self.muestras += 1
+        if not correcta:
+            self.errores += 1
+        ahora = time.time() if ahora is None else ahora
+        if self._ultimo is not None and ahora - self._ultimo < self.cada:
+            return
+        self._ultimo = ahora
+        import json     # Acá y no arriba: dht11_modern importa este módulo al arrancar
+        estado = {"pid": os.getpid(), "instante": ahora,
+                  "limite": ahora + self.plazo + self.cada,
+                  "muestras": self.muestras, "errores": self.errores, "rss_kb": rss_kb()}
+        if self.vigilada is not None:
+            estado.update(timeouts=self.vigilada.timeouts, reinicios=self.vigilada.reinicios,
+                          colgados=len(self.vigilada.colgados))
+        try:
+            with open(self._temporal, "w", encoding="utf-8") as f:
+                json.dump(estado, f)
+            os.replace(self._temporal, self.ruta)
+        except OSError as e:
+            print(f"❌ Error al escribir el latido: {e}")
+
+    def cerrar(self):
+        """Borra el archivo (salida ordenada: no es un bucle colgado)"""
+        try:
+            os.unlink(self.ruta)
+        except OSError:
+            pass
+
+
+def comprobar(ruta, ahora=None):
+    """(vivo, estado) a partir del archivo de latido; estado None si no existe"""
+    import json
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        return False, None
+    ahora = time.time() if ahora is None else ahora
+    return ahora <= estado["limite"], estado
+
+
+def mostrar_ayuda():
+    """Muestra la ayuda del programa"""
+    print("Uso: python vigilancia.py ARCHIVO")
+    print()
+    print("Comprueba el latido del modo continuo (python dht11_modern.py -c N --heartbeat")
+    print("ARCHIVO): sale con 0 si el bucle escribió a tiempo y con 1 si está colgado,")
+    print("terminó o el archivo no existe")
+    print()
+    print("Opciones:")
+    print("  --help, -h    Muestra esta ayuda")
+
+
+def main():
+    """Función principal"""
+    argumentos = sys.argv[1:]
+    if len(argumentos) != 1 or argumentos[0] in ("--help", "-h"):
+        mostrar_ayuda()
+        sys.exit(0 if argumentos else 1)
+    vivo, estado = comprobar(argumentos[0])
+    if estado is None:
+        print(f"❌ Sin latido en {argumentos[0]}")
+        sys.exit(1)
+    edad = time.time() - estado["instante"]
+    detalle = (f"pid {estado['pid']}, último latido hace {edad:.0f} s, "
+               f"{estado['muestras']} muestras, {estado['errores']} errores")
+    if "timeouts" in estado:
+        detalle += f", {estado['timeouts']} timeouts, {estado['reinicios']} reinicios"
+    if estado.get("rss_kb") is not None:
+        detalle += f", RSS {estado['rss_kb']} KB"
+    print(f"{'✅ Vivo' if vivo else '❌ Colgado'}: {detalle}")
+    sys.exit(0 if vivo else 1)
+
+
+if __name__ == "__main__":
+    main()